@@ -0,0 +1,200 @@
+"""
+Render benchmark over a fixed scene corpus.
+
+    python -m benchmarks.run                                   # every scene, draft + preview
+    python -m benchmarks.run --profiles final --scenes heart fractal --repeat 3
+    python -m benchmarks.run --out benchmarks/baseline.json   # store a baseline
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Each scene is rendered with the manim CLI into a fresh media dir (no partial
+movie file or LaTeX cache carried over), so runs are comparable across
+Manim upgrades, renderer flag changes and machines. Wall time, frames per
+second, peak RSS, LaTeX time and output bytes go into a JSON report. With
+--compare, metrics that got worse than --threshold vs the baseline are
+listed and the exit code is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import PROJECT_ROOT, RENDER_PROFILES, BENCHMARK_REGRESSION_THRESHOLD
+from rendering.manim_cli import build_manim_command, locate_rendered_video, manim_env
+from rendering.preflight import preflight_check
+from rendering.process import run_monitored
+from rendering.render_cache import _manim_version
+from rendering.telemetry import RenderTelemetry
+
+BENCH_DIR = Path(__file__).parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+SCENES = {
+    "heart": PROJECT_ROOT / "manim" / "heart.py",  # 3D surface, ambient camera rotation
+    "mobius": PROJECT_ROOT / "manim" / "mobius.py",  # 3D surface
+    "fractal": BENCH_DIR / "scenes" / "fractal.py",  # One long morphing path
+    "number_line": BENCH_DIR / "scenes" / "number_line.py",  # Many small mobjects, LaTeX labels
+    "chaos_game": BENCH_DIR / "scenes" / "chaos_game.py",  # Rasterized point cloud
+}
+DEFAULT_PROFILES = ["draft", "preview"]
+
+# metric -> +1 if higher is better, -1 if lower is better
+METRICS = {
+    "wall_seconds": -1,
+    "fps": +1,
+    "peak_rss_bytes": -1,
+    "tex_seconds": -1,
+}
+# Differences below these are noise, whatever the ratio
+MIN_DELTAS = {"wall_seconds": 0.5, "fps": 0.5, "peak_rss_bytes": 32 * 1024**2, "tex_seconds": 0.5}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> dict:
+    return {
+        "commit": _git_commit(),
+        "manim_version": _manim_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def render_once(scene_path: Path, profile: str, verbose: bool = False) -> dict:
+    """One cold render of scene_path; returns its measurements (or the error)."""
+    scene_name = preflight_check(scene_path)
+    settings = RENDER_PROFILES[profile]
+    render_flags = {
+        "profile": profile,
+        "quality": settings["quality"],
+        "resolution": f"{settings['width']},{settings['height']}",
+        "fps": settings["fps"],
+    }
+    media_dir = Path(tempfile.mkdtemp(prefix="reel-bench-"))
+    try:
+        cmd = build_manim_command(scene_path, scene_name, render_flags, media_dir, "bench.mp4")
+        telemetry = RenderTelemetry()
+        result = run_monitored(cmd, on_line=telemetry.feed, echo=(lambda line: verbose), env=manim_env())
+        summary = telemetry.summary()
+        if result.returncode != 0:
+            return {"error": f"manim exited with {result.returncode}", "output_tail": result.output[-20:]}
+        video = locate_rendered_video(media_dir, scene_path, render_flags, "bench.mp4")
+        frames = summary["frames_written"]
+        return {
+            "wall_seconds": round(result.wall_seconds, 3),
+            "frames": frames,
+            "fps": round(frames / result.wall_seconds, 2) if result.wall_seconds else None,
+            "peak_rss_bytes": result.peak_rss_bytes,
+            "tex_files": summary["tex_files"],
+            "tex_seconds": summary["tex_seconds"],
+            "animation_count": summary["animation_count"],
+            "output_bytes": video.stat().st_size,
+        }
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+
+def benchmark(scene: str, profile: str, repeat: int, verbose: bool = False) -> dict:
+    """Median of repeat runs (peak RSS: max); the individual runs are kept too."""
+    runs = []
+    for i in range(repeat):
+        print(f"[{scene}/{profile}] run {i + 1}/{repeat}...", flush=True)
+        run = render_once(SCENES[scene], profile, verbose)
+        runs.append(run)
+        if "error" in run:
+            print(f"[{scene}/{profile}] FAILED: {run['error']}")
+            return {"error": run["error"], "runs": runs}
+
+    entry = {
+        "wall_seconds": statistics.median(r["wall_seconds"] for r in runs),
+        "fps": statistics.median(r["fps"] for r in runs),
+        "peak_rss_bytes": max(r["peak_rss_bytes"] for r in runs),
+        "tex_seconds": statistics.median(r["tex_seconds"] for r in runs),
+        "frames": runs[0]["frames"],
+        "tex_files": runs[0]["tex_files"],
+        "output_bytes": runs[0]["output_bytes"],
+        "runs": runs,
+    }
+    print(f"[{scene}/{profile}] {entry['wall_seconds']:.1f}s, {entry['fps']:.1f} frames/s, "
+          f"{entry['peak_rss_bytes'] / 1024**2:.0f} MB peak, LaTeX {entry['tex_seconds']:.1f}s, "
+          f"{entry['output_bytes'] / 1024:.0f} KB")
+    return entry
+
+
+def compare(report: dict, baseline: dict, threshold: float = BENCHMARK_REGRESSION_THRESHOLD) -> list:
+    """Human-readable regressions of report vs baseline (empty if none)."""
+    regressions = []
+    for key, base in baseline["results"].items():
+        current = report["results"].get(key)
+        if current is None or "error" in base:
+            continue
+        if "error" in current:
+            regressions.append(f"{key}: now fails ({current['error']})")
+            continue
+        for metric, direction in METRICS.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change * direction
+            if worse > threshold and abs(new - old) >= MIN_DELTAS[metric]:
+                regressions.append(f"{key}: {metric} {old:g} -> {new:g} ({change:+.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Manim rendering over a fixed scene corpus.")
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=list(SCENES))
+    parser.add_argument("--profiles", nargs="+", choices=list(RENDER_PROFILES), default=DEFAULT_PROFILES)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scene and profile (median is reported)")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="Report path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline report to check against")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--verbose", action="store_true", help="Echo Manim output")
+    args = parser.parse_args()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for scene in args.scenes:
+        for profile in args.profiles:
+            report["results"][f"{scene}/{profile}"] = benchmark(scene, profile, args.repeat, args.verbose)
+
+    out = args.out or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nReport written to {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(report, baseline, args.threshold)
+        print(f"Compared with {args.compare} ({baseline['environment'].get('commit')}, "
+              f"threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  [REGRESSION] {line}")
+        if not regressions:
+            print("  No regressions.")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+from manim import *
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scene_lib import PointCloudImage, RevealPoints, chaos_game
+
+# FORCE VERTICAL LAYOUT
+config.frame_height = 16.0
+config.frame_width = 9.0
+
+
+class GeneratedScene(Scene):
+    """Benchmark: 300,000 points splatted into one image (fixed seed)."""
+
+    def construct(self):
+        title = Text("Chaos Game", font_size=42).move_to(UP * 5)
+        eq = MathTex(r"p_{k+1} = \tfrac{1}{2}\,(p_k + v_{r_k})", font_size=34).move_to(DOWN * 5)
+        self.add(title)
+
+        # Outline the triangle the points fill: data units -> scene units
+        scale = 8 / 2.3
+        vertices = [[0, 1], [-np.sqrt(3) / 2, -0.5], [np.sqrt(3) / 2, -0.5]]
+        triangle = Polygon(*[[scale * x, scale * y, 0] for x, y in vertices], color=GREY_B, stroke_width=2)
+        cloud = PointCloudImage(width=8, height=8, data_range=(-1.15, 1.15, -1.15, 1.15), color=GOLD)
+        triangle.shift(UP * 0.5)
+        cloud.shift(UP * 0.5)
+        self.play(Create(triangle), Write(eq), run_time=1.5)
+
+        self.add(cloud)
+        points = chaos_game(300_000, seed=7)
+        self.play(RevealPoints(cloud, points), run_time=8, rate_func=linear)
+        self.wait(1)
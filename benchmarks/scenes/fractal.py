@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+from manim import *
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scene_lib import FractalCurve
+
+# FORCE VERTICAL LAYOUT
+config.frame_height = 16.0
+config.frame_width = 9.0
+
+
+class GeneratedScene(Scene):
+    """Benchmark: one long path re-stroked every frame (12 dragon iterations, 4096 segments)."""
+
+    def construct(self):
+        title = Text("Dragon Curve", font_size=42).move_to(UP * 5)
+        eq = MathTex(r"z_{n+1} = \frac{1 \pm i}{2}\, z_n", font_size=34).move_to(DOWN * 5)
+        self.add(title)
+
+        curve = FractalCurve("dragon", 0, width=7, color=TEAL)
+        self.play(Create(curve), Write(eq), run_time=1.5)
+        for n in range(1, 13):
+            self.play(curve.morph_to(n), run_time=0.8, rate_func=smooth)
+        self.play(curve.animate.set_color(GOLD), run_time=1)
+        self.wait(1)
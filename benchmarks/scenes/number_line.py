@@ -0,0 +1,40 @@
+from manim import *
+
+# FORCE VERTICAL LAYOUT
+config.frame_height = 16.0
+config.frame_width = 9.0
+
+
+class GeneratedScene(Scene):
+    """Benchmark: many small mobjects and LaTeX labels, an updater-driven dot."""
+
+    def construct(self):
+        title = Text("Harmonic Series", font_size=42).move_to(UP * 5)
+        self.add(title)
+
+        line = NumberLine(
+            x_range=[0, 4, 0.5],
+            length=8,
+            include_numbers=True,
+            numbers_to_include=[0, 1, 2, 3, 4],
+        ).move_to(UP * 1)
+        self.play(Create(line), run_time=1.5)
+
+        tracker = ValueTracker(0)
+        dot = always_redraw(lambda: Dot(line.n2p(tracker.get_value()), color=YELLOW))
+        self.add(dot)
+
+        terms = VGroup()
+        for n in range(1, 9):
+            term = MathTex(rf"\frac{{1}}{{{n}}}", font_size=36)
+            terms.add(term)
+        terms.arrange(RIGHT, buff=0.25).move_to(DOWN * 2)
+
+        total = 0.0
+        for n, term in enumerate(terms, start=1):
+            total += 1 / n
+            self.play(FadeIn(term, shift=UP * 0.3), tracker.animate.set_value(total), run_time=0.8)
+
+        eq = MathTex(r"\sum_{n=1}^{N} \frac{1}{n} \approx \ln N + \gamma", font_size=40).move_to(DOWN * 5)
+        self.play(Write(eq), run_time=1.5)
+        self.wait(1)
@@ -12,10 +12,91 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # API Keys
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # OpenAI-compatible endpoint, e.g. the local stub server
 
 # Model Settings
-LLM_MODEL = "gemini-3-pro-preview"  # Default to Gemini
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-3-pro-preview")  # Default to Gemini
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "600"))
+LLM_STREAM = os.getenv("LLM_STREAM", "1") == "1"  # Stream responses and check the code as it arrives
+LLM_PROMPT_CACHE = os.getenv("LLM_PROMPT_CACHE", "1") == "1"  # Provider-side caching of the static prompt prefix
+GEMINI_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL_SECONDS", "3600"))
+
+# Render Profiles (single source of truth for resolution/fps/quality)
+RENDER_PROFILES = {
+    "draft": {"quality": "l", "width": 270, "height": 480, "fps": 15},
+    "preview": {"quality": "m", "width": 540, "height": 960, "fps": 30},
+    "final": {"quality": "h", "width": 1080, "height": 1920, "fps": 60},
+}
+DEFAULT_RENDER_PROFILE = "final"
+VALIDATION_PROFILE = "draft"  # Used by validate-first mode before promoting
+
+# Render Budget (enforced by the static cost estimator before rendering)
+MAX_DURATION_RATIO = 1.5  # Predicted video length vs requested length
+MIN_DURATION_RATIO = 0.8  # Shortest acceptable rendered candidate vs requested length
+MAX_SCENE_ELEMENTS = 50_000  # Peak mobjects/segments from multiplicative loops
+MAX_RENDER_SECONDS = 20 * 60  # Predicted render time at the chosen profile
+MAX_BUDGET_REGENERATIONS = 2  # Times an over-budget scene is sent back to the LLM
+REEL_CANDIDATES = int(os.getenv("REEL_CANDIDATES", "1"))  # Scenes raced per reel (1 = no speculation)
+MAX_REPAIR_ATTEMPTS = 2  # LLM fixes of a scene that crashes mid-render (repair mode)
+REPAIR_CONTEXT_LINES = 8  # Lines of context around the failing statement sent for repair
+
+# Benchmarks (python -m benchmarks.run --compare <baseline.json>)
+BENCHMARK_REGRESSION_THRESHOLD = 0.10  # Relative slowdown vs the baseline that fails the comparison
 
 # Reel Settings
-REEL_WIDTH = 1080
-REEL_HEIGHT = 1920
+REEL_WIDTH = RENDER_PROFILES["final"]["width"]
+REEL_HEIGHT = RENDER_PROFILES["final"]["height"]
+HALF_HEIGHT = REEL_HEIGHT // 2  # Animation / background halves of a stacked reel
+
+# Compositing (animation stacked over a background clip)
+FINAL_REELS_DIR = PROJECT_ROOT / "final_reels"
+BACKGROUND_DIR = PROJECT_ROOT / "backgrounds"  # Local library of background loops
+BACKGROUND_VOLUME = 0.2
+BACKGROUND_DURATION_STEP = 5  # Cached clips are rounded up to this many seconds
+COMPOSE_WORKERS = int(os.getenv("COMPOSE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Batch Scheduler Settings
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # In-flight LLM requests
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "20"))
+LLM_ASYNC = os.getenv("LLM_ASYNC", "0") == "1"  # Run generation on one asyncio event loop
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", str(RENDER_WORKERS * 2)))
+
+# Section-Parallel Rendering (one reel split across processes; 1 = serial)
+RENDER_SEGMENTS = int(os.getenv("RENDER_SEGMENTS", "1"))
+MIN_ANIMATIONS_PER_SEGMENT = 4
+
+# Render Backend ("cli" = one manim process per reel, "worker" = warm daemon from rendering.worker)
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "cli")
+RENDER_WORKER_PROCESSES = int(os.getenv("RENDER_WORKER_PROCESSES", str(RENDER_WORKERS)))
+RENDER_WORKER_MAX_JOBS = int(os.getenv("RENDER_WORKER_MAX_JOBS", "20"))  # Renders before a worker is replaced
+
+# Render Resource Limits (a render past these is killed with its whole process group)
+RENDER_TIMEOUT_BASE_SECONDS = float(os.getenv("RENDER_TIMEOUT_BASE_SECONDS", "120"))  # Launch + LaTeX allowance
+RENDER_TIMEOUT_PER_VIDEO_SECOND = {"draft": 3, "preview": 8, "final": 45}  # Wall seconds per requested second
+RENDER_TIMEOUT_SCALE = float(os.getenv("RENDER_TIMEOUT_SCALE", "1.0"))  # e.g. 2 on slow machines; 0 = no timeout
+RENDER_MAX_RSS_BYTES = int(os.getenv("RENDER_MAX_RSS_BYTES", str(4 * 1024**3)))  # Per render tree; 0 = no cap
+RENDER_NICE = int(os.getenv("RENDER_NICE", "10"))  # Keeps the LLM stage and the shell responsive
+RENDER_CPU_AFFINITY = os.getenv("RENDER_CPU_AFFINITY")  # e.g. "0-7,12"; None = any CPU
+
+# Caches (LLM responses, rendered videos)
+CACHE_DIR = PROJECT_ROOT / ".cache"
+LLM_CACHE_DIR = CACHE_DIR / "llm"
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+RENDER_CACHE_DIR = CACHE_DIR / "renders"  # Shared store of encodes keyed by fingerprint
+BACKGROUND_CACHE_DIR = CACHE_DIR / "backgrounds"  # Pre-cropped background clips
+BATCH_STATE_DIR = CACHE_DIR / "batch_state"  # Per-task state logs for --resume
+PROMPT_CACHE_REGISTRY = CACHE_DIR / "prompt_caches.json"  # Live Gemini cached contents by prompt version
+LLM_METRICS_LOG = Path(os.getenv("LLM_METRICS_LOG", str(CACHE_DIR / "llm_metrics.jsonl")))  # Token usage per call
+TRACE_LOG = Path(os.getenv("TRACE_LOG", str(CACHE_DIR / "traces.jsonl")))  # Stage spans (python -m observability.tracing)
+TRACING = os.getenv("TRACING", "1") == "1"
+TEX_CACHE_DIR = CACHE_DIR / "tex"  # Tex/Text SVGs shared by all reels (content-addressed by Manim)
+TEX_PREWARM_WORKERS = int(os.getenv("TEX_PREWARM_WORKERS", str(os.cpu_count() or 1)))  # Split across batch renders; 0 = no prewarm
+RENDER_WORKER_SOCKET = Path(os.getenv("RENDER_WORKER_SOCKET", str(CACHE_DIR / "render_worker.sock")))
+
+# Render Storage (Manim media trees, partial movie files, Tex SVGs)
+RENDER_SCRATCH_DIR = os.getenv("RENDER_SCRATCH_DIR")  # e.g. /dev/shm/reels; None = output/<name>/media
+KEEP_INTERMEDIATES = os.getenv("KEEP_INTERMEDIATES", "on_failure")  # "always", "on_failure" or "never"
+INTERMEDIATE_MAX_AGE_HOURS = float(os.getenv("INTERMEDIATE_MAX_AGE_HOURS", "72"))
+MEDIA_DISK_QUOTA_BYTES = int(os.getenv("MEDIA_DISK_QUOTA_BYTES", str(50 * 1024**3)))
@@ -1,9 +1,13 @@
-import math
+import sys
+from pathlib import Path
+
+import numpy as np
 from manim import *
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scene_lib import FastSurface
+
 # FORCE VERTICAL LAYOUT
-config.pixel_height = 1920
-config.pixel_width = 1080
 config.frame_height = 16.0
 config.frame_width = 9.0
 
@@ -54,25 +58,25 @@ class GeneratedScene(ThreeDScene):
         SCALE = 0.12
 
         def heart_func(u, v):
-            sv = math.sin(v)
-            cv = math.cos(v)
-
-            x_val = sv * (15 * math.sin(u) - 4 * math.sin(3 * u))
-            y_val = 8 * cv
+            # u, v are whole parameter grids; returns axes coordinates
+            sv = np.sin(v)
+            x_val = sv * (15 * np.sin(u) - 4 * np.sin(3 * u))
+            y_val = 8 * np.cos(v)
             z_val = sv * (
-                15 * math.cos(u)
-                - 5 * math.cos(2 * u)
-                - 2 * math.cos(3 * u)
-                - math.cos(4 * u)
+                15 * np.cos(u)
+                - 5 * np.cos(2 * u)
+                - 2 * np.cos(3 * u)
+                - np.cos(4 * u)
             )
+            return x_val * SCALE, y_val * SCALE, z_val * SCALE
 
-            return axes.c2p(x_val * SCALE, y_val * SCALE, z_val * SCALE)
-
-        heart = Surface(
+        heart = FastSurface(
             heart_func,
             u_range=[0, 2 * PI],
             v_range=[0, PI],
-            resolution=(64, 64),
+            resolution="auto",
+            max_resolution=(64, 64),
+            axes=axes,
             fill_opacity=0.92,
             stroke_width=0.2,
             stroke_color=WHITE,
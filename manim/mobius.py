@@ -1,9 +1,13 @@
-import math
+import sys
+from pathlib import Path
+
+import numpy as np
 from manim import *
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scene_lib import FastSurface
+
 # FORCE VERTICAL LAYOUT
-config.pixel_height = 1920
-config.pixel_width = 1080
 config.frame_height = 16.0
 config.frame_width = 9.0
 
@@ -61,18 +65,21 @@ class GeneratedScene(ThreeDScene):
         SCALE = 1.8
 
         def mobius_func(u, v):
+            # u, v are whole parameter grids; returns axes coordinates
             half_u = u / 2
-            r = 1 + (v / 2) * math.cos(half_u)
-            x_val = r * math.cos(u) * SCALE
-            y_val = r * math.sin(u) * SCALE
-            z_val = (v / 2) * math.sin(half_u) * SCALE
-            return axes.c2p(x_val, y_val, z_val)
+            r = 1 + (v / 2) * np.cos(half_u)
+            x_val = r * np.cos(u) * SCALE
+            y_val = r * np.sin(u) * SCALE
+            z_val = (v / 2) * np.sin(half_u) * SCALE
+            return x_val, y_val, z_val
 
-        strip = Surface(
+        strip = FastSurface(
             mobius_func,
             u_range=[0, 2 * PI],
             v_range=[-1, 1],
-            resolution=(80, 16),
+            resolution="auto",
+            max_resolution=(80, 16),
+            axes=axes,
             fill_opacity=0.85,
             stroke_width=0.3,
             stroke_color=WHITE,
@@ -0,0 +1 @@
+"""JSONL logs and stage tracing shared by the pipeline and rendering layers."""
@@ -0,0 +1,51 @@
+"""
+Append-only JSONL logs: one JSON object per line, shared by concurrent
+threads and processes.
+
+Used by the LLM token usage log (pipeline.llm_metrics) and the stage trace
+log (observability.tracing).
+"""
+
+import json
+import math
+import threading
+from pathlib import Path
+
+_lock = threading.Lock()
+
+
+def append(path: Path, entry: dict):
+    """Append one entry; values JSON can't encode are written as strings."""
+    path = Path(path)
+    line = json.dumps(entry, default=str) + "\n"
+    with _lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One write per line in append mode, so processes sharing the log don't interleave
+        with open(path, "a") as f:
+            f.write(line)
+
+
+def iter_entries(path: Path):
+    """Every entry in the log, oldest first; a missing log has none."""
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Interrupted mid-write
+    except FileNotFoundError:
+        return
+
+
+def group_by(entries, key) -> dict:
+    """{key(entry): [entries]} in the order each key first appears."""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(key(entry), []).append(entry)
+    return groups
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(q * len(values)) - 1)]
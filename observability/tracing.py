@@ -0,0 +1,143 @@
+"""
+Stage spans for reel creation, appended to a JSONL trace log.
+
+    with tracing.span("render", profile=profile) as s:
+        ...
+        s.set(returncode=0, output_bytes=size)
+
+Each span records its name, duration, status ("ok", "error" or
+"cancelled") and attributes, plus ids linking it to the span it ran inside
+(nesting follows contextvars, so it holds within a thread or asyncio task).
+Exceptions deriving from Cancelled (e.g. RenderCancelled) mark a span
+"cancelled" rather than "error".
+Every process started from the same command shares a run id through the
+TRACE_RUN_ID environment variable. Summarize a run with:
+
+    python -m observability.tracing [--run RUN_ID | --all] [--log .cache/traces.jsonl]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import TRACE_LOG, TRACING
+from observability import jsonl_log
+
+# Inherited by render processes, so one batch is one run
+RUN_ID = os.environ.setdefault("TRACE_RUN_ID", f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+class Cancelled(Exception):
+    """Base for deliberate stops, which spans record as "cancelled" rather than "error"."""
+
+
+class Span:
+    def __init__(self, name: str, parent: "Span", attrs: dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = dict(attrs)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def annotate(**attrs):
+    """Add attributes to the innermost open span, if any (e.g. token counts from a provider)."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as one stage; exceptions are recorded and re-raised."""
+    current = Span(name, _current.get(), attrs)
+    token = _current.set(current)
+    started = time.time()
+    start = time.monotonic()
+    status = "ok"
+    try:
+        yield current
+    except (KeyboardInterrupt, asyncio.CancelledError, GeneratorExit, Cancelled):
+        status = "cancelled"
+        raise
+    except Exception as e:
+        status = "error"
+        current.attrs.setdefault("error", f"{type(e).__name__}: {e}"[:500])
+        raise
+    finally:
+        _current.reset(token)
+        if TRACING:
+            record({
+                "run_id": RUN_ID,
+                "trace_id": current.trace_id,
+                "span_id": current.span_id,
+                "parent_id": current.parent_id,
+                "name": name,
+                "start": round(started, 3),
+                "seconds": round(time.monotonic() - start, 4),
+                "status": status,
+                **current.attrs,
+            })
+
+
+def record(entry: dict, path: Path = TRACE_LOG):
+    jsonl_log.append(path, entry)
+
+
+def iter_spans(path: Path = TRACE_LOG):
+    return jsonl_log.iter_entries(path)
+
+
+def summarize(path: Path = TRACE_LOG, run_id: str = None) -> dict:
+    """
+    Per-stage count, errors and p50/p95/max seconds, in the order stages
+    first ran. run_id=None uses the latest run in the log; "*" uses all.
+    """
+    spans = list(iter_spans(path))
+    if run_id is None and spans:
+        run_id = spans[-1].get("run_id")
+    if run_id != "*":
+        spans = [s for s in spans if s.get("run_id") == run_id]
+
+    stages = {}
+    groups = jsonl_log.group_by(sorted(spans, key=lambda s: s.get("start", 0)), lambda s: s["name"])
+    for name, group in groups.items():
+        values = sorted(s["seconds"] for s in group)
+        stages[name] = {
+            "count": len(values),
+            "errors": sum(s.get("status") != "ok" for s in group),
+            "p50": jsonl_log.percentile(values, 0.50),
+            "p95": jsonl_log.percentile(values, 0.95),
+            "max": values[-1],
+            "total": round(sum(values), 3),
+        }
+    return {"run_id": run_id, "stages": stages}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize stage timings from the trace log.")
+    parser.add_argument("--log", type=Path, default=TRACE_LOG)
+    parser.add_argument("--run", default=None, help="Run id to summarize (default: the latest)")
+    parser.add_argument("--all", action="store_true", help="Summarize every run in the log")
+    args = parser.parse_args()
+
+    summary = summarize(args.log, "*" if args.all else args.run)
+    if not summary["stages"]:
+        print(f"No spans recorded in {args.log}")
+        sys.exit(0)
+    print(f"Run: {'all' if args.all else summary['run_id']}\n")
+    print(f"{'stage':<22}{'count':>7}{'errors':>8}{'p50 s':>10}{'p95 s':>10}{'max s':>10}{'total s':>11}")
+    for name, stage in summary["stages"].items():
+        print(f"{name:<22}{stage['count']:>7}{stage['errors']:>8}{stage['p50']:>10.2f}"
+              f"{stage['p95']:>10.2f}{stage['max']:>10.2f}{stage['total']:>11.1f}")
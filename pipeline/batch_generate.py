@@ -1,57 +1,123 @@
-"""Batch generation script for creating multiple reels sequentially."""
+"""Batch generation script for creating multiple reels with pipelined stages."""
 
 import sys
-import json
-import time
+import argparse
 from pathlib import Path
-from pipeline.generate import create_reel
+from config import (
+    LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_ASYNC, RENDER_WORKERS,
+    RENDER_PROFILES, DEFAULT_RENDER_PROFILE, MAX_REPAIR_ATTEMPTS
+)
+from pipeline.compositor import Background
+from pipeline.scheduler import run_pipelined
+from pipeline.task_state import TaskStateStore, default_state_path, iter_tasks, task_id
 
-def run_batch(batch_file: str):
+def run_batch(
+    batch_file: str,
+    force_regenerate: bool = False,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    validate_first: bool = False,
+    resume: bool = False,
+    state_file: str = None,
+    use_async: bool = LLM_ASYNC,
+    repair_attempts: int = 0,
+    background: Background = None
+):
     path = Path(batch_file)
     if not path.exists():
         print(f"Error: Batch file not found at {path}")
         sys.exit(1)
-        
+
+    state_path = Path(state_file) if state_file else default_state_path(path)
+    store = TaskStateStore(state_path, resume=resume)
+    if resume:
+        print(f"Resuming from {state_path}: {store.counts() or 'no recorded tasks'}")
+    else:
+        print(f"Recording task state in {state_path} (use --resume to continue after an interruption)")
+
+    ids = {}  # Scheduler index -> task id
+    skipped = []
+
+    def runnable_tasks():
+        """Stream valid, unfinished tasks from the batch file."""
+        try:
+            for number, task in iter_tasks(path):
+                if not isinstance(task, dict) or not task.get("concept") or not task.get("description"):
+                    print(f"Skipping task {number+1}: Missing 'concept' or 'description'")
+                    continue
+                tid = task_id(task)
+                if resume and store.is_done(tid):
+                    skipped.append(task["concept"])
+                    continue
+                ids[len(ids)] = tid
+                store.update(tid, "pending", concept=task["concept"], line=number + 1)
+                yield task
+        except (ValueError, OSError) as e:
+            # Already-queued tasks still finish; the rest can be resumed once fixed
+            print(f"Error reading batch file: {e}")
+
+    def on_update(index: int, status: str, **fields):
+        store.update(ids[index], status, **fields)
+
+    print(f"\nStarting Batch Generation from {path.name}.")
+    print(f"  LLM concurrency: {LLM_CONCURRENCY} ({LLM_REQUESTS_PER_MINUTE:g} req/min), "
+          f"render workers: {RENDER_WORKERS}, profile: {profile}"
+          f"{' (validate first)' if validate_first else ''}"
+          f"{', async LLM' if use_async else ''}"
+          f"{f', up to {repair_attempts} repair(s)' if repair_attempts else ''}"
+          f"{f', stacked over {background.source}' if background else ''}")
+
     try:
-        tasks = json.loads(path.read_text())
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON: {e}")
-        sys.exit(1)
-        
-    if not isinstance(tasks, list):
-        print("Error: Batch file must contain a JSON list of objects.")
-        sys.exit(1)
-        
-    print(f"\nStarting Batch Generation: {len(tasks)} reels queued.")
+        results = run_pipelined(
+            runnable_tasks(),
+            use_cache=not force_regenerate,
+            profile=profile,
+            validate_first=validate_first,
+            on_update=on_update,
+            use_async=use_async,
+            repair_attempts=repair_attempts,
+            background=background
+        )
+    finally:
+        store.close()
+
+    if skipped:
+        print(f"\nSkipped {len(skipped)} task(s) already completed in a previous run.")
+    failed = [r for r in results if r.status != "done"]
+    print(f"\nBatch complete: {len(results) - len(failed)}/{len(results)} reels rendered.")
+    for r in failed:
+        if r.status == "resource_exceeded":
+            print(f"  KILLED ({r.limit} limit): {r.concept} ({r.error})")
+        else:
+            print(f"  FAILED: {r.concept} ({r.error})")
     
-    for i, task in enumerate(tasks):
-        concept = task.get("concept")
-        description = task.get("description")
-        length = task.get("length", 30)
-        output_name = task.get("output_name")
-        
-        if not concept or not description:
-            print(f"Skipping task {i+1}: Missing 'concept' or 'description'")
-            continue
-            
-        print(f"\n>>> PROCESSING TASK {i+1}/{len(tasks)}: {concept}")
-        
-        try:
-            create_reel(concept, description, length, output_name)
-        except Exception as e:
-            print(f"FAILED task {concept}: {e}")
-            import traceback
-            traceback.print_exc()
-            
-        # Small cooldown between tasks to be safe with APIs/resources
-        if i < len(tasks) - 1:
-            print("Cooling down for 5 seconds...")
-            time.sleep(5)
+    return results
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python -m pipeline.batch_generate <path_to_json_file>")
-        print("Example: python -m pipeline.batch_generate batches/example.json")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Generate a batch of Manim reels.",
+        epilog="Example: python -m pipeline.batch_generate batches/example.json"
+    )
+    parser.add_argument("batch_file", help="Path to a JSONL file (one task per line) or a JSON list of tasks")
+    parser.add_argument("--force-regenerate", action="store_true",
+                        help="Ignore cached LLM responses and call the model again")
+    parser.add_argument("--profile", choices=list(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE,
+                        help="Render profile (resolution/fps/quality)")
+    parser.add_argument("--validate-first", action="store_true",
+                        help="Run a draft render and only render the profile if it succeeds")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip tasks completed in a previous run and restart unfinished ones")
+    parser.add_argument("--state-file", help="Task state log (default: .cache/batch_state/<batch>-<hash>.state.jsonl)")
+    parser.add_argument("--async-llm", action="store_true", default=LLM_ASYNC,
+                        help="Run LLM generation as coroutines on one event loop (LLM_ASYNC=1)")
+    parser.add_argument("--repair", type=int, nargs="?", const=MAX_REPAIR_ATTEMPTS, default=0,
+                        metavar="N", help="Let the LLM fix scenes that crash mid-render, up to N times "
+                        f"(default {MAX_REPAIR_ATTEMPTS})")
+    parser.add_argument("--background", default=None,
+                        help="Render each reel straight into final_reels/<name>/final.mp4 stacked over this clip")
+    args = parser.parse_args()
         
-    run_batch(sys.argv[1])
+    run_batch(args.batch_file, force_regenerate=args.force_regenerate,
+              profile=args.profile, validate_first=args.validate_first,
+              resume=args.resume, state_file=args.state_file,
+              use_async=args.async_llm, repair_attempts=args.repair,
+              background=Background(args.background) if args.background else None)
@@ -0,0 +1,258 @@
+"""Compositor: stack rendered animations over local background clips.
+
+Replaces the hard-coded resume_task script. Backgrounds come from a local
+library (BACKGROUND_DIR) and are cropped/scaled once per (source, start,
+duration) into BACKGROUND_CACHE_DIR, so a batch of reels over the same few
+loops never decodes and scales the same footage twice. The prepared clip is
+looped, so the reel is always as long as its animation.
+
+A reel that hasn't been rendered yet is rendered straight into the stack
+(BackgroundStack is a FrameSink for render_from_plan), so it is encoded
+once; an already rendered mp4 is composited as is.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (
+    OUTPUT_DIR,
+    FINAL_REELS_DIR,
+    BACKGROUND_DIR,
+    BACKGROUND_CACHE_DIR,
+    BACKGROUND_VOLUME,
+    BACKGROUND_DURATION_STEP,
+    COMPOSE_WORKERS,
+    REEL_WIDTH,
+    HALF_HEIGHT,
+    RENDER_PROFILES,
+    DEFAULT_RENDER_PROFILE,
+)
+from rendering.frame_pipe import FrameSink
+from rendering.renderer import reel_output_path, render_from_plan
+
+
+@dataclass
+class Background:
+    """A background clip from the local library."""
+    source: str  # File name in BACKGROUND_DIR, or a path
+    start: float = 0.0
+    volume: float = BACKGROUND_VOLUME
+
+
+@dataclass
+class CompositionJob:
+    """One reel to composite."""
+    output_name: str
+    background: Background
+    single_encode: bool = True  # Unrendered reels: render into the stack instead of an mp4 first
+    profile: str = DEFAULT_RENDER_PROFILE
+
+
+def get_video_duration(video_path: Path) -> float:
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(video_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to get video duration: {result.stderr}")
+    return float(result.stdout.strip())
+
+
+def resolve_background(source: str) -> Path:
+    """Find a background clip in the local library."""
+    path = Path(source)
+    if not path.is_absolute():
+        path = path if path.exists() else BACKGROUND_DIR / source
+    if not path.exists():
+        raise FileNotFoundError(f"Background clip not found: {source} (library: {BACKGROUND_DIR})")
+    return path
+
+
+def prepared_background(background: Background, duration: float) -> Path:
+    """
+    A clip of the background cropped and scaled to REEL_WIDTH x HALF_HEIGHT.
+
+    Durations are rounded up to BACKGROUND_DURATION_STEP so reels of similar
+    length share one cached clip. The source is cut with input-side seeking
+    (-ss before -i), so ffmpeg never decodes the footage before start.
+    """
+    source = resolve_background(background.source)
+    length = math.ceil(duration / BACKGROUND_DURATION_STEP) * BACKGROUND_DURATION_STEP
+    stat = source.stat()
+    key = hashlib.sha256(
+        f"{source.resolve()}|{stat.st_size}|{stat.st_mtime}|{background.start}|{length}"
+        f"|{REEL_WIDTH}x{HALF_HEIGHT}".encode("utf-8")
+    ).hexdigest()[:16]
+    cached = BACKGROUND_CACHE_DIR / f"{source.stem}_{background.start:g}s_{length}s_{key}.mp4"
+    if cached.exists():
+        return cached
+
+    BACKGROUND_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Concurrent compositions of the same background wait for one encode
+    with open(cached.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if cached.exists():
+            return cached
+        print(f"Preparing background {source.name} ({background.start:g}s +{length}s)...")
+        tmp = cached.with_name(f".{cached.name}.{os.getpid()}.tmp.mp4")
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-ss", str(background.start),
+            "-t", str(length),
+            "-i", str(source),
+            "-vf", (
+                f"scale={REEL_WIDTH}:{HALF_HEIGHT}:force_original_aspect_ratio=increase,"
+                f"crop={REEL_WIDTH}:{HALF_HEIGHT},setsar=1"
+            ),
+            "-c:v", "libx264",
+            "-c:a", "aac",
+            "-y",
+            str(tmp)
+        ]
+        subprocess.run(cmd, check=True)
+        os.replace(tmp, cached)
+    return cached
+
+
+def stack_command(animation_input: list, background: Background, clip: Path, output_path: Path) -> list:
+    """ffmpeg command stacking the animation over the looped clip, ending with the animation."""
+    # The background is already cropped and scaled; only the animation is scaled here
+    filter_complex = (
+        f"[0:v]scale={REEL_WIDTH}:{HALF_HEIGHT}[top];"
+        f"[top][1:v]vstack=inputs=2:shortest=1,format=yuv420p[v];"
+        f"[1:a]volume={background.volume}[a]"
+    )
+    return [
+        "ffmpeg", "-v", "error",
+        *animation_input,
+        "-stream_loop", "-1",
+        "-i", str(clip),
+        "-filter_complex", filter_complex,
+        "-map", "[v]",
+        "-map", "[a]",
+        "-c:v", "libx264",
+        "-c:a", "aac",
+        "-shortest",
+        "-y",
+        str(output_path)
+    ]
+
+
+@dataclass
+class BackgroundStack(FrameSink):
+    """Frame sink that renders a reel straight into its composite."""
+    background: Background
+    duration: float  # Expected animation length; the prepared clip loops if it runs longer
+
+    def key(self) -> dict:
+        source = resolve_background(self.background.source)
+        stat = source.stat()
+        return {
+            "background": str(source.resolve()),
+            "background_size": stat.st_size,
+            "background_mtime": stat.st_mtime,
+            "background_start": self.background.start,
+            "background_volume": self.background.volume,
+            # Where the loop restarts
+            "background_seconds": math.ceil(self.duration / BACKGROUND_DURATION_STEP) * BACKGROUND_DURATION_STEP,
+        }
+
+    def command(self, frame_input: list, output_path: Path) -> list:
+        clip = prepared_background(self.background, self.duration)
+        return stack_command(frame_input, self.background, clip, output_path)
+
+
+def final_reel_path(output_name: str) -> Path:
+    return FINAL_REELS_DIR / output_name / "final.mp4"
+
+
+def background_sink(visual_plan_path: Path, background: Background) -> BackgroundStack:
+    """BackgroundStack for a reel, with the clip sized to the plan's requested length."""
+    plan = json.loads(Path(visual_plan_path).read_text())
+    return BackgroundStack(background, plan.get("length") or plan.get("estimated_duration") or 30)
+
+
+def compose_reel(job: CompositionJob) -> Path:
+    """
+    Stack the reel's animation over its background and mix in the background audio.
+
+    A rendered mp4 is decoded and stacked. Without one (and with
+    single_encode), the scene is rendered with its frames piped straight
+    into the stacking filter graph, so the reel is encoded once; that render
+    goes through render_from_plan (skip-if-unchanged, shared Tex cache,
+    resource limits).
+    """
+    reel_dir = OUTPUT_DIR / job.output_name
+    animation_path = reel_output_path(reel_dir, job.profile)
+    visual_plan_path = reel_dir / "visual_plan.json"
+    final_path = final_reel_path(job.output_name)
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if animation_path.exists():
+        duration = get_video_duration(animation_path)
+        print(f"Compositing {job.output_name} ({duration:.2f}s)")
+        clip = prepared_background(job.background, duration)
+        subprocess.run(stack_command(["-i", str(animation_path)], job.background, clip, final_path), check=True)
+    elif job.single_encode and visual_plan_path.exists():
+        print(f"Compositing {job.output_name} (rendering into the stack)")
+        render_from_plan(visual_plan_path, final_path, profile=job.profile,
+                         sink=background_sink(visual_plan_path, job.background))
+    else:
+        raise FileNotFoundError(f"Neither {animation_path.name} nor visual_plan.json found in {reel_dir}")
+
+    print(f"✓ Composited reel saved to: {final_path}")
+    return final_path
+
+
+def compose_batch(jobs: list, workers: int = COMPOSE_WORKERS) -> dict:
+    """Composite many reels concurrently. Returns {output_name: final path or exception}."""
+    results = {}
+
+    def run(job: CompositionJob):
+        try:
+            results[job.output_name] = compose_reel(job)
+        except Exception as e:
+            print(f"FAILED compositing {job.output_name}: {e}")
+            results[job.output_name] = e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(run, jobs))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stack rendered reels over a background clip.")
+    parser.add_argument("output_names", nargs="+", help="Reel folders under output/")
+    parser.add_argument("--background", required=True,
+                        help=f"Clip file name in {BACKGROUND_DIR.name}/ (or a path)")
+    parser.add_argument("--start", type=float, default=0.0, help="Background start offset (s)")
+    parser.add_argument("--volume", type=float, default=BACKGROUND_VOLUME)
+    parser.add_argument("--profile", choices=list(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE)
+    parser.add_argument("--no-single-encode", action="store_true",
+                        help="Don't render unrendered reels straight into the composite")
+    parser.add_argument("--workers", type=int, default=COMPOSE_WORKERS)
+    args = parser.parse_args()
+
+    background = Background(args.background, args.start, args.volume)
+    jobs = [
+        CompositionJob(name, background, not args.no_single_encode, args.profile)
+        for name in args.output_names
+    ]
+    results = compose_batch(jobs, args.workers)
+    if any(isinstance(r, Exception) for r in results.values()):
+        sys.exit(1)
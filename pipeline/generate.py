@@ -1,52 +1,318 @@
 """Simplified pipeline: Generate Manim animation ONLY."""
 
-import sys
+import argparse
+import dataclasses
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from config import PROJECT_ROOT, OUTPUT_DIR
-from pipeline.generator import generate_content
-from rendering.renderer import render_from_plan
+from config import (
+    PROJECT_ROOT, OUTPUT_DIR, RENDER_PROFILES, DEFAULT_RENDER_PROFILE, VALIDATION_PROFILE,
+    MAX_BUDGET_REGENERATIONS, MAX_REPAIR_ATTEMPTS, RENDER_SEGMENTS, REEL_CANDIDATES,
+    MIN_DURATION_RATIO, MAX_DURATION_RATIO, TEX_PREWARM_WORKERS
+)
+from observability import tracing
+from pipeline.generator import generate_content, agenerate_content, ContentOutput
+from pipeline.compositor import Background, background_sink, final_reel_path, get_video_duration
+from pipeline.repair import render_with_repair
+from rendering import storage
+from rendering.renderer import render_from_plan, reel_output_path
+from rendering.preflight import PreflightError
+from rendering.process import RenderCancelled
+from rendering.cost_estimate import RenderBudgetError, enforce_render_budget
+
+def _budget_feedback(
+    content_result: ContentOutput,
+    length: int,
+    profile: str,
+    attempt: int,
+    max_regenerations: int
+) -> str:
+    """None if the scene passes pre-flight and the budget, else feedback for the LLM."""
+    try:
+        enforce_render_budget(
+            content_result.output_dir / "scene.py",
+            length=length,
+            estimated_duration=content_result.estimated_duration,
+            profile=profile
+        )
+        return None
+    except (PreflightError, RenderBudgetError) as e:
+        return _rejection_feedback(e, attempt, max_regenerations)
+
+def _rejection_feedback(error: Exception, attempt: int, max_regenerations: int) -> str:
+    """Feedback for the LLM about a rejected scene; re-raises on the last attempt."""
+    if attempt == max_regenerations:
+        raise error
+    print(f"  [REJECTED] {error}")
+    print(f"  Regenerating ({attempt+1}/{max_regenerations})...")
+    return str(error)
+
+def generate_within_budget(
+    concept: str,
+    description: str,
+    length: int,
+    output_name: str = None,
+    template_code: str = None,
+    use_cache: bool = True,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    max_regenerations: int = MAX_BUDGET_REGENERATIONS,
+    variant: int = None,
+    cancel: threading.Event = None
+) -> ContentOutput:
+    """
+    Generate a scene and statically check it before any render is attempted.
+
+    Scenes that fail pre-flight (while streaming or after) or are predicted
+    to exceed the render budget are sent back to the LLM with the reasons,
+    up to max_regenerations times. Setting cancel abandons the LLM call in
+    flight (see generate_content).
+    """
+    feedback = None
+    for attempt in range(max_regenerations + 1):
+        try:
+            content_result = generate_content(
+                concept=concept,
+                description=description,
+                length=length,
+                output_name=output_name,
+                template_code=template_code,
+                use_cache=use_cache,
+                feedback=feedback,
+                variant=variant,
+                cancel=cancel
+            )
+        except PreflightError as e:
+            # Raised mid-stream, as soon as the partial scene is known to fail
+            feedback = _rejection_feedback(e, attempt, max_regenerations)
+            continue
+        feedback = _budget_feedback(content_result, length, profile, attempt, max_regenerations)
+        if feedback is None:
+            return content_result
+
+async def agenerate_within_budget(
+    concept: str,
+    description: str,
+    length: int,
+    output_name: str = None,
+    template_code: str = None,
+    use_cache: bool = True,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    max_regenerations: int = MAX_BUDGET_REGENERATIONS,
+    variant: int = None
+) -> ContentOutput:
+    """asyncio variant of generate_within_budget."""
+    feedback = None
+    for attempt in range(max_regenerations + 1):
+        try:
+            content_result = await agenerate_content(
+                concept=concept,
+                description=description,
+                length=length,
+                output_name=output_name,
+                template_code=template_code,
+                use_cache=use_cache,
+                feedback=feedback,
+                variant=variant
+            )
+        except PreflightError as e:
+            # Raised mid-stream, as soon as the partial scene is known to fail
+            feedback = _rejection_feedback(e, attempt, max_regenerations)
+            continue
+        feedback = _budget_feedback(content_result, length, profile, attempt, max_regenerations)
+        if feedback is None:
+            return content_result
+
+def race_candidates(
+    concept: str,
+    description: str,
+    length: int,
+    output_name: str,
+    candidates: int,
+    template_code: str = None,
+    use_cache: bool = True,
+    profile: str = DEFAULT_RENDER_PROFILE
+) -> ContentOutput:
+    """
+    Generate `candidates` scenes concurrently and draft-render each as soon as it arrives.
+
+    The first candidate whose draft renders and lands within the duration
+    target (MIN_DURATION_RATIO..MAX_DURATION_RATIO of length) wins: its
+    scene is copied into output/<output_name>, every other LLM stream is
+    aborted and every other draft render killed. Once all candidates have
+    stopped, their output/<output_name>_candidateN dirs (and scratch media)
+    are removed in the background. Raises RuntimeError if no candidate
+    succeeds.
+    """
+    cancel = threading.Event()
+    start = time.monotonic()
+
+    def attempt(i: int) -> ContentOutput:
+        content_result = generate_within_budget(
+            concept=concept,
+            description=description,
+            length=length,
+            output_name=f"{output_name}_candidate{i}",
+            template_code=template_code,
+            use_cache=use_cache,
+            profile=profile,
+            variant=i or None,
+            cancel=cancel
+        )
+        if cancel.is_set():
+            raise RenderCancelled("another candidate already won")
+        draft_path = reel_output_path(content_result.output_dir, VALIDATION_PROFILE)
+        render_from_plan(
+            content_result.output_dir / "visual_plan.json",
+            draft_path,
+            use_cache=use_cache,
+            profile=VALIDATION_PROFILE,
+            segments=1,  # Candidates already fill the cores
+            cancel=cancel,
+            tex_workers=min(TEX_PREWARM_WORKERS, max(1, TEX_PREWARM_WORKERS // candidates))
+        )
+        duration = get_video_duration(draft_path)
+        if not length * MIN_DURATION_RATIO <= duration <= length * MAX_DURATION_RATIO:
+            raise RuntimeError(f"draft is {duration:.1f}s, target is {length}s")
+        return content_result
+
+    pool = ThreadPoolExecutor(max_workers=candidates)
+    futures = {pool.submit(attempt, i): i for i in range(candidates)}
+    errors = []
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                winner = future.result()
+            except Exception as e:
+                print(f"  [CANDIDATE {i}] Failed: {e}")
+                errors.append(f"candidate {i}: {e}")
+                continue
+            print(f"  [CANDIDATE {i}] Won after {time.monotonic() - start:.1f}s; "
+                  f"cancelling {len(futures) - len(errors) - 1} other(s)")
+            return _promote_candidate(winner, OUTPUT_DIR / output_name)
+        raise RuntimeError(f"All {candidates} candidates failed:\n" + "\n".join(errors))
+    finally:
+        # Losers' streams are aborted and their renders killed
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        candidate_dirs = [OUTPUT_DIR / f"{output_name}_candidate{i}" for i in range(candidates)]
+        threading.Thread(target=_remove_candidates, args=(pool, candidate_dirs), name="candidate-cleanup").start()
+
+def _remove_candidates(pool: ThreadPoolExecutor, candidate_dirs: list):
+    """Once every candidate has stopped writing, delete their scene dirs and media."""
+    pool.shutdown(wait=True)
+    for candidate_dir in candidate_dirs:
+        shutil.rmtree(storage.media_workspace(candidate_dir), ignore_errors=True)
+        shutil.rmtree(candidate_dir, ignore_errors=True)
+
+def _promote_candidate(winner: ContentOutput, output_dir: Path) -> ContentOutput:
+    """Copy the winning candidate's scene into the reel's own output directory."""
+    output_dir.mkdir(exist_ok=True)
+    for name in ("visual_plan.json", "scene.py"):
+        shutil.copy2(winner.output_dir / name, output_dir / name)
+    return dataclasses.replace(winner, output_dir=output_dir)
 
 def create_reel(
     concept: str,
     description: str,
     length: int = 30,
     output_name: str = None,
-    template_path: str = None
+    template_path: str = None,
+    force_regenerate: bool = False,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    validate_first: bool = False,
+    segments: int = RENDER_SEGMENTS,
+    candidates: int = REEL_CANDIDATES,
+    repair_attempts: int = 0,
+    background: Background = None
 ) -> Path:
     """
     Create a Manim reel from concept and description.
+
+    Set force_regenerate to bypass the LLM response cache. profile selects an
+    entry of config.RENDER_PROFILES; validate_first renders a draft before it.
+    segments > 1 splits the render across that many Manim processes.
+    candidates > 1 races that many generated scenes through draft renders
+    and renders the first one that succeeds (see race_candidates).
+    repair_attempts > 0 sends a scene that crashes mid-render back to the
+    LLM with the failing region, up to that many times (see pipeline.repair).
+    With a background, the render is streamed straight into the stacked
+    final_reels/<name>/final.mp4 (one encode) instead of final_reel.mp4.
     """
     if output_name is None:
         output_name = concept.lower().replace(" ", "_")
     
-    print(f"\n{'='*60}")
-    print(f"CREATING MANIM REEL: {concept}")
-    print(f"{'='*60}\n")
+    with tracing.span("create_reel", concept=concept, length=length, profile=profile,
+                      candidates=candidates, repair_attempts=repair_attempts) as reel:
+        print(f"\n{'='*60}")
+        print(f"CREATING MANIM REEL: {concept}")
+        print(f"{'='*60}\n")
     
-    # Step 1: Generate Manim content
-    print("Step 1/2: Generating Manim content...")
+        # Step 1: Generate Manim content
+        print("Step 1/2: Generating Manim content...")
     
-    template_code = None
-    if template_path:
-        template_file = Path(template_path)
-        if template_file.exists():
-             print(f"  [TEMPLATE MODE] Using style from: {template_file.name}")
-             template_code = template_file.read_text()
-
-    content_result = generate_content(
-        concept=concept,
-        description=description,
-        length=length,
-        output_name=output_name,
-        template_code=template_code
-    )
+        template_code = None
+        if template_path:
+            template_file = Path(template_path)
+            if template_file.exists():
+                 print(f"  [TEMPLATE MODE] Using style from: {template_file.name}")
+                 template_code = template_file.read_text()
+
+        if candidates > 1:
+            print(f"  [SPECULATIVE] Racing {candidates} candidates through {VALIDATION_PROFILE} renders")
+            content_result = race_candidates(
+                concept=concept,
+                description=description,
+                length=length,
+                output_name=output_name,
+                candidates=candidates,
+                template_code=template_code,
+                use_cache=not force_regenerate,
+                profile=profile
+            )
+        else:
+            content_result = generate_within_budget(
+                concept=concept,
+                description=description,
+                length=length,
+                output_name=output_name,
+                template_code=template_code,
+                use_cache=not force_regenerate,
+                profile=profile
+            )
     
-    # Step 2: Render
-    print("\nStep 2/2: Rendering Manim animation...")
-    visual_plan_path = content_result.output_dir / "visual_plan.json"
-    animation_path = content_result.output_dir / "final_reel.mp4"
+        # Step 2: Render
+        print("\nStep 2/2: Rendering Manim animation...")
+        visual_plan_path = content_result.output_dir / "visual_plan.json"
+        animation_path = reel_output_path(content_result.output_dir, profile)
+        sink = None
+        if background is not None:
+            animation_path = final_reel_path(content_result.output_dir.name)
+            animation_path.parent.mkdir(parents=True, exist_ok=True)
+            sink = background_sink(visual_plan_path, background)
     
-    render_from_plan(visual_plan_path, animation_path)
+        if repair_attempts > 0:
+            render_with_repair(
+                visual_plan_path,
+                animation_path,
+                max_attempts=repair_attempts,
+                profile=profile,
+                validate_first=validate_first,
+                segments=segments,
+                sink=sink
+            )
+        else:
+            render_from_plan(
+                visual_plan_path,
+                animation_path,
+                profile=profile,
+                validate_first=validate_first,
+                segments=segments,
+                sink=sink
+            )
+        reel.set(output=str(animation_path))
     
     print(f"\n{'='*60}")
     print(f"✓ REEL COMPLETE: {animation_path}")
@@ -55,13 +321,33 @@ def create_reel(
     return animation_path
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python -m pipeline.generate '<concept>' '<description>' [length] [output_name]")
-        sys.exit(1)
-    
-    concept = sys.argv[1]
-    description = sys.argv[2]
-    length = int(sys.argv[3]) if len(sys.argv) > 3 else 30
-    output_name = sys.argv[4] if len(sys.argv) > 4 else None
+    parser = argparse.ArgumentParser(
+        description="Generate a single Manim reel.",
+        usage="python -m pipeline.generate '<concept>' '<description>' [length] [output_name]"
+    )
+    parser.add_argument("concept")
+    parser.add_argument("description")
+    parser.add_argument("length", nargs="?", type=int, default=30)
+    parser.add_argument("output_name", nargs="?", default=None)
+    parser.add_argument("--force-regenerate", action="store_true",
+                        help="Ignore cached LLM responses and call the model again")
+    parser.add_argument("--profile", choices=list(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE,
+                        help="Render profile (resolution/fps/quality)")
+    parser.add_argument("--validate-first", action="store_true",
+                        help="Run a draft render and only render the profile if it succeeds")
+    parser.add_argument("--segments", type=int, default=RENDER_SEGMENTS,
+                        help="Render the reel as N parallel segments (1 = serial)")
+    parser.add_argument("--candidates", type=int, default=REEL_CANDIDATES,
+                        help="Generate N scenes concurrently and keep the first whose draft render succeeds")
+    parser.add_argument("--repair", type=int, nargs="?", const=MAX_REPAIR_ATTEMPTS, default=0,
+                        metavar="N", help="Let the LLM fix a scene that crashes mid-render, up to N times "
+                        f"(default {MAX_REPAIR_ATTEMPTS})")
+    parser.add_argument("--background", default=None,
+                        help="Render straight into final_reels/<name>/final.mp4 stacked over this clip")
+    args = parser.parse_args()
     
-    create_reel(concept, description, length, output_name)
+    create_reel(args.concept, args.description, args.length, args.output_name,
+                force_regenerate=args.force_regenerate, profile=args.profile,
+                validate_first=args.validate_first, segments=args.segments,
+                candidates=args.candidates, repair_attempts=args.repair,
+                background=Background(args.background) if args.background else None)
@@ -1,7 +1,10 @@
 """Content generator using GPT or Gemini - outputs Manim scene code only."""
 
 import json
+import os
 import textwrap
+import threading
+import time
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -9,8 +12,11 @@ import sys
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import OPENAI_API_KEY, GEMINI_API_KEY, LLM_MODEL, OUTPUT_DIR
+from config import LLM_MODEL, LLM_STREAM, OUTPUT_DIR
 from pipeline.prompts import COMBINED_GENERATION_PROMPT
+from pipeline import llm_cache, providers
+from pipeline.stream_parse import StreamingScene
+from observability import tracing
 
 
 @dataclass
@@ -19,6 +25,8 @@ class ContentOutput:
     manim_code: str
     estimated_duration: int
     output_dir: Path
+    generation_seconds: float = None  # None for cached responses
+    ttft_seconds: float = None  # Time to first token, streamed responses only
 
 
 def generate_content(
@@ -26,43 +34,238 @@ def generate_content(
     description: str,
     length: int,
     output_name: str = None,
-    template_code: str = None
+    template_code: str = None,
+    use_cache: bool = True,
+    feedback: str = None,
+    stream: bool = LLM_STREAM,
+    variant: int = None,
+    cancel: threading.Event = None
 ) -> ContentOutput:
-    """Generate Manim scene code for an animation."""
+    """
+    Generate Manim scene code for an animation.
+
+    Responses are cached on disk keyed by model, system prompt, user prompt
+    and template; pass use_cache=False to force a fresh LLM call. feedback
+    explains why a previous attempt was rejected and is added to the prompt.
+    variant numbers one of several candidates generated for the same task,
+    asking for a distinct take (and so a distinct cache entry).
+
+    With stream=True the code is written to scene.partial.py as it arrives
+    and checked statement by statement; a scene that is already known to
+    fail raises PreflightError before the response has finished.
+    Setting cancel abandons the LLM call (mid-stream when streaming) with
+    providers.GenerationCancelled.
+    """
+    with tracing.span("prompt_build", concept=concept, length=length) as s:
+        user_prompt = _build_user_prompt(concept, description, length, template_code, feedback, variant)
+        system_prompt = COMBINED_GENERATION_PROMPT
+        context = _template_context(template_code)
+        key = llm_cache.cache_key(LLM_MODEL, system_prompt, user_prompt, template_code)
+        s.set(prompt_chars=len(user_prompt) + len(context or ""), template=bool(template_code),
+              variant=variant, retry=bool(feedback))
     
-    user_prompt = f"""Concept: {concept}
-Description: {description}
-Target length: {length} seconds MINIMUM. Use the FULL time to explain thoroughly. Don't rush.
+    with tracing.span("llm_request", model=LLM_MODEL, concept=concept, stream=stream) as s:
+        content = llm_cache.get(key) if use_cache else None
+        timing = {}
+        s.set(cached=content is not None)
+    
+        if content is not None:
+            print(f"  [CACHE HIT] Reusing LLM response {key[:12]}")
+        elif stream:
+            streamer = StreamingScene(_reel_dir(concept, output_name) / "scene.partial.py")
+            chunks = providers.stream(user_prompt, system_prompt, context=context, cancel=cancel)
+            try:
+                for chunk in chunks:
+                    streamer.feed(chunk)
+            finally:
+                chunks.close()
+                streamer.close()
+            content, timing = streamer.text, _stream_timing(streamer)
+            llm_cache.put(key, content, LLM_MODEL)
+        else:
+            start = time.monotonic()
+            content = providers.complete(user_prompt, system_prompt, context=context, cancel=cancel)
+            timing = {"generation_seconds": time.monotonic() - start}
+            llm_cache.put(key, content, LLM_MODEL)
+        s.set(response_bytes=len(content.encode("utf-8")), ttft_seconds=timing.get("ttft_seconds"))
+    
+    return _write_scene(content, concept, length, output_name, timing)
 
-"""
 
-    if template_code:
-        user_prompt += f"""
-IMPORTANT: STYLE TRANSFER MODE
+async def agenerate_content(
+    concept: str,
+    description: str,
+    length: int,
+    output_name: str = None,
+    template_code: str = None,
+    use_cache: bool = True,
+    feedback: str = None,
+    stream: bool = LLM_STREAM,
+    variant: int = None
+) -> ContentOutput:
+    """asyncio variant of generate_content, sharing its cache and output handling."""
+    with tracing.span("prompt_build", concept=concept, length=length) as s:
+        user_prompt = _build_user_prompt(concept, description, length, template_code, feedback, variant)
+        system_prompt = COMBINED_GENERATION_PROMPT
+        context = _template_context(template_code)
+        key = llm_cache.cache_key(LLM_MODEL, system_prompt, user_prompt, template_code)
+        s.set(prompt_chars=len(user_prompt) + len(context or ""), template=bool(template_code),
+              variant=variant, retry=bool(feedback))
+
+    with tracing.span("llm_request", model=LLM_MODEL, concept=concept, stream=stream) as s:
+        content = llm_cache.get(key) if use_cache else None
+        timing = {}
+        s.set(cached=content is not None)
+
+        if content is not None:
+            print(f"  [CACHE HIT] Reusing LLM response {key[:12]}")
+        elif stream:
+            streamer = StreamingScene(_reel_dir(concept, output_name) / "scene.partial.py")
+            chunks = providers.astream(user_prompt, system_prompt, context=context)
+            try:
+                async for chunk in chunks:
+                    streamer.feed(chunk)
+            finally:
+                await chunks.aclose()
+                streamer.close()
+            content, timing = streamer.text, _stream_timing(streamer)
+            llm_cache.put(key, content, LLM_MODEL)
+        else:
+            start = time.monotonic()
+            content = await providers.acomplete(user_prompt, system_prompt, context=context)
+            timing = {"generation_seconds": time.monotonic() - start}
+            llm_cache.put(key, content, LLM_MODEL)
+        s.set(response_bytes=len(content.encode("utf-8")), ttft_seconds=timing.get("ttft_seconds"))
+
+    return _write_scene(content, concept, length, output_name, timing)
+
+
+def _stream_timing(streamer: StreamingScene) -> dict:
+    timing = {
+        "generation_seconds": time.monotonic() - streamer.started,
+        "ttft_seconds": streamer.ttft_seconds,
+    }
+    if timing["ttft_seconds"] is not None:
+        print(f"  [STREAM] First token after {timing['ttft_seconds']:.2f}s, "
+              f"complete after {timing['generation_seconds']:.2f}s")
+    return timing
+
+
+def _reel_dir(concept: str, output_name: str = None) -> Path:
+    if output_name is None:
+        output_name = concept.lower().replace(" ", "_")
+    reel_output_dir = OUTPUT_DIR / output_name
+    reel_output_dir.mkdir(exist_ok=True)
+    return reel_output_dir
+
+
+def _template_context(template_code: str = None) -> str:
+    """
+    Style-transfer instructions and template, sent as a separate message
+    before the user prompt so providers can cache them with the system prompt.
+    """
+    if not template_code:
+        return None
+    return f"""IMPORTANT: STYLE TRANSFER MODE
 The user has provided a TEMPLATE scene below. You must:
 1. COPY the exact visual style (colors, fonts, sizes, grid style, background).
 2. COPY the exact code structure (setup, intro, main loop, outro).
-3. ONLY change the mathematical content/objects to explain '{concept}'.
+3. ONLY change the mathematical content/objects to explain the concept given in the next message.
 4. Keep the same animation pacing and transitions.
 
 TEMPLATE CODE:
 ```python
 {template_code}
 ```
+"""
+
+
+def _build_user_prompt(
+    concept: str,
+    description: str,
+    length: int,
+    template_code: str = None,
+    feedback: str = None,
+    variant: int = None
+) -> str:
+    """The per-request part of the prompt; the template goes in _template_context()."""
+    user_prompt = f"""Concept: {concept}
+Description: {description}
+Target length: {length} seconds MINIMUM. Use the FULL time to explain thoroughly. Don't rush.
+
+"""
+
+    if template_code:
+        user_prompt += """
+IMPORTANT: STYLE TRANSFER MODE is on. Follow the TEMPLATE scene provided above.
+
+"""
+
+    if feedback:
+        user_prompt += f"""
+IMPORTANT: A PREVIOUS ATTEMPT WAS REJECTED BEFORE RENDERING:
+{feedback}
+Fix these problems in your new version.
+
+"""
+
+    if variant:
+        user_prompt += f"""
+CANDIDATE {variant}: Several versions of this scene are being generated independently.
+Pick your own visual approach and layout rather than the most obvious one.
+
 """
 
     user_prompt += "Generate the complete Manim scene code."
+    return user_prompt
 
+
+def _write_scene(
+    content: str,
+    concept: str,
+    length: int,
+    output_name: str = None,
+    timing: dict = None
+) -> ContentOutput:
+    """Parse the LLM response and write visual_plan.json and scene.py."""
+    timing = timing or {}
+    with tracing.span("parse", concept=concept, response_bytes=len(content.encode("utf-8"))) as s:
+        data, manim_code, scene_content = _parse_scene(content, concept, length)
+        s.set(scene_lines=scene_content.count("\n"))
     
-    # Select prompt (Always use 2D vertical prompt for now)
-    system_prompt = COMBINED_GENERATION_PROMPT
+    # Create output directory
+    reel_output_dir = _reel_dir(concept, output_name)
     
-    # Check if using Gemini or OpenAI
-    if LLM_MODEL.startswith("gemini"):
-        content = _generate_with_gemini(user_prompt, system_prompt)
-    else:
-        content = _generate_with_openai(user_prompt, system_prompt)
+    with tracing.span("scene_write", concept=concept, scene_bytes=len(scene_content.encode("utf-8"))):
+        # Save visual_plan.json (for reference/debugging)
+        (reel_output_dir / "visual_plan.json").write_text(json.dumps({
+            "manim_code": data["manim_code"],
+            "estimated_duration": data.get("estimated_duration", length),
+            "length": length,
+            "generation": {
+                "cached": not timing,
+                "generation_seconds": timing.get("generation_seconds"),
+                "ttft_seconds": timing.get("ttft_seconds"),
+            }
+        }, indent=2))
+    
+        # Replace scene.py in one step so a render never sees a half-written file
+        tmp_path = reel_output_dir / "scene.py.tmp"
+        tmp_path.write_text(scene_content)
+        os.replace(tmp_path, reel_output_dir / "scene.py")
+        (reel_output_dir / "scene.partial.py").unlink(missing_ok=True)
     
+    return ContentOutput(
+        manim_code=manim_code,
+        estimated_duration=data.get("estimated_duration", length),
+        output_dir=reel_output_dir,
+        generation_seconds=timing.get("generation_seconds"),
+        ttft_seconds=timing.get("ttft_seconds")
+    )
+
+
+def _parse_scene(content: str, concept: str, length: int) -> tuple:
+    """(response data, cleaned manim_code, scene.py source) for an LLM response."""
     # Clean the code (simple strip)
     content = content.strip()
     # If the model returned markdown json block, strip it
@@ -78,21 +281,10 @@ TEMPLATE CODE:
         print("Warning: LLM did not return valid JSON. Attempting to parse raw.")
         data = {"manim_code": content, "estimated_duration": length}
     
-    # Create output directory
-    if output_name is None:
-        output_name = concept.lower().replace(" ", "_")
-    
-    reel_output_dir = OUTPUT_DIR / output_name
-    reel_output_dir.mkdir(exist_ok=True)
-    
     # Remove any extra newlines or BOM marks
     manim_code = data.get("manim_code", "").strip()
-
-    # Save visual_plan.json (for reference/debugging)
-    (reel_output_dir / "visual_plan.json").write_text(json.dumps({
-        "manim_code": manim_code,
-        "estimated_duration": data.get("estimated_duration", length)
-    }, indent=2))
+    manim_code = _strip_render_overrides(manim_code)
+    data["manim_code"] = manim_code  # As saved in visual_plan.json
     
     # Generate scene.py logic
     # Detect if LLM gave a full file or just construct body
@@ -132,52 +324,20 @@ class GeneratedScene(Scene):
 {chr(10).join(lines)}
 '''
     
-    (reel_output_dir / "scene.py").write_text(scene_content)
-    
-    return ContentOutput(
-        manim_code=manim_code,
-        estimated_duration=data.get("estimated_duration", length),
-        output_dir=reel_output_dir
-    )
+    return data, manim_code, scene_content
 
 
-def _generate_with_openai(user_prompt: str, system_prompt: str) -> str:
-    """Generate content using OpenAI API."""
-    from openai import OpenAI
-    
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY not set. Check your .env file.")
-    
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    
-    response = client.chat.completions.create(
-        model=LLM_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
-    
-    return response.choices[0].message.content
+def _strip_render_overrides(manim_code: str) -> str:
+    """
+    Drop pixel size / frame rate assignments from generated code.
 
-
-def _generate_with_gemini(user_prompt: str, system_prompt: str) -> str:
-    """Generate content using Google Gemini API."""
-    import google.generativeai as genai
-    
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not set. Check your .env file.")
-    
-    genai.configure(api_key=GEMINI_API_KEY)
-    
-    model = genai.GenerativeModel(
-        model_name=LLM_MODEL,
-        system_instruction=system_prompt,
-        generation_config={
-            "response_mime_type": "application/json"
-        }
+    Module-level config.* assignments run after Manim parses its CLI flags,
+    so leaving them in would silently override the selected render profile.
+    """
+    import re
+    return re.sub(
+        r'^[ \t]*config\.(pixel_height|pixel_width|frame_rate)\s*=.*\n?',
+        '',
+        manim_code,
+        flags=re.MULTILINE
     )
-    
-    response = model.generate_content(user_prompt)
-    return response.text
@@ -0,0 +1,105 @@
+"""Content-addressed on-disk cache for raw LLM responses."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config import LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_MAX_AGE_DAYS
+
+_lock = threading.Lock()
+_totals = {}  # cache dir -> size after its last evict() plus what put() has written since
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, template_code: str = None) -> str:
+    """Hash everything that determines the LLM's answer."""
+    h = hashlib.sha256()
+    for part in (model, system_prompt, user_prompt, template_code or ""):
+        data = part.encode("utf-8")
+        # Length-prefix each part so boundaries can't collide
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def _entry_path(key: str, cache_dir: Path) -> Path:
+    return cache_dir / key[:2] / f"{key}.json"
+
+
+def get(key: str, cache_dir: Path = LLM_CACHE_DIR) -> str:
+    """Return the cached response text for key, or None on a miss."""
+    path = _entry_path(key, cache_dir)
+    try:
+        entry = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if time.time() - entry.get("created", 0) > LLM_CACHE_MAX_AGE_DAYS * 86400:
+        path.unlink(missing_ok=True)
+        return None
+
+    # Touch on hit so eviction is least-recently-used, not oldest-written
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass  # Evicted by a concurrent put() since it was read
+    return entry["response"]
+
+
+def put(key: str, response: str, model: str, cache_dir: Path = LLM_CACHE_DIR):
+    """
+    Store a response atomically. The cache is only scanned and evicted once
+    the running size total crosses max bytes (and on the first put of a
+    process), not on every write.
+    """
+    path = _entry_path(key, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({
+        "model": model,
+        "created": time.time(),
+        "response": response,
+    }).encode("utf-8")
+    try:
+        replaced = path.stat().st_size
+    except FileNotFoundError:
+        replaced = 0
+    # A unique temp file per write, so threads storing the same key don't share one
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+    with _lock:
+        total = _totals.get(Path(cache_dir))
+        if total is not None:
+            total = _totals[Path(cache_dir)] = total + len(data) - replaced
+    if total is None or total > LLM_CACHE_MAX_BYTES:
+        evict(cache_dir, LLM_CACHE_MAX_BYTES)
+
+
+def evict(cache_dir: Path = LLM_CACHE_DIR,
+          max_bytes: int = LLM_CACHE_MAX_BYTES,
+          max_age_days: float = LLM_CACHE_MAX_AGE_DAYS):
+    """Drop expired entries, then least-recently-used ones until under max_bytes."""
+    entries = []
+    cutoff = time.time() - max_age_days * 86400
+    for path in cache_dir.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+    with _lock:
+        _totals[Path(cache_dir)] = total
@@ -0,0 +1,55 @@
+"""
+Token usage log for LLM calls.
+
+Every provider call appends one JSON line with its input, cached-input and
+output token counts. Summarize with:
+
+    python -m pipeline.llm_metrics [--log .cache/llm_metrics.jsonl]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from config import LLM_METRICS_LOG
+from observability import jsonl_log
+
+
+def record(path: Path = LLM_METRICS_LOG, **fields):
+    """Append one usage record (model, prompt_version, *_tokens, seconds, ...)."""
+    jsonl_log.append(path, {"time": time.time(), **fields})
+
+
+def iter_records(path: Path = LLM_METRICS_LOG):
+    return jsonl_log.iter_entries(path)
+
+
+def summarize(path: Path = LLM_METRICS_LOG) -> dict:
+    """Totals per model and prompt version."""
+    groups = jsonl_log.group_by(
+        iter_records(path), lambda entry: f"{entry.get('model')} / {entry.get('prompt_version')}"
+    )
+    totals = {}
+    for key, entries in groups.items():
+        totals[key] = {
+            "calls": len(entries),
+            **{field: sum(e.get(field) or 0 for e in entries)
+               for field in ("input_tokens", "cached_tokens", "output_tokens")},
+            "seconds": sum(e.get("seconds") or 0.0 for e in entries),
+        }
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize LLM token usage.")
+    parser.add_argument("--log", type=Path, default=LLM_METRICS_LOG)
+    args = parser.parse_args()
+
+    groups = summarize(args.log)
+    if not groups:
+        print(f"No LLM calls recorded in {args.log}")
+    for key, g in sorted(groups.items()):
+        cached_share = g["cached_tokens"] / g["input_tokens"] if g["input_tokens"] else 0.0
+        print(f"{key}: {g['calls']} calls, {g['input_tokens']} input tokens "
+              f"({cached_share:.0%} cached), {g['output_tokens']} output tokens, "
+              f"{g['seconds'] / g['calls']:.1f}s per call")
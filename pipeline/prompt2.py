@@ -157,8 +157,11 @@ When the concept involves a **function, equation, or graph**:
     )
     self.add(axes)  # Axes present instantly
 
-    surface = Surface(lambda u, v: axes.c2p(u, v, np.sin(u)*np.cos(v)),
-                      u_range=[-3,3], v_range=[-3,3], resolution=(30,30))
+    # FastSurface evaluates the function once over the whole (u, v) grid:
+    # use np.sin/np.cos (not math) and return axes coordinates, not c2p
+    surface = FastSurface(lambda u, v: (u, v, np.sin(u)*np.cos(v)), axes=axes,
+                          u_range=[-3,3], v_range=[-3,3], resolution="auto",
+                          max_resolution=30)
 
     # Camera setup — zoom=1.0 so the surface is prominent
     self.set_camera_orientation(phi=75 * DEGREES, theta=-90 * DEGREES, zoom=1.0)
@@ -175,13 +178,48 @@ When the concept involves a **function, equation, or graph**:
     self.stop_ambient_camera_rotation()
     ```
 
+═══════════════════════════════════════════════════════════════
+🌀 FRACTAL CURVES (USE THE LIBRARY)
+═══════════════════════════════════════════════════════════════
+*   For Levy C, Dragon, Koch snowflake, Sierpinski (arrowhead) and Hilbert curves, do NOT build them from `Line` objects. Use `FractalCurve` from `scene_lib` — each iteration is ONE VMobject built from a NumPy array, so 16+ iterations render smoothly.
+*   Kinds: `"levy"`, `"dragon"`, `"koch"`, `"sierpinski"`, `"hilbert"` (hilbert starts at iteration 1).
+*   Every iteration is fitted to the same box (`width=`, optional `height=`, `center=`), so it never grows off-screen.
+*   Morph between iterations with `curve.morph_to(n)`, which returns an animation:
+    ```python
+    from scene_lib import FractalCurve
+
+    curve = FractalCurve("levy", 0, width=7.0, center=UP * 0.5, stroke_width=2)
+    curve.set_color_by_gradient(c1, c2)
+    self.play(Create(curve), Write(eq), run_time=1)
+    for n in range(1, 17):
+        self.play(curve.morph_to(n), self.camera.frame.animate.scale(0.97), run_time=0.8, rate_func=smooth)
+        self.wait(0.3)
+    ```
+*   Lower `stroke_width` (1-2) at high iterations so the detail stays visible.
+
+═══════════════════════════════════════════════════════════════
+✨ DENSE POINTS (CHAOS GAME, ULAM SPIRAL, SCATTER)
+═══════════════════════════════════════════════════════════════
+*   NEVER create more than ~200 `Dot` mobjects. For chaos games, prime spirals and other scenes with thousands of points, use `PointCloudImage` + `RevealPoints` from `scene_lib`: the points are drawn into ONE image, so 100k points render as fast as a static picture.
+*   Helpers: `chaos_game(count, vertices=None, ratio=0.5, seed=0)` returns (count, 2) points (default: Sierpinski triangle inside [-0.87, 0.87] x [-0.5, 1]); `ulam_spiral(count)` returns `(points, is_prime)` on an integer grid centered at 0.
+    ```python
+    from scene_lib import PointCloudImage, RevealPoints, chaos_game
+
+    points = chaos_game(100_000)
+    cloud = PointCloudImage(width=8, height=8, data_range=(-1, 1, -0.75, 1.25), color=c1)
+    self.add(cloud)
+    self.play(RevealPoints(cloud, points[:2000]), Write(eq), run_time=2)
+    self.play(RevealPoints(cloud, points[2000:], color=c2), run_time=8, rate_func=linear)
+    ```
+*   `data_range=(xmin, xmax, ymin, ymax)` is the region of point coordinates mapped onto the image. Keep its aspect ratio equal to width/height.
+
 ═══════════════════════════════════════════════════════════════
 🛠️ PYTHON CODE REQUIREMENTS
 ═══════════════════════════════════════════════════════════════
 *   Return a **JSON** object containing the code.
 *   Class name: `GeneratedScene` inheriting from `MovingCameraScene` (for 2D) or `ThreeDScene` (for 3D).
-*   Imports: `from manim import *` and `import random`.
-*   **CRITICAL**: You MUST set the config at the top of the file to ensure vertical aspect ratio.
+*   Imports: `from manim import *` and `import random`. For fractal curves also `from scene_lib import FractalCurve`; for dense point sets `from scene_lib import PointCloudImage, RevealPoints, chaos_game, ulam_spiral`. For 3D surfaces also `import numpy as np` and `from scene_lib import FastSurface` (never manim's `Surface`, which is far slower to render).
+*   **CRITICAL**: You MUST set `config.frame_height = 16.0` and `config.frame_width = 9.0` at the top of the file to ensure vertical aspect ratio. Do NOT set `config.pixel_height`, `config.pixel_width` or `config.frame_rate` — resolution and fps are chosen by the renderer.
 
 ═══════════════════════════════════════════════════════════════
 🎯 MathTex SYNTAX (CRITICAL FOR PROPER RENDERING)
@@ -255,7 +293,7 @@ self.play(Transform(sum_text, new_text))  # Morphs old into new
 
 **JSON Output Format**:
 {
-  "manim_code": "import random\\nfrom manim import *\\n\\n# FORCE VERTICAL LAYOUT\\nconfig.pixel_height = 1920\\nconfig.pixel_width = 1080\\nconfig.frame_height = 16.0\\nconfig.frame_width = 9.0\\n\\nclass GeneratedScene(Scene):\\n    def construct(self):\\n        # 1. Setup Theme\\n        c1, c2 = random.choice([(BLUE, TEAL), (RED, ORANGE)])\\n...",
+  "manim_code": "import random\\nfrom manim import *\\n\\n# FORCE VERTICAL LAYOUT\\nconfig.frame_height = 16.0\\nconfig.frame_width = 9.0\\n\\nclass GeneratedScene(Scene):\\n    def construct(self):\\n        # 1. Setup Theme\\n        c1, c2 = random.choice([(BLUE, TEAL), (RED, ORANGE)])\\n...",
   "estimated_duration": 15
 }
 """
\ No newline at end of file
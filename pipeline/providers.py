@@ -0,0 +1,428 @@
+"""
+LLM provider layer with long-lived, pooled clients.
+
+Clients are built once per model (and per event loop for the asyncio
+variants) and reused, so concurrent generation shares HTTP/gRPC
+connections instead of paying client construction and a fresh TLS
+handshake per reel. complete() is the blocking entry point, acomplete()
+the asyncio one; stream() and astream() yield the response text in chunks
+as the model produces it. Code that runs its own event loop awaits
+aclose() before the loop finishes.
+
+The static part of a request (the system prompt, plus an optional context
+such as a style template) is sent as a cacheable prefix: Gemini gets an
+explicit CachedContent per prompt version, OpenAI a stable prompt_cache_key
+with the prefix first in the message list. Every call's token usage is
+appended to the metrics log (pipeline.llm_metrics).
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    GEMINI_API_KEY,
+    LLM_MODEL,
+    LLM_TIMEOUT_SECONDS,
+    LLM_PROMPT_CACHE,
+    GEMINI_CACHE_TTL_SECONDS,
+    PROMPT_CACHE_REGISTRY,
+)
+from pipeline import llm_metrics
+from observability import tracing
+
+_gemini_configured = False
+_gemini_lock = threading.Lock()
+_gemini_models = {}  # (model, system prompt, context) -> (GenerativeModel, context cached, expiry)
+_gemini_models_lock = threading.Lock()
+# Async clients hold connections bound to the loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+class GenerationCancelled(RuntimeError, tracing.Cancelled):
+    """The request was abandoned through its cancel event, e.g. a competing candidate won."""
+
+
+def _check_cancel(cancel: threading.Event):
+    if cancel is not None and cancel.is_set():
+        raise GenerationCancelled("generation cancelled")
+
+
+def provider_for(model: str) -> str:
+    return "gemini" if model.startswith("gemini") else "openai"
+
+
+def prompt_version(system_prompt: str, context: str = None) -> str:
+    """Short hash identifying a static prompt prefix."""
+    h = hashlib.sha256(system_prompt.encode("utf-8"))
+    if context:
+        h.update(b"\0" + context.encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+class _Usage:
+    """Times one call and records its token counts when it finishes."""
+
+    def __init__(self, provider: str, model: str, kind: str, version: str):
+        self.fields = {"provider": provider, "model": model, "kind": kind, "prompt_version": version}
+        self.start = time.monotonic()
+
+    def set(self, input_tokens=None, cached_tokens=None, output_tokens=None):
+        self.fields.update(input_tokens=input_tokens, cached_tokens=cached_tokens or 0,
+                           output_tokens=output_tokens)
+
+    def record(self, completed: bool = True):
+        llm_metrics.record(seconds=round(time.monotonic() - self.start, 3), completed=completed, **self.fields)
+        tracing.annotate(**{k: self.fields.get(k) for k in ("input_tokens", "cached_tokens", "output_tokens")})
+
+
+# ── OpenAI (and OpenAI-compatible servers, e.g. the local stub) ──
+
+def _openai_options() -> dict:
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY not set. Check your .env file.")
+    return {
+        "api_key": OPENAI_API_KEY,
+        "base_url": OPENAI_BASE_URL,
+        "timeout": LLM_TIMEOUT_SECONDS,
+    }
+
+
+@lru_cache(maxsize=None)
+def _openai_client():
+    from openai import OpenAI
+    # One client (and its keep-alive connection pool) shared by every thread
+    return OpenAI(**_openai_options())
+
+
+def _async_openai_client():
+    from openai import AsyncOpenAI
+
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if "openai" not in clients:
+        clients["openai"] = AsyncOpenAI(**_openai_options())
+    return clients["openai"]
+
+
+async def aclose():
+    """Close the running event loop's async clients; await it before the loop finishes."""
+    for client in _async_clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.close()
+
+
+def _openai_request(model: str, system_prompt: str, user_prompt: str, context: str, stream: bool) -> dict:
+    # Static content first: OpenAI caches the longest previously seen prefix
+    messages = [{"role": "system", "content": system_prompt}]
+    if context:
+        messages.append({"role": "user", "content": context})
+    messages.append({"role": "user", "content": user_prompt})
+    request = {
+        "model": model,
+        "messages": messages,
+        "response_format": {"type": "json_object"},
+    }
+    if LLM_PROMPT_CACHE:
+        # Routes requests sharing a prefix to the same cache
+        request["prompt_cache_key"] = f"reels-{prompt_version(system_prompt, context)}"
+    if stream:
+        request["stream"] = True
+        request["stream_options"] = {"include_usage": True}
+    return request
+
+
+def _set_openai_usage(usage: _Usage, response_usage):
+    if response_usage is None:
+        return
+    details = getattr(response_usage, "prompt_tokens_details", None)
+    usage.set(
+        input_tokens=response_usage.prompt_tokens,
+        cached_tokens=getattr(details, "cached_tokens", None),
+        output_tokens=response_usage.completion_tokens,
+    )
+
+
+def _complete_openai(model: str, system_prompt: str, user_prompt: str, context: str) -> str:
+    usage = _Usage("openai", model, "complete", prompt_version(system_prompt, context))
+    response = _openai_client().chat.completions.create(
+        **_openai_request(model, system_prompt, user_prompt, context, stream=False)
+    )
+    _set_openai_usage(usage, response.usage)
+    usage.record()
+    return response.choices[0].message.content
+
+
+def _stream_openai(model: str, system_prompt: str, user_prompt: str, context: str, cancel: threading.Event):
+    from openai.types.chat import ChatCompletionChunk
+
+    usage = _Usage("openai", model, "stream", prompt_version(system_prompt, context))
+    completed = False
+    try:
+        # Read the event stream to the end of the body ourselves: the SDK's
+        # Stream can close the response at [DONE], before the last HTTP
+        # chunk, which drops the keep-alive connection. The with-block still
+        # closes the response if the consumer stops early.
+        with _openai_client().chat.completions.with_streaming_response.create(
+            **_openai_request(model, system_prompt, user_prompt, context, stream=True)
+        ) as response:
+            for line in response.iter_lines():
+                _check_cancel(cancel)  # Leaving the with-block aborts the response
+                if not line.startswith("data:") or line[5:].strip() == "[DONE]":
+                    continue
+                chunk = ChatCompletionChunk.model_validate_json(line[5:])
+                _set_openai_usage(usage, chunk.usage)  # Only the final chunk carries usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        completed = True
+    finally:
+        usage.record(completed)
+
+
+async def _acomplete_openai(model: str, system_prompt: str, user_prompt: str, context: str) -> str:
+    usage = _Usage("openai", model, "complete", prompt_version(system_prompt, context))
+    response = await _async_openai_client().chat.completions.create(
+        **_openai_request(model, system_prompt, user_prompt, context, stream=False)
+    )
+    _set_openai_usage(usage, response.usage)
+    usage.record()
+    return response.choices[0].message.content
+
+
+async def _astream_openai(model: str, system_prompt: str, user_prompt: str, context: str):
+    usage = _Usage("openai", model, "stream", prompt_version(system_prompt, context))
+    completed = False
+    try:
+        response = await _async_openai_client().chat.completions.create(
+            **_openai_request(model, system_prompt, user_prompt, context, stream=True)
+        )
+        async with response:
+            async for chunk in response:
+                _set_openai_usage(usage, chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        completed = True
+    finally:
+        usage.record(completed)
+
+
+# ── Gemini ──
+
+def _configure_gemini():
+    """Configure the SDK once; reconfiguring would drop its cached clients."""
+    global _gemini_configured
+    import google.generativeai as genai
+
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not set. Check your .env file.")
+    with _gemini_lock:
+        if not _gemini_configured:
+            genai.configure(api_key=GEMINI_API_KEY)
+            _gemini_configured = True
+    return genai
+
+
+def _load_registry() -> dict:
+    try:
+        return json.loads(PROMPT_CACHE_REGISTRY.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_registry(registry: dict):
+    PROMPT_CACHE_REGISTRY.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = PROMPT_CACHE_REGISTRY.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(registry, indent=2))
+    os.replace(tmp_path, PROMPT_CACHE_REGISTRY)
+
+
+def _gemini_cached_content(model: str, system_prompt: str, context: str):
+    """
+    The CachedContent holding this prompt version, creating it if needed.
+
+    Caches are recorded in PROMPT_CACHE_REGISTRY so later runs reuse them
+    until shortly before they expire. Returns None if the model (or prompt
+    size) doesn't support context caching.
+    """
+    from google.generativeai import caching
+
+    version = prompt_version(system_prompt, context)
+    registry_key = f"{model}:{version}"
+    registry = _load_registry()
+    entry = registry.get(registry_key)
+    if entry and entry["expires"] > time.time() + 60:
+        try:
+            return caching.CachedContent.get(entry["name"])
+        except Exception:
+            pass  # Deleted or expired server-side; recreate
+
+    try:
+        cached = caching.CachedContent.create(
+            model=model,
+            display_name=f"reels-{version}",
+            system_instruction=system_prompt,
+            contents=[context] if context else None,
+            ttl=datetime.timedelta(seconds=GEMINI_CACHE_TTL_SECONDS),
+        )
+    except Exception as e:
+        print(f"Warning: Gemini context caching unavailable for {model} ({e}); sending the full prompt.")
+        return None
+    registry[registry_key] = {"name": cached.name, "expires": time.time() + GEMINI_CACHE_TTL_SECONDS}
+    _save_registry(registry)
+    print(f"  [PROMPT CACHE] Created {cached.name} for prompt {version}")
+    return cached
+
+
+def _gemini_model(model: str, system_prompt: str, context: str = None) -> tuple:
+    """
+    (GenerativeModel, whether context is already part of its cached prefix).
+
+    Models are reused until their CachedContent is about to expire.
+    """
+    key = (model, system_prompt, context)
+    with _gemini_models_lock:  # One CachedContent per prompt, even when threads race
+        entry = _gemini_models.get(key)
+        if entry is None or entry[2] <= time.time() + 60:
+            entry = _build_gemini_model(model, system_prompt, context)
+            _gemini_models[key] = entry
+    return entry[0], entry[1]
+
+
+def _build_gemini_model(model: str, system_prompt: str, context: str) -> tuple:
+    genai = _configure_gemini()
+    generation_config = {"response_mime_type": "application/json"}
+    cached = _gemini_cached_content(model, system_prompt, context) if LLM_PROMPT_CACHE else None
+    if cached is not None:
+        generative_model = genai.GenerativeModel.from_cached_content(
+            cached_content=cached, generation_config=generation_config
+        )
+        expires = cached.expire_time.timestamp()
+    else:
+        generative_model = genai.GenerativeModel(
+            model_name=model,
+            system_instruction=system_prompt,
+            generation_config=generation_config,
+        )
+        expires = float("inf")
+    return generative_model, cached is not None, expires
+
+
+def _gemini_call(model: str, system_prompt: str, user_prompt: str, context: str) -> tuple:
+    """(model, contents) for a request, with context sent inline unless it is cached."""
+    generative_model, context_cached = _gemini_model(model, system_prompt, context)
+    contents = [user_prompt] if context_cached or not context else [context, user_prompt]
+    return generative_model, contents
+
+
+def _set_gemini_usage(usage: _Usage, metadata):
+    if metadata is None:
+        return
+    usage.set(
+        input_tokens=getattr(metadata, "prompt_token_count", None),
+        cached_tokens=getattr(metadata, "cached_content_token_count", None),
+        output_tokens=getattr(metadata, "candidates_token_count", None),
+    )
+
+
+def _complete_gemini(model: str, system_prompt: str, user_prompt: str, context: str) -> str:
+    usage = _Usage("gemini", model, "complete", prompt_version(system_prompt, context))
+    generative_model, contents = _gemini_call(model, system_prompt, user_prompt, context)
+    response = generative_model.generate_content(contents)
+    _set_gemini_usage(usage, getattr(response, "usage_metadata", None))
+    usage.record()
+    return response.text
+
+
+def _stream_gemini(model: str, system_prompt: str, user_prompt: str, context: str, cancel: threading.Event):
+    usage = _Usage("gemini", model, "stream", prompt_version(system_prompt, context))
+    completed = False
+    try:
+        generative_model, contents = _gemini_call(model, system_prompt, user_prompt, context)
+        for chunk in generative_model.generate_content(contents, stream=True):
+            _check_cancel(cancel)
+            _set_gemini_usage(usage, getattr(chunk, "usage_metadata", None))
+            yield chunk.text
+        completed = True
+    finally:
+        usage.record(completed)
+
+
+async def _acomplete_gemini(model: str, system_prompt: str, user_prompt: str, context: str) -> str:
+    usage = _Usage("gemini", model, "complete", prompt_version(system_prompt, context))
+    # May create the CachedContent (a blocking round-trip), so off the event loop
+    generative_model, contents = await asyncio.to_thread(_gemini_call, model, system_prompt, user_prompt, context)
+    response = await generative_model.generate_content_async(contents)
+    _set_gemini_usage(usage, getattr(response, "usage_metadata", None))
+    usage.record()
+    return response.text
+
+
+async def _astream_gemini(model: str, system_prompt: str, user_prompt: str, context: str):
+    usage = _Usage("gemini", model, "stream", prompt_version(system_prompt, context))
+    completed = False
+    try:
+        generative_model, contents = await asyncio.to_thread(
+            _gemini_call, model, system_prompt, user_prompt, context
+        )
+        response = await generative_model.generate_content_async(contents, stream=True)
+        async for chunk in response:
+            _set_gemini_usage(usage, getattr(chunk, "usage_metadata", None))
+            yield chunk.text
+        completed = True
+    finally:
+        usage.record(completed)
+
+
+# ── Entry points ──
+# context is static text sent between the system prompt and user_prompt
+# (e.g. a style template) and cached along with the system prompt.
+
+def complete(
+    user_prompt: str,
+    system_prompt: str,
+    model: str = LLM_MODEL,
+    context: str = None,
+    cancel: threading.Event = None
+) -> str:
+    """Blocking completion; the response text (JSON) of the model. cancel is checked before the call."""
+    _check_cancel(cancel)
+    if provider_for(model) == "gemini":
+        return _complete_gemini(model, system_prompt, user_prompt, context)
+    return _complete_openai(model, system_prompt, user_prompt, context)
+
+
+async def acomplete(user_prompt: str, system_prompt: str, model: str = LLM_MODEL, context: str = None) -> str:
+    """asyncio completion; many can be in flight on one event loop."""
+    if provider_for(model) == "gemini":
+        return await _acomplete_gemini(model, system_prompt, user_prompt, context)
+    return await _acomplete_openai(model, system_prompt, user_prompt, context)
+
+
+def stream(
+    user_prompt: str,
+    system_prompt: str,
+    model: str = LLM_MODEL,
+    context: str = None,
+    cancel: threading.Event = None
+):
+    """
+    Blocking streaming completion; yields text chunks as they arrive.
+
+    Setting cancel aborts the response at the next chunk with GenerationCancelled.
+    """
+    if provider_for(model) == "gemini":
+        return _stream_gemini(model, system_prompt, user_prompt, context, cancel)
+    return _stream_openai(model, system_prompt, user_prompt, context, cancel)
+
+
+def astream(user_prompt: str, system_prompt: str, model: str = LLM_MODEL, context: str = None):
+    """asyncio streaming completion; an async iterator of text chunks."""
+    if provider_for(model) == "gemini":
+        return _astream_gemini(model, system_prompt, user_prompt, context)
+    return _astream_openai(model, system_prompt, user_prompt, context)
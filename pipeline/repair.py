@@ -0,0 +1,168 @@
+"""
+Repair loop for scenes that crash mid-render.
+
+The traceback is mapped to the failing statement in scene.py, and only that
+region (plus a few lines of context) goes back to the LLM with the error.
+The fixed region is spliced in and the scene re-rendered in the same media
+dir, where Manim's partial movie file cache skips every animation before the
+failure whose code did not change.
+"""
+
+import ast
+import json
+from pathlib import Path
+
+from config import LLM_MODEL, MAX_REPAIR_ATTEMPTS, REPAIR_CONTEXT_LINES
+from pipeline import llm_cache, providers
+from pipeline.prompts import REPAIR_PROMPT
+from rendering.failure import FailureSite, RenderFailure
+from rendering.preflight import PreflightError, preflight_check
+from rendering.renderer import render_from_plan
+from observability import tracing
+
+
+def failing_region(source: str, lineno: int, context: int = REPAIR_CONTEXT_LINES) -> tuple:
+    """
+    1-based inclusive (first, last) lines around lineno, widened so no
+    statement is cut in half and kept inside the enclosing function body.
+    """
+    tree = ast.parse(source)
+    statements = [n for n in ast.walk(tree) if isinstance(n, ast.stmt)]
+    containing = [n for n in statements if n.lineno <= lineno <= n.end_lineno]
+    if containing:
+        innermost = min(containing, key=lambda n: n.end_lineno - n.lineno)
+        first, last = innermost.lineno, innermost.end_lineno
+    else:
+        first = last = lineno
+
+    low, high = 1, len(source.splitlines())
+    functions = [n for n in containing if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    if functions:
+        body = min(functions, key=lambda n: n.end_lineno - n.lineno).body
+        low, high = body[0].lineno, body[-1].end_lineno
+    first = max(low, min(first, lineno) - context)
+    last = min(high, max(last, lineno) + context)
+    changed = True
+    while changed:
+        changed = False
+        for node in statements:
+            if node.lineno < first <= node.end_lineno < last:
+                first, changed = node.lineno, True
+            elif first < node.lineno <= last < node.end_lineno:
+                last, changed = node.end_lineno, True
+    return first, last
+
+
+def _repair_prompt(lines: list, first: int, last: int, site: FailureSite) -> str:
+    numbered = "\n".join(
+        f"{'>>' if n == site.lineno else '  '} {n:4d} | {lines[n - 1]}"
+        for n in range(first, last + 1)
+    )
+    return f"""Error: {site.error}
+
+Traceback (tail):
+{site.traceback}
+
+REGION (lines {first}-{last} of scene.py):
+{numbered}
+
+Return the fixed region."""
+
+
+def repair_scene(scene_path: Path, site: FailureSite, use_cache: bool = True) -> dict:
+    """
+    Ask the LLM to fix the region around site and splice the fix into scene_path.
+
+    Returns a record of the repair. If the patched scene fails pre-flight it
+    is restored and PreflightError is raised.
+    """
+    scene_path = Path(scene_path)
+    source = scene_path.read_text()
+    lines = source.splitlines()
+    first, last = failing_region(source, site.lineno)
+    user_prompt = _repair_prompt(lines, first, last, site)
+
+    key = llm_cache.cache_key(LLM_MODEL, REPAIR_PROMPT, user_prompt, None)
+    content = llm_cache.get(key) if use_cache else None
+    if content is None:
+        content = providers.complete(user_prompt, REPAIR_PROMPT)
+        llm_cache.put(key, content, LLM_MODEL)
+
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+    try:
+        data = json.loads(content)
+        fixed = data["fixed_region"].rstrip("\n").splitlines()
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+        raise PreflightError(scene_path, ["repair response was not JSON with a fixed_region"])
+
+    patched = lines[:first - 1] + fixed + lines[last:]
+    scene_path.write_text("\n".join(patched) + "\n")
+    try:
+        preflight_check(scene_path)
+    except PreflightError:
+        scene_path.write_text(source)
+        raise
+
+    return {
+        "line": site.lineno,
+        "error": site.error,
+        "region": [first, last],
+        "replacement_lines": len(fixed),
+        "explanation": data.get("explanation"),
+    }
+
+
+def render_with_repair(
+    visual_plan_path: Path,
+    output_file: Path,
+    max_attempts: int = MAX_REPAIR_ATTEMPTS,
+    use_cache: bool = True,
+    **render_kwargs
+):
+    """
+    render_from_plan, repairing the scene after each mid-render crash.
+
+    Up to max_attempts LLM fixes are tried (a fix rejected by pre-flight
+    counts as one); each repair is recorded under "repairs" in
+    visual_plan.json. The last RenderFailure is re-raised when out of
+    attempts (chained to the PreflightError if the last fix was rejected)
+    or when the traceback has no frame in scene.py.
+    """
+    visual_plan_path = Path(visual_plan_path)
+    scene_path = visual_plan_path.parent / "scene.py"
+    site = failure = None
+    attempts = 0
+    while True:
+        if site is None:
+            try:
+                render_from_plan(visual_plan_path, output_file, use_cache=use_cache,
+                                 keep_partials=True, **render_kwargs)
+                return
+            except RenderFailure as e:
+                if e.site is None or attempts >= max_attempts:
+                    raise
+                failure, site = e, e.site
+                done = "?" if e.animations_done is None else e.animations_done
+                print(f"  [REPAIR] {site.error} at scene.py line {site.lineno} "
+                      f"after {done} animation(s); fix {attempts + 1}/{max_attempts}")
+
+        attempts += 1
+        try:
+            with tracing.span("repair", line=site.lineno, render_error=site.error, attempt=attempts):
+                record = repair_scene(scene_path, site, use_cache=use_cache)
+        except PreflightError as e:
+            if attempts >= max_attempts:
+                raise failure from e
+            print(f"  [REPAIR] Fix rejected: {e}")
+            site = FailureSite(site.lineno, f"{site.error}\nA previous fix was rejected:\n{e}", site.traceback)
+            continue
+
+        plan = json.loads(visual_plan_path.read_text())
+        plan.setdefault("repairs", []).append(record)
+        visual_plan_path.write_text(json.dumps(plan, indent=2))
+        print(f"  [REPAIR] Patched lines {record['region'][0]}-{record['region'][1]}; re-rendering")
+        site = None
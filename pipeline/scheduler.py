@@ -0,0 +1,302 @@
+"""Two-stage batch scheduler: concurrent LLM generation feeding a render process pool."""
+
+import asyncio
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import (
+    DEFAULT_RENDER_PROFILE,
+    LLM_ASYNC,
+    LLM_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE,
+    RENDER_WORKERS,
+    RENDER_QUEUE_SIZE,
+    TEX_PREWARM_WORKERS,
+)
+from observability import tracing
+from pipeline import providers
+from pipeline.compositor import Background, background_sink, final_reel_path
+from pipeline.generate import agenerate_within_budget, generate_within_budget
+from pipeline.repair import render_with_repair
+from rendering.process import RenderResourceExceeded
+from rendering.renderer import render_from_plan, reel_output_path
+
+# Marks the end of the generation stage on the render queue
+_DONE = object()
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one batch task."""
+    index: int
+    concept: str
+    status: str  # "done", "failed" or "resource_exceeded"
+    output_path: Path = None
+    error: str = None
+    limit: str = None  # "timeout" or "memory" for resource_exceeded
+    generation_seconds: float = 0.0
+    render_seconds: float = 0.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting how often LLM requests may start."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """Consume a token and return 0, or return the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while (wait := self._try_take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Like acquire(), but yields to the event loop while waiting."""
+        while (wait := self._try_take()) > 0:
+            await asyncio.sleep(wait)
+
+
+def _render_task(
+    visual_plan_path: Path,
+    animation_path: Path,
+    profile: str,
+    validate_first: bool,
+    repair_attempts: int = 0,
+    background: Background = None,
+    tex_workers: int = TEX_PREWARM_WORKERS
+) -> float:
+    """Render stage entry point (runs inside a worker process)."""
+    start = time.monotonic()
+    sink = background_sink(visual_plan_path, background) if background is not None else None
+    with tracing.span("render_task", reel=visual_plan_path.parent.name, profile=profile):
+        if repair_attempts > 0:
+            render_with_repair(visual_plan_path, animation_path, max_attempts=repair_attempts,
+                               profile=profile, validate_first=validate_first, sink=sink,
+                               tex_workers=tex_workers)
+        else:
+            render_from_plan(visual_plan_path, animation_path, profile=profile,
+                             validate_first=validate_first, sink=sink, tex_workers=tex_workers)
+    return time.monotonic() - start
+
+
+def run_pipelined(
+    tasks: list,
+    llm_concurrency: int = LLM_CONCURRENCY,
+    requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+    render_workers: int = RENDER_WORKERS,
+    queue_size: int = RENDER_QUEUE_SIZE,
+    use_cache: bool = True,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    validate_first: bool = False,
+    on_update=None,
+    use_async: bool = LLM_ASYNC,
+    repair_attempts: int = 0,
+    background: Background = None,
+) -> list:
+    """
+    Run batch tasks through the generation and render stages concurrently.
+
+    LLM generation runs on a thread pool throttled by a token bucket; each
+    generated scene is handed to a bounded queue that feeds a process pool
+    of Manim renders. When the queue is full, generation blocks until a
+    render slot frees up, so generated-but-unrendered scenes cannot pile up.
+    With use_async, generation instead runs as coroutines on one event loop
+    sharing pooled async clients, so llm_concurrency can be raised cheaply.
+
+    tasks may be any iterable (e.g. a stream of JSONL lines); it is only
+    read as fast as generation slots free up. on_update(index, status,
+    **fields) is called on every state change ("generating", "rendering",
+    "done", "failed", "resource_exceeded") with the timings known so far.
+    A render killed by its timeout or memory ceiling ends as
+    "resource_exceeded" with the limit named, so it can be told apart from a
+    crashing scene. repair_attempts > 0 lets the LLM fix scenes that crash
+    mid-render (see pipeline.repair). With a background, each render is
+    streamed straight into its stacked final_reels/<name>/final.mp4.
+    """
+    results = {}
+    results_lock = threading.Lock()
+    render_queue = queue.Queue(maxsize=max(1, queue_size))
+    bucket = TokenBucket(requests_per_minute, burst=llm_concurrency)
+    total = len(tasks) if hasattr(tasks, "__len__") else "?"
+
+    def notify(index: int, status: str, **fields):
+        if on_update is not None:
+            on_update(index, status, **fields)
+
+    def record(result: TaskResult):
+        with results_lock:
+            results[result.index] = result
+        notify(result.index, result.status, error=result.error,
+               output_path=result.output_path, limit=result.limit,
+               generation_seconds=round(result.generation_seconds, 3),
+               render_seconds=round(result.render_seconds, 3))
+
+    def generate(index: int, task: dict):
+        concept = task["concept"]
+        bucket.acquire()
+        print(f"\n>>> GENERATING TASK {index+1}/{total}: {concept}")
+        notify(index, "generating")
+        start = time.monotonic()
+        try:
+            # Known-fatal or over-budget scenes are regenerated or rejected
+            # here, so they never take a render slot
+            with tracing.span("generate_task", concept=concept, index=index):
+                content_result = generate_within_budget(
+                    concept=concept,
+                    description=task["description"],
+                    length=task.get("length", 30),
+                    output_name=task.get("output_name"),
+                    use_cache=use_cache,
+                    profile=profile,
+                )
+        except Exception as e:
+            print(f"FAILED task {concept}: {e}")
+            traceback.print_exc()
+            record(TaskResult(index, concept, "failed", error=str(e),
+                              generation_seconds=time.monotonic() - start))
+            return
+        elapsed = time.monotonic() - start
+        render_queue.put((index, concept, content_result, elapsed))
+
+    async def agenerate(index: int, task: dict):
+        concept = task["concept"]
+        await bucket.acquire_async()
+        print(f"\n>>> GENERATING TASK {index+1}/{total}: {concept}")
+        notify(index, "generating")
+        start = time.monotonic()
+        try:
+            with tracing.span("generate_task", concept=concept, index=index):
+                content_result = await agenerate_within_budget(
+                    concept=concept,
+                    description=task["description"],
+                    length=task.get("length", 30),
+                    output_name=task.get("output_name"),
+                    use_cache=use_cache,
+                    profile=profile,
+                )
+        except Exception as e:
+            print(f"FAILED task {concept}: {e}")
+            traceback.print_exc()
+            record(TaskResult(index, concept, "failed", error=str(e),
+                              generation_seconds=time.monotonic() - start))
+            return
+        elapsed = time.monotonic() - start
+        # A full render queue must not stall the loop's other requests
+        await asyncio.get_running_loop().run_in_executor(
+            None, render_queue.put, (index, concept, content_result, elapsed)
+        )
+
+    async def agenerate_all():
+        pending = asyncio.Semaphore(max(1, llm_concurrency))
+        running = set()
+        try:
+            for index, task in enumerate(tasks):
+                await pending.acquire()
+                job = asyncio.create_task(agenerate(index, task))
+                running.add(job)
+                job.add_done_callback(lambda job: (running.discard(job), pending.release()))
+            if running:
+                await asyncio.gather(*running)
+        finally:
+            # The pooled clients' connections belong to this loop
+            await providers.aclose()
+
+    def generate_all():
+        # Only pull the next task once a generation slot is free
+        pending = threading.Semaphore(max(1, llm_concurrency))
+
+        def run(index: int, task: dict):
+            try:
+                generate(index, task)
+            finally:
+                pending.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as pool:
+                for index, task in enumerate(tasks):
+                    pending.acquire()
+                    pool.submit(run, index, task)
+        finally:
+            # Even if reading tasks fails, so the render loop doesn't wait forever
+            render_queue.put(_DONE)
+
+    def generate_all_async():
+        try:
+            asyncio.run(agenerate_all())
+        finally:
+            render_queue.put(_DONE)
+
+    producer = threading.Thread(target=generate_all_async if use_async else generate_all, daemon=True)
+    producer.start()
+
+    slots = threading.Semaphore(max(1, render_workers))
+    # Concurrent renders share the LaTeX prewarm processes instead of each starting TEX_PREWARM_WORKERS
+    tex_workers = min(TEX_PREWARM_WORKERS, max(1, TEX_PREWARM_WORKERS // max(1, render_workers)))
+
+    with ProcessPoolExecutor(max_workers=max(1, render_workers)) as pool:
+        while True:
+            slots.acquire()
+            item = render_queue.get()
+            if item is _DONE:
+                slots.release()
+                break
+
+            index, concept, content_result, generation_seconds = item
+            visual_plan_path = content_result.output_dir / "visual_plan.json"
+            animation_path = reel_output_path(content_result.output_dir, profile)
+            if background is not None:
+                animation_path = final_reel_path(content_result.output_dir.name)
+                animation_path.parent.mkdir(parents=True, exist_ok=True)
+            print(f"\n>>> RENDERING TASK {index+1}/{total}: {concept}")
+            ttft = content_result.ttft_seconds
+            notify(index, "rendering", generation_seconds=round(generation_seconds, 3),
+                   ttft_seconds=None if ttft is None else round(ttft, 3))
+
+            future = pool.submit(_render_task, visual_plan_path, animation_path, profile,
+                                 validate_first, repair_attempts, background, tex_workers)
+
+            def on_done(fut, index=index, concept=concept,
+                        animation_path=animation_path, generation_seconds=generation_seconds):
+                slots.release()
+                try:
+                    render_seconds = fut.result()
+                except RenderResourceExceeded as e:
+                    print(f"KILLED task {concept}: {e}")
+                    record(TaskResult(index, concept, "resource_exceeded", error=str(e), limit=e.limit,
+                                      generation_seconds=generation_seconds))
+                    return
+                except Exception as e:
+                    print(f"FAILED task {concept}: {e}")
+                    record(TaskResult(index, concept, "failed", error=str(e),
+                                      generation_seconds=generation_seconds))
+                    return
+                print(f"✓ Task {index+1} complete: {animation_path}")
+                record(TaskResult(index, concept, "done", output_path=animation_path,
+                                  generation_seconds=generation_seconds,
+                                  render_seconds=render_seconds))
+
+            future.add_done_callback(on_done)
+
+    producer.join()
+    return [results[i] for i in sorted(results)]
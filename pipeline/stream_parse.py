@@ -0,0 +1,159 @@
+"""Incremental parsing of a streamed LLM response into scene code, with early checks."""
+
+import ast
+import io
+import re
+import time
+import tokenize
+from pathlib import Path
+
+from rendering.preflight import PreflightError, partial_problems
+
+_CODE_KEY_RE = re.compile(r'"manim_code"\s*:\s*"')
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonStringField:
+    """
+    Decodes the value of one string field of a JSON object as the text arrives.
+
+    feed() returns the newly decoded characters; escapes split across chunks
+    (including surrogate pairs) are held back until complete.
+    """
+
+    def __init__(self, key_re: re.Pattern = _CODE_KEY_RE):
+        self.key_re = key_re
+        self.text = ""
+        self.pos = None  # Index of the next undecoded character of the value
+        self.complete = False
+
+    def feed(self, chunk: str) -> str:
+        self.text += chunk
+        if self.complete:
+            return ""
+        if self.pos is None:
+            match = self.key_re.search(self.text)
+            if not match:
+                return ""
+            self.pos = match.end()
+
+        out = []
+        text, i = self.text, self.pos
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.complete = True
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                break
+            code = text[i + 1]
+            if code != "u":
+                out.append(_SIMPLE_ESCAPES.get(code, code))
+                i += 2
+                continue
+            if i + 6 > len(text):
+                break
+            value = int(text[i + 2:i + 6], 16)
+            if 0xD800 <= value < 0xDC00:
+                # High surrogate: wait for its low half
+                if i + 12 > len(text):
+                    break
+                low = int(text[i + 8:i + 12], 16)
+                out.append(chr(0x10000 + ((value - 0xD800) << 10) + (low - 0xDC00)))
+                i += 12
+            else:
+                out.append(chr(value))
+                i += 6
+        self.pos = i
+        return "".join(out)
+
+
+def _at_statement_boundary(source: str) -> bool:
+    """True if source ends between complete top-level-parseable statements."""
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return False  # Inside brackets, a string, or a continuation
+    skipped = (tokenize.NEWLINE, tokenize.NL, tokenize.COMMENT,
+               tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+    first = last = line_start = None  # line_start: first token of last's logical line
+    for token in tokens:
+        if token.type == tokenize.NEWLINE:
+            line_start = None
+        elif token.type not in skipped:
+            line_start = line_start or token
+            first, last = line_start, token
+    if last is None:
+        return False
+    # A block header or decorator still needs the lines that follow it
+    if last.type == tokenize.OP and last.string == ":":
+        return False
+    return not (first.type == tokenize.OP and first.string == "@")
+
+
+class StreamingScene:
+    """
+    Consumes a streamed response: writes the code to a partial file as it
+    arrives and checks every statement boundary for pre-flight errors,
+    raising PreflightError before the response has finished.
+
+    A prefix that doesn't parse is only incomplete (e.g. it ends inside a
+    try: body whose except hasn't arrived yet), so syntax errors are left
+    to the pre-flight check of the finished scene.
+    """
+
+    def __init__(self, partial_path: Path):
+        self.partial_path = Path(partial_path)
+        self.field = JsonStringField()
+        self.code = ""
+        self.checked_upto = 0  # Length of the code prefix last checked
+        self.started = time.monotonic()
+        self.first_token = None
+        self.partial = open(self.partial_path, "w")
+
+    @property
+    def ttft_seconds(self) -> float:
+        return None if self.first_token is None else self.first_token - self.started
+
+    @property
+    def text(self) -> str:
+        """The full raw response received so far."""
+        return self.field.text
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        if self.first_token is None:
+            self.first_token = time.monotonic()
+        new_code = self.field.feed(chunk)
+        if not new_code:
+            return
+        self.code += new_code
+        self.partial.write(new_code)
+        self.partial.flush()
+        if "\n" in new_code:
+            self._check()
+
+    def _check(self):
+        # Code wrapped by the generator (a bare construct body) can't be checked standalone
+        if not self.code or self.code[0].isspace():
+            return
+        prefix = self.code[:self.code.rfind("\n") + 1]
+        if len(prefix) <= self.checked_upto or not _at_statement_boundary(prefix):
+            return
+        self.checked_upto = len(prefix)
+        try:
+            tree = ast.parse(prefix)
+        except SyntaxError:
+            return  # Not necessarily wrong yet; the finished scene gets the real syntax check
+        problems = partial_problems(tree)
+        if problems:
+            raise PreflightError(self.partial_path, problems)
+
+    def close(self):
+        self.partial.close()
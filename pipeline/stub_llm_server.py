@@ -0,0 +1,218 @@
+"""
+Local OpenAI-compatible stub server standing in for the real LLM providers.
+
+    python -m pipeline.stub_llm_server --port 8765 --latency 2
+    LLM_MODEL=stub OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8765/v1 \
+        python -m pipeline.batch_generate batches/example.json --profile draft
+
+Every chat completion returns a small valid scene for the requested concept
+and length after --latency seconds; "stream": true requests get it as
+server-sent events, one chunk of --chunk-chars characters every
+--token-delay seconds. GET /stats reports how many requests
+arrived over how many TCP connections, which shows whether clients reuse
+connections.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCENE_TEMPLATE = '''config.frame_height = 16.0
+config.frame_width = 9.0
+
+class GeneratedScene(MovingCameraScene):
+    def construct(self):
+        title = Text({title!r}, font_size=42).move_to(UP * 5)
+        self.add(title)
+        square = Square(side_length=2, color=ORANGE)
+        eq = MathTex(r"A = s^2", font_size=34).move_to(DOWN * 5)
+        self.play(Create(square), Write(eq), run_time=1)
+        for _ in range({steps}):
+            self.play(square.animate.rotate(PI / 4), self.camera.frame.animate.scale(0.97), run_time=0.8)
+            self.wait(0.3)
+        self.wait(2)
+'''
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.cache_keys = set()  # prompt_cache_key values seen, to simulate prefix caching
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {"connections": self.connections, "requests": self.requests}
+
+
+def stub_scene(user_prompt: str) -> dict:
+    """The JSON payload the generator expects, sized to the prompt's target length."""
+    concept = re.search(r"Concept: (.*)", user_prompt)
+    length = re.search(r"Target length: (\d+)", user_prompt)
+    length = int(length.group(1)) if length else 15
+    return {
+        "manim_code": SCENE_TEMPLATE.format(
+            title=concept.group(1).strip() if concept else "Stub",
+            steps=max(1, int((length - 3) / 1.1)),
+        ),
+        "estimated_duration": length,
+    }
+
+
+def stub_usage(request: dict, content: str, stats: StubStats) -> dict:
+    """
+    Token counts at ~4 characters per token. The static prefix (everything
+    before the last message) counts as cached once its prompt_cache_key
+    has been seen.
+    """
+    messages = request.get("messages", [])
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    prefix_tokens = sum(len(m.get("content", "")) for m in messages[:-1]) // 4
+    key = request.get("prompt_cache_key")
+    with stats.lock:
+        cached = key is not None and key in stats.cache_keys
+        if key is not None:
+            stats.cache_keys.add(key)
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": prefix_tokens if cached else 0},
+    }
+
+
+def make_handler(stats: StubStats, latency: float, token_delay: float = 0.0, chunk_chars: int = 16):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so pooled clients can reuse connections
+
+        def setup(self):
+            super().setup()
+            with stats.lock:
+                stats.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def _send_stream(self, completion_id: str, model: str, content: str, usage: dict = None):
+            """Server-sent events in the shape of OpenAI's chat.completion.chunk."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            pieces = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+            for i, piece in enumerate(pieces + [None]):
+                event = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": piece} if piece is not None else {},
+                        "finish_reason": None if piece is not None else "stop",
+                    }],
+                }
+                if i and piece is not None:
+                    time.sleep(token_delay)
+                self._send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            if usage is not None:
+                # stream_options.include_usage: a final chunk with no choices
+                event = {"id": completion_id, "object": "chat.completion.chunk",
+                         "created": int(time.time()), "model": model, "choices": [], "usage": usage}
+                self._send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self._send_chunk(b"data: [DONE]\n\n")
+            self._send_chunk(b"")
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(stats.as_dict())
+            else:
+                self._send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json({"error": "not found"}, 404)
+                return
+            with stats.lock:
+                stats.requests += 1
+            time.sleep(latency)
+            user_prompt = next(
+                (m["content"] for m in reversed(request.get("messages", [])) if m.get("role") == "user"), ""
+            )
+            content = json.dumps(stub_scene(user_prompt))
+            completion_id, model = f"stub-{stats.requests}", request.get("model", "stub")
+            usage = stub_usage(request, content, stats)
+            if request.get("stream"):
+                include_usage = (request.get("stream_options") or {}).get("include_usage")
+                try:
+                    self._send_stream(completion_id, model, content, usage if include_usage else None)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early (e.g. a streamed scene was rejected)
+                    self.close_connection = True
+                return
+            self._send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+    return Handler
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    latency: float = 0.0,
+    token_delay: float = 0.0,
+    chunk_chars: int = 16
+) -> ThreadingHTTPServer:
+    """Start the stub server on a background thread and return it (call .shutdown() to stop)."""
+    stats = StubStats()
+    server = ThreadingHTTPServer((host, port), make_handler(stats, latency, token_delay, chunk_chars))
+    server.stats = stats
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="Seconds between streamed chunks (stream=true requests)")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="Characters per streamed chunk")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.token_delay, args.chunk_chars)
+    print(f"Stub LLM server on http://{args.host}:{args.port}/v1 (stats at /v1/stats)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
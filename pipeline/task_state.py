@@ -0,0 +1,121 @@
+"""Batch task input (JSON or JSONL) and a durable per-task state log for resuming."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from config import BATCH_STATE_DIR
+
+STATUSES = ("pending", "generating", "rendering", "done", "failed", "resource_exceeded")
+
+
+def iter_tasks(path: Path):
+    """
+    Yield (line or list index, task dict) from a batch file.
+
+    JSONL files (one object per line) are read lazily, so a batch of any
+    size is consumed as a stream; a JSON list is still accepted.
+    """
+    path = Path(path)
+    with open(path) as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            tasks = json.load(f)
+            yield from enumerate(tasks)
+            return
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number + 1}: invalid JSON ({e})") from e
+
+
+def task_id(task: dict) -> str:
+    """Stable identity of a task: its "id" field, or a hash of what it asks for."""
+    if task.get("id"):
+        return str(task["id"])
+    fields = [task.get(k) for k in ("concept", "description", "length", "output_name")]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()[:16]
+
+
+def default_state_path(batch_file: Path) -> Path:
+    """State log for a batch file, keyed by its resolved path."""
+    batch_file = Path(batch_file)
+    tag = hashlib.sha256(str(batch_file.resolve()).encode("utf-8")).hexdigest()[:8]
+    return BATCH_STATE_DIR / f"{batch_file.stem}-{tag}.state.jsonl"
+
+
+class TaskStateStore:
+    """
+    Append-only JSONL log of task state transitions.
+
+    Every update is flushed and fsynced before returning, so after a crash
+    or kill the log reflects every transition that happened. The latest
+    record per task wins; a torn final line is ignored.
+    """
+
+    def __init__(self, path: Path, resume: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.states = {}
+        self.lock = threading.Lock()
+        torn = False
+        if resume:
+            torn = self._replay()
+        self.file = open(self.path, "a" if resume else "w")
+        if torn:
+            # End the torn line, or the next record would be appended to it
+            self.file.write("\n")
+
+    def _replay(self) -> bool:
+        """Load the log; True if it ends mid-line."""
+        try:
+            text = self.path.read_text()
+        except FileNotFoundError:
+            return False
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Interrupted mid-write
+            self.states.setdefault(record["task_id"], {}).update(record)
+        return bool(text) and not text.endswith("\n")
+
+    def get(self, task_id: str) -> dict:
+        return self.states.get(task_id, {})
+
+    def is_done(self, task_id: str) -> bool:
+        state = self.get(task_id)
+        if state.get("status") != "done":
+            return False
+        output = state.get("output_path")
+        return output is None or Path(output).exists()
+
+    def update(self, task_id: str, status: str, **fields):
+        """Record that task_id moved to status, with any extra fields (timings, errors)."""
+        if status not in STATUSES:
+            raise ValueError(f"Unknown task status {status!r}")
+        record = {"task_id": task_id, "status": status, "time": time.time()}
+        record.update({k: str(v) if isinstance(v, Path) else v for k, v in fields.items()})
+        with self.lock:
+            self.states.setdefault(task_id, {}).update(record)
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def counts(self) -> dict:
+        counts = {}
+        for state in self.states.values():
+            counts[state["status"]] = counts.get(state["status"], 0) + 1
+        return counts
+
+    def close(self):
+        self.file.close()
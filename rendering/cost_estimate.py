@@ -0,0 +1,506 @@
+"""Static render-cost estimator for generated scene code."""
+
+import ast
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from config import (
+    RENDER_PROFILES,
+    DEFAULT_RENDER_PROFILE,
+    MAX_DURATION_RATIO,
+    MAX_SCENE_ELEMENTS,
+    MAX_RENDER_SECONDS,
+)
+from rendering.preflight import preflight_check
+
+# Rough cost model, calibrated for the final (1080x1920) profile
+STARTUP_SECONDS = 3.0  # Manim import + config
+FRAME_SECONDS = 0.03  # Cairo draw + encode of a simple frame
+ELEMENT_FRAME_SECONDS = 5e-5  # Extra per visible mobject/segment per frame
+PLAY_OVERHEAD_SECONDS = 0.15  # Hashing + partial movie file per animation
+TEX_SECONDS = 1.0  # LaTeX/Pango compile per text object
+
+DEFAULT_RUN_TIME = 1.0  # Manim's default for play() and wait()
+UNKNOWN_LOOP_ITERATIONS = 10  # Assumed when a trip count can't be resolved
+TEXT_CLASSES = {"MathTex", "Tex", "Text", "MarkupText"}
+# Scene methods that play an animation (run_time keyword, default DEFAULT_RUN_TIME)
+PLAY_METHODS = {"play", "move_camera"}
+# Scene methods whose animation count or length depends on runtime state
+UNPREDICTABLE_METHODS = {"wait_until"}
+
+
+@dataclass
+class RenderEstimate:
+    """Predicted cost of rendering a scene."""
+    duration: float
+    play_calls: int
+    wait_calls: int
+    text_objects: int
+    peak_elements: int
+    frames: int
+    render_seconds: float
+    exact: bool  # False if any loop count, branch, helper or timing had to be guessed
+    warnings: list = field(default_factory=list)
+    animations: list = field(default_factory=list)  # Seconds of each play()/wait(), in Manim's order
+
+    def animation_frames(self, start: int, end: int, fps: float) -> int:
+        """Predicted frames of animations start..end (inclusive) at fps."""
+        return sum(int(round(d * fps)) for d in self.animations[start:end + 1])
+
+
+class RenderBudgetError(RuntimeError):
+    """The scene is predicted to exceed the render budget."""
+
+    def __init__(self, estimate: RenderEstimate, problems: list):
+        self.estimate = estimate
+        self.problems = problems
+        super().__init__("Scene exceeds render budget: " + "; ".join(problems))
+
+    def __reduce__(self):
+        # Keep the fields when raised in a render worker process
+        return type(self), (self.estimate, self.problems)
+
+
+@dataclass
+class _Cost:
+    duration: float = 0.0
+    plays: int = 0
+    waits: int = 0
+    texts: int = 0
+    animations: list = field(default_factory=list)
+
+    def add(self, other: "_Cost", times: int = 1):
+        self.duration += other.duration * times
+        self.plays += other.plays * times
+        self.waits += other.waits * times
+        self.texts += other.texts * times
+        self.animations.extend(other.animations * times)
+
+    def key(self) -> tuple:
+        return self.plays, self.waits, self.animations
+
+
+def _self_method(node: ast.AST) -> str:
+    """'play' for self.play(...), None for anything that isn't a call of a self method."""
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+    ):
+        return node.func.attr
+    return None
+
+
+_REPEATED_NODES = (ast.Lambda, ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)
+
+
+def _walk_once(node: ast.AST):
+    """Like ast.walk, but yields lambdas and comprehensions without entering them."""
+    pending = [node]
+    while pending:
+        current = pending.pop(0)
+        yield current
+        if not isinstance(current, _REPEATED_NODES):
+            pending.extend(ast.iter_child_nodes(current))
+
+
+def _animates(node: ast.AST) -> bool:
+    return any(_self_method(n) in PLAY_METHODS | {"wait"} for n in ast.walk(node))
+
+
+def _exits_early(stmts: list) -> bool:
+    """True if a return/break/continue can cut the block short."""
+    for stmt in stmts:
+        for node in ast.walk(stmt):
+            if isinstance(node, (ast.Return, ast.Break, ast.Continue)):
+                return True
+    return False
+
+
+def _kwarg(call: ast.Call, name: str) -> ast.expr:
+    for kw in call.keywords:
+        if kw.arg == name:
+            return kw.value
+    return None
+
+
+def _root_name(node: ast.expr) -> str:
+    """segments / list(segments) / segments.submobjects -> 'segments'"""
+    if isinstance(node, ast.Call) and node.args and not node.keywords:
+        return _root_name(node.args[0])
+    if isinstance(node, ast.Attribute):
+        return _root_name(node.value)
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+class _Estimator:
+    def __init__(self, methods: dict = None):
+        self.env = {}  # name -> numeric constant
+        self.lengths = {}  # name -> length of a literal list/tuple
+        self.methods = methods or {}  # name -> FunctionDef of the scene's own helpers
+        self.active = set()  # Helpers being expanded (guards recursion)
+        self.exact = True
+        self.warnings = []
+        self.peak_elements = 0
+
+    # ── constant folding ──
+
+    def eval(self, node: ast.expr):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self.env.get(node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self.eval(node.operand)
+            return -value if value is not None else None
+        if isinstance(node, ast.BinOp):
+            left, right = self.eval(node.left), self.eval(node.right)
+            if left is None or right is None:
+                return None
+            try:
+                if isinstance(node.op, ast.Add):
+                    return left + right
+                if isinstance(node.op, ast.Sub):
+                    return left - right
+                if isinstance(node.op, ast.Mult):
+                    return left * right
+                if isinstance(node.op, ast.Div):
+                    return left / right
+                if isinstance(node.op, ast.FloorDiv):
+                    return left // right
+                if isinstance(node.op, ast.Mod):
+                    return left % right
+                if isinstance(node.op, ast.Pow) and abs(right) <= 64:
+                    return left ** right
+            except ZeroDivisionError:
+                return None
+            return None
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            args = [self.eval(a) for a in node.args]
+            if None in args or not args:
+                return None
+            if node.func.id in ("int", "round"):
+                return int(round(args[0])) if node.func.id == "round" else int(args[0])
+            if node.func.id == "min":
+                return min(args)
+            if node.func.id == "max":
+                return max(args)
+        return None
+
+    def trip_count(self, node: ast.expr):
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return len(node.elts)
+        if isinstance(node, ast.Name):
+            return self.lengths.get(node.id)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id == "range":
+                args = [self.eval(a) for a in node.args]
+                if None in args or not args:
+                    return None
+                try:
+                    return len(range(*[int(a) for a in args]))
+                except (TypeError, ValueError):
+                    return None
+            if node.func.id in ("enumerate", "reversed", "list", "zip") and node.args:
+                return self.trip_count(node.args[0])
+        return None
+
+    # ── timing of individual calls ──
+
+    def play_duration(self, call: ast.Call) -> float:
+        run_time = _kwarg(call, "run_time")
+        if run_time is None:
+            # play() uses the longest run_time among its animations
+            times = [_kwarg(a, "run_time") for a in call.args if isinstance(a, ast.Call)]
+            times = [t for t in times if t is not None]
+            if not times:
+                return DEFAULT_RUN_TIME
+            values = [self.eval(t) for t in times]
+            if None in values:
+                self.exact = False
+                return DEFAULT_RUN_TIME
+            return max(values)
+        value = self.eval(run_time)
+        if value is None:
+            self.exact = False
+            return DEFAULT_RUN_TIME
+        return value
+
+    def wait_duration(self, call: ast.Call) -> float:
+        arg = call.args[0] if call.args else _kwarg(call, "duration")
+        if arg is None:
+            return DEFAULT_RUN_TIME
+        value = self.eval(arg)
+        if value is None:
+            self.exact = False
+            return DEFAULT_RUN_TIME
+        return value
+
+    def helper_cost(self, name: str) -> _Cost:
+        """Cost of one call of a helper method the scene defines itself."""
+        if name in self.active:
+            self.exact = False
+            return _Cost()
+        env, lengths = dict(self.env), dict(self.lengths)
+        self.active.add(name)
+        try:
+            cost = self.block_cost(self.methods[name].body)
+        finally:
+            self.active.discard(name)
+            self.env, self.lengths = env, lengths
+        if cost.plays or cost.waits:
+            # Its arguments, and so its branches and timings, vary per call site
+            self.exact = False
+        return cost
+
+    def statement_cost(self, stmt: ast.stmt) -> _Cost:
+        cost = _Cost()
+        for node in _walk_once(stmt):
+            if isinstance(node, _REPEATED_NODES):
+                if _animates(node):
+                    self.exact = False  # Runs an unknown number of times
+                continue
+            method = _self_method(node)
+            if method in PLAY_METHODS:
+                duration = self.play_duration(node)
+                cost.duration += duration
+                cost.plays += 1
+                cost.animations.append(duration)
+            elif method == "wait":
+                duration = self.wait_duration(node)
+                cost.duration += duration
+                cost.waits += 1
+                cost.animations.append(duration)
+            elif method in UNPREDICTABLE_METHODS:
+                self.exact = False
+            elif method in self.methods and method != "construct":
+                cost.add(self.helper_cost(method))
+            elif (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id in TEXT_CLASSES
+            ):
+                cost.texts += 1
+        return cost
+
+    # ── control flow ──
+
+    def record_assignment(self, stmt: ast.Assign):
+        if len(stmt.targets) != 1 or not isinstance(stmt.targets[0], ast.Name):
+            return
+        name = stmt.targets[0].id
+        value = self.eval(stmt.value)
+        if value is not None:
+            self.env[name] = value
+        else:
+            self.env.pop(name, None)
+        if isinstance(stmt.value, (ast.List, ast.Tuple)):
+            self.lengths[name] = len(stmt.value.elts)
+        else:
+            self.lengths.pop(name, None)
+
+    def block_cost(self, stmts: list) -> _Cost:
+        total = _Cost()
+        for stmt in stmts:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if isinstance(stmt, ast.For):
+                count = self.trip_count(stmt.iter)
+                if count is None:
+                    self.exact = False
+                    count = UNKNOWN_LOOP_ITERATIONS
+                if _exits_early(stmt.body) and _animates(stmt):
+                    self.exact = False
+                self.detect_growth(stmt, count)
+                total.add(self.block_cost(stmt.body), count)
+                total.add(self.block_cost(stmt.orelse))
+            elif isinstance(stmt, ast.While):
+                self.exact = False
+                self.detect_growth(stmt, UNKNOWN_LOOP_ITERATIONS)
+                total.add(self.block_cost(stmt.body), UNKNOWN_LOOP_ITERATIONS)
+            elif isinstance(stmt, ast.If):
+                test = self.eval(stmt.test)
+                if test is not None:
+                    # Decided by constants, e.g. `if SHOW_INTRO:`
+                    total.add(self.block_cost(stmt.body if test else stmt.orelse))
+                    continue
+                body, orelse = self.block_cost(stmt.body), self.block_cost(stmt.orelse)
+                if body.key() != orelse.key() or _exits_early(stmt.body + stmt.orelse):
+                    self.exact = False
+                total.add(body if body.duration >= orelse.duration else orelse)
+            elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+                total.add(self.block_cost(stmt.body))
+            elif isinstance(stmt, ast.Try):
+                if any(_animates(handler) for handler in stmt.handlers):
+                    self.exact = False
+                total.add(self.block_cost(stmt.body))
+                total.add(self.block_cost(stmt.finalbody))
+            else:
+                if isinstance(stmt, ast.Assign):
+                    self.record_assignment(stmt)
+                total.add(self.statement_cost(stmt))
+        return total
+
+    # ── multiplicative growth ──
+
+    def detect_growth(self, loop: ast.stmt, iterations: int):
+        """
+        Flag loops that rebuild a collection from itself with a growth factor,
+        e.g. `for seg in segments: new.append(a); new.append(b)` followed by
+        `segments = new`, which yields factor ** iterations elements.
+        """
+        reassigned = {}  # source name -> names it is rebuilt from
+        for node in ast.walk(loop):
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        used = {n.id for n in ast.walk(node.value) if isinstance(n, ast.Name)}
+                        reassigned.setdefault(target.id, set()).update(used)
+
+        for inner in ast.walk(loop):
+            if inner is loop:
+                continue
+            factor, source = None, None
+            if isinstance(inner, ast.For):
+                source = _root_name(inner.iter)
+                appended = {}
+                for node in ast.walk(inner):
+                    target, count = None, 0
+                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                        target = _root_name(node.func.value)
+                        if node.func.attr == "append":
+                            count = 1
+                        elif node.func.attr == "add":
+                            count = len(node.args)
+                        elif node.func.attr == "extend" and node.args:
+                            arg = node.args[0]
+                            count = len(arg.elts) if isinstance(arg, (ast.List, ast.Tuple)) else 2
+                    elif (
+                        isinstance(node, ast.AugAssign)
+                        and isinstance(node.op, ast.Add)
+                        and isinstance(node.value, (ast.List, ast.Tuple))
+                    ):
+                        target, count = _root_name(node.target), len(node.value.elts)
+                    if target and count:
+                        appended[target] = appended.get(target, 0) + count
+                for target, count in appended.items():
+                    if source and (target == source or target in reassigned.get(source, set())):
+                        factor = max(factor or 0, count)
+            elif isinstance(inner, ast.Assign) and isinstance(inner.value, ast.ListComp):
+                comp = inner.value
+                targets = {t.id for t in inner.targets if isinstance(t, ast.Name)}
+                if len(comp.generators) >= 2:
+                    source = _root_name(comp.generators[0].iter)
+                    if source in targets:
+                        factor = self.trip_count(comp.generators[1].iter) or 2
+
+            if factor and factor >= 2:
+                elements = factor ** min(iterations, 64)
+                self.peak_elements = max(self.peak_elements, elements)
+                self.warnings.append(
+                    f"line {inner.lineno}: '{source}' grows x{factor} per iteration over "
+                    f"{iterations} iterations (~{elements:,} elements)"
+                )
+
+
+def _scene_methods(tree: ast.Module, scene_name: str) -> dict:
+    """Methods of scene_name and its base classes in the same file (subclasses win)."""
+    classes = {n.name: n for n in tree.body if isinstance(n, ast.ClassDef)}
+    methods = {}
+    pending = [scene_name]
+    while pending:
+        node = classes.get(pending.pop(0))
+        if node is None:
+            continue
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                methods.setdefault(item.name, item)
+        pending.extend(b.id for b in node.bases if isinstance(b, ast.Name))
+    return methods
+
+
+def estimate_render_cost(
+    scene_path: Path,
+    scene_name: str = None,
+    profile: str = DEFAULT_RENDER_PROFILE
+) -> RenderEstimate:
+    """Predict video length, frame count and render time from the scene's AST."""
+    scene_name = preflight_check(scene_path, scene_name)
+    tree = ast.parse(Path(scene_path).read_text())
+    methods = _scene_methods(tree, scene_name)
+    construct = methods.get("construct")
+
+    estimator = _Estimator(methods)
+    # Module-level constants (e.g. ITERATIONS = 12) are visible inside construct
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign):
+            estimator.record_assignment(stmt)
+    cost = estimator.block_cost(construct.body if construct else [])
+
+    settings = RENDER_PROFILES[profile]
+    final = RENDER_PROFILES["final"]
+    pixel_scale = (settings["width"] * settings["height"]) / (final["width"] * final["height"])
+    frames = int(round(cost.duration * settings["fps"]))
+    # Late iterations dominate, so count roughly half the peak as always on screen
+    per_frame = FRAME_SECONDS + ELEMENT_FRAME_SECONDS * estimator.peak_elements / 2
+    render_seconds = (
+        STARTUP_SECONDS
+        + cost.texts * TEX_SECONDS
+        + (cost.plays + cost.waits) * PLAY_OVERHEAD_SECONDS
+        + frames * per_frame * pixel_scale
+    )
+
+    return RenderEstimate(
+        duration=cost.duration,
+        play_calls=cost.plays,
+        wait_calls=cost.waits,
+        text_objects=cost.texts,
+        peak_elements=estimator.peak_elements,
+        frames=frames,
+        render_seconds=render_seconds,
+        exact=estimator.exact,
+        warnings=estimator.warnings,
+        animations=cost.animations,
+    )
+
+
+def check_render_budget(
+    estimate: RenderEstimate,
+    length: float = None,
+    estimated_duration: float = None
+) -> list:
+    """Compare an estimate against the requested length and global budgets."""
+    problems = []
+    targets = [t for t in (length, estimated_duration) if t]
+    if targets and estimate.duration > max(targets) * MAX_DURATION_RATIO:
+        problems.append(
+            f"predicted length {estimate.duration:.1f}s exceeds target {max(targets):g}s "
+            f"by more than {MAX_DURATION_RATIO:g}x"
+        )
+    if estimate.peak_elements > MAX_SCENE_ELEMENTS:
+        problems.append(
+            f"~{estimate.peak_elements:,} elements exceeds {MAX_SCENE_ELEMENTS:,}; "
+            f"cap iterations ({'; '.join(estimate.warnings)})"
+        )
+    if estimate.render_seconds > MAX_RENDER_SECONDS:
+        problems.append(
+            f"predicted render time {estimate.render_seconds:.0f}s exceeds {MAX_RENDER_SECONDS}s"
+        )
+    return problems
+
+
+def enforce_render_budget(
+    scene_path: Path,
+    length: float = None,
+    estimated_duration: float = None,
+    profile: str = DEFAULT_RENDER_PROFILE
+) -> RenderEstimate:
+    """Estimate the scene's cost and raise RenderBudgetError if it is over budget."""
+    estimate = estimate_render_cost(scene_path, profile=profile)
+    problems = check_render_budget(estimate, length, estimated_duration)
+    if problems:
+        raise RenderBudgetError(estimate, problems)
+    return estimate
@@ -0,0 +1,70 @@
+"""Locate where in scene.py a failed Manim render raised, from its captured output."""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+# Last "SomeError: message" line; Manim's rich traceback prints it below the box
+ERROR_LINE_RE = re.compile(r"^\s*([A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Warning))\b:?(.*)$")
+
+
+@dataclass
+class FailureSite:
+    """The innermost frame of scene.py in a traceback, and the error raised."""
+    lineno: int
+    error: str
+    traceback: str
+
+
+def _frame_res(scene_path: Path) -> list:
+    name = re.escape(Path(scene_path).name)
+    return [
+        # Plain Python: File "/.../scene.py", line 42, in construct
+        re.compile(rf'File "[^"]*{name}", line (\d+)'),
+        # Rich (Manim's default): │ /.../scene.py:42 in construct │
+        re.compile(rf"{name}:(\d+) in "),
+    ]
+
+
+def locate_failure(output: list, scene_path: Path) -> FailureSite:
+    """The failing scene.py line and error message, or None if output has no scene frame."""
+    start = next(
+        (i for i in range(len(output) - 1, -1, -1) if "Traceback" in output[i]),
+        max(0, len(output) - 60)
+    )
+    lines = output[start:]
+    frame_res = _frame_res(scene_path)
+
+    lineno = None
+    for line in lines:
+        for frame_re in frame_res:
+            match = frame_re.search(line)
+            if match:
+                lineno = int(match.group(1))  # Keep the innermost (last) frame
+    if lineno is None:
+        return None
+
+    error = next(
+        (line.strip(" │") for line in reversed(lines) if ERROR_LINE_RE.match(line.strip(" │"))),
+        next((line.strip() for line in reversed(lines) if line.strip()), "unknown error")
+    )
+    return FailureSite(lineno=lineno, error=error, traceback="\n".join(lines[-60:]))
+
+
+class RenderFailure(RuntimeError):
+    """Manim exited with an error; carries its output and where in the scene it failed."""
+
+    def __init__(self, scene_path: Path, output: list, animations_done: int = None,
+                 message: str = "Manim render failed"):
+        self.scene_path = Path(scene_path)
+        self.output = output
+        self.animations_done = animations_done
+        self.base_message = message
+        self.site = locate_failure(output, scene_path)
+        if self.site:
+            message += f": {self.site.error} (scene line {self.site.lineno})"
+        super().__init__(message)
+
+    def __reduce__(self):
+        # Keep the fields when raised in a render worker process
+        return type(self), (self.scene_path, self.output, self.animations_done, self.base_message)
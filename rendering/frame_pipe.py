@@ -0,0 +1,194 @@
+"""Render a scene as raw RGBA frames into a pipe instead of encoding an mp4.
+
+render_from_plan(..., sink=...) uses stream_render() to run
+`python -m rendering.frame_pipe scene.py SceneName --fd N` and feed its
+frames straight into the sink's ffmpeg filter graph (e.g. the compositor's
+background stack), so the finished reel is encoded exactly once. Without
+--fd the frames go to stdout.
+"""
+
+import argparse
+import importlib.util
+import inspect
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import PROJECT_ROOT, RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+from rendering.manim_cli import manim_env
+from rendering.process import ProcessResult, ResourceLimits, _apply_scheduling, kill_group, run_monitored
+
+PIXEL_FORMAT = "rgba"  # Cairo camera frames are (height, width, 4) uint8
+
+
+class FrameSink:
+    """
+    Consumer of a streamed render: an ffmpeg command that reads the raw
+    frames and writes the finished video. Subclasses must be picklable,
+    since batch renders run in worker processes.
+    """
+
+    def key(self) -> dict:
+        """Everything besides the scene that determines the output (added to the render fingerprint)."""
+        raise NotImplementedError
+
+    def command(self, frame_input: list, output_path: Path) -> list:
+        """The ffmpeg command; frame_input are the input options and -i for the frame stream."""
+        raise NotImplementedError
+
+
+def frame_input_args(profile: str = DEFAULT_RENDER_PROFILE) -> list:
+    """ffmpeg input options describing the raw frame stream for a profile."""
+    settings = RENDER_PROFILES[profile]
+    return [
+        "-f", "rawvideo",
+        "-pix_fmt", PIXEL_FORMAT,
+        "-s", f"{settings['width']}x{settings['height']}",
+        "-r", str(settings["fps"]),
+    ]
+
+
+def stream_render(
+    scene_path: Path,
+    scene_name: str,
+    render_flags: dict,
+    media_dir: Path,
+    output_path: Path,
+    sink: FrameSink,
+    on_line=None,
+    echo=None,
+    cancel=None,
+    limits: ResourceLimits = None
+) -> ProcessResult:
+    """
+    Render scene_name with its frames piped into sink's ffmpeg, which writes output_path.
+
+    The Manim side runs under run_monitored (telemetry, cancel, resource
+    limits) and its result is returned; output_path is removed unless it
+    succeeded. Raises RuntimeError if the encoder fails.
+    """
+    profile = render_flags["profile"]
+    read_fd, write_fd = os.pipe()
+    encoder = subprocess.Popen(
+        sink.command(frame_input_args(profile) + ["-i", "pipe:0"], output_path),
+        stdin=read_fd,
+        start_new_session=True,
+    )
+    # Only the encoder reads: if it dies, the renderer's next write fails
+    os.close(read_fd)
+    if limits is not None:
+        _apply_scheduling(encoder.pid, limits)
+    cmd = [
+        sys.executable, "-m", "rendering.frame_pipe",
+        str(scene_path), scene_name,
+        "--profile", profile,
+        "--media-dir", str(media_dir),
+        "--fd", str(write_fd),
+    ]
+    try:
+        result = run_monitored(cmd, on_line=on_line, echo=echo, env=manim_env(), cwd=PROJECT_ROOT,
+                               cancel=cancel, limits=limits, pass_fds=(write_fd,))
+    except BaseException:
+        kill_group(encoder.pid)
+        raise
+    finally:
+        os.close(write_fd)  # EOF for the encoder
+
+    if result.returncode != 0 or result.cancelled or result.limit_exceeded:
+        # Don't leave a truncated reel behind
+        kill_group(encoder.pid)
+        encoder.wait()
+        Path(output_path).unlink(missing_ok=True)
+        return result
+    if encoder.wait() != 0:
+        Path(output_path).unlink(missing_ok=True)
+        raise RuntimeError(f"Frame sink encoder exited with {encoder.returncode}")
+    return result
+
+
+def _pipe_file_writer(stream):
+    """A SceneFileWriter that writes raw frames to stream and nothing to disk."""
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    class PipeFileWriter(SceneFileWriter):
+        def begin_animation(self, allow_write=False, file_path=None):
+            pass
+
+        def end_animation(self, allow_write=False):
+            pass
+
+        def write_frame(self, frame_or_renderer, num_frames=1):
+            frame = frame_or_renderer
+            if not hasattr(frame, "tobytes"):
+                frame = frame_or_renderer.get_frame()
+            data = frame.tobytes()
+            for _ in range(num_frames):
+                stream.write(data)
+
+        def finish(self):
+            stream.flush()
+
+    return PipeFileWriter
+
+
+def stream_scene(scene_path: Path, scene_name: str, profile: str, stream, media_dir: Path = None):
+    """
+    Render scene_name from scene_path, writing every frame to stream.
+
+    media_dir holds Tex/Text SVGs (e.g. the reel's seeded media dir); a
+    temporary dir is used when it is None.
+    """
+    from manim import tempconfig
+    from manim.camera.camera import Camera
+    from manim.renderer.cairo_renderer import CairoRenderer
+
+    settings = RENDER_PROFILES[profile]
+    workspace = nullcontext(str(media_dir)) if media_dir else tempfile.TemporaryDirectory()
+    with workspace as media_dir, tempconfig({
+        "pixel_width": settings["width"],
+        "pixel_height": settings["height"],
+        "frame_rate": settings["fps"],
+        "media_dir": media_dir,
+        # Cached animations would be skipped entirely, leaving gaps in the stream
+        "disable_caching": True,
+        "progress_bar": "none",
+    }):
+        spec = importlib.util.spec_from_file_location(Path(scene_path).stem, scene_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        scene_class = getattr(module, scene_name)
+
+        # A scene given an explicit renderer can't pick its own camera, so
+        # pass along the camera its __init__ would have used (e.g. ThreeDCamera)
+        camera_param = inspect.signature(scene_class.__init__).parameters.get("camera_class")
+        camera_class = camera_param.default if camera_param else Camera
+
+        renderer = CairoRenderer(
+            file_writer_class=_pipe_file_writer(stream),
+            camera_class=camera_class,
+        )
+        scene = scene_class(renderer=renderer)
+        scene.render()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a scene's frames as raw RGBA.")
+    parser.add_argument("scene_path")
+    parser.add_argument("scene_name")
+    parser.add_argument("--profile", choices=list(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE)
+    parser.add_argument("--media-dir", type=Path, default=None, help="Where Tex/Text SVGs are kept")
+    parser.add_argument("--fd", type=int, default=None, help="Write frames to this inherited fd (default: stdout)")
+    args = parser.parse_args()
+
+    if args.fd is not None:
+        frames_out = os.fdopen(args.fd, "wb")
+    else:
+        # Keep stdout for frames only; Manim's logging goes to stderr
+        frames_out = sys.stdout.buffer
+        sys.stdout = sys.stderr
+    stream_scene(Path(args.scene_path), args.scene_name, args.profile, frames_out, args.media_dir)
@@ -0,0 +1,65 @@
+"""Helpers for invoking the manim CLI and locating what it wrote."""
+
+import os
+from pathlib import Path
+
+from config import PROJECT_ROOT
+
+
+def build_manim_command(
+    scene_path: Path,
+    scene_name: str,
+    render_flags: dict,
+    media_dir: Path,
+    output_name: str,
+    extra_args: list = None
+) -> list:
+    """The manim command line for one render."""
+    cmd = [
+        "manim",
+        "--quality", render_flags["quality"],
+        "--resolution", render_flags["resolution"],
+        "--fps", str(render_flags["fps"]),
+        "--media_dir", str(media_dir),
+        "-o", output_name,
+    ]
+    cmd.extend(extra_args or [])
+    cmd.extend([str(scene_path), scene_name])
+    return cmd
+
+
+def manim_env() -> dict:
+    """Environment for Manim processes: scenes can import scene_lib from the project root."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def expected_video_path(media_dir: Path, scene_path: Path, render_flags: dict, output_name: str) -> Path:
+    """Where Manim writes the combined video: media_dir/videos/<module>/<height>p<fps>/<-o name>."""
+    height = render_flags["resolution"].split(",")[1]
+    quality_dir = f"{height}p{render_flags['fps']}"
+    return Path(media_dir) / "videos" / Path(scene_path).stem / quality_dir / output_name
+
+
+def locate_rendered_video(media_dir: Path, scene_path: Path, render_flags: dict, output_name: str) -> Path:
+    """The video Manim just wrote, resolved from its directory layout."""
+    expected = expected_video_path(media_dir, scene_path, render_flags, output_name)
+    if expected.exists():
+        return expected
+    # Layout differs (e.g. a different Manim version): fall back to the newest mp4
+    video = find_rendered_video(media_dir)
+    print(f"Warning: expected render at {expected}, using {video}")
+    return video
+
+
+def find_rendered_video(media_dir: Path) -> Path:
+    """The most recently written mp4 under media_dir."""
+    # Default manim structure: media_dir/videos/scene_filename/quality/<-o name>
+    possible_files = [
+        p for p in Path(media_dir).glob("**/*.mp4")
+        if "partial_movie_files" not in p.parts
+    ]
+    if not possible_files:
+        raise FileNotFoundError("Could not find rendered video file.")
+    return max(possible_files, key=os.path.getmtime)
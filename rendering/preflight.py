@@ -0,0 +1,199 @@
+"""AST-based pre-flight checks for generated scenes, run before spawning Manim."""
+
+import ast
+from pathlib import Path
+
+# Manim scene base classes and the capabilities they provide
+SCENE_BASES = {
+    "Scene": set(),
+    "MovingCameraScene": {"camera_frame"},
+    "ZoomedScene": {"camera_frame"},
+    "VectorScene": set(),
+    "LinearTransformationScene": set(),
+    "ThreeDScene": {"three_d"},
+    "SpecialThreeDScene": {"three_d"},
+}
+
+# Scene methods that only exist on ThreeDScene
+THREE_D_ONLY_METHODS = {
+    "set_camera_orientation",
+    "move_camera",
+    "begin_ambient_camera_rotation",
+    "stop_ambient_camera_rotation",
+    "begin_3dillusion_camera_rotation",
+    "stop_3dillusion_camera_rotation",
+    "add_fixed_in_frame_mobjects",
+    "remove_fixed_in_frame_mobjects",
+    "add_fixed_orientation_mobjects",
+    "remove_fixed_orientation_mobjects",
+}
+
+# Calls that always crash, with the fix from the README debugging table
+BANNED_CALLS = {
+    "fix_in_frame": "not supported in 2D scenes; use self.add() instead",
+}
+
+# Keyword arguments Manim constructors reject outright
+BAD_KWARGS = {
+    ("Square", "side"): "Square uses side_length=, not side=",
+}
+
+
+class PreflightError(RuntimeError):
+    """The generated scene is known to fail before Manim is even started."""
+
+    def __init__(self, scene_path: Path, problems: list):
+        self.scene_path = scene_path
+        self.problems = problems
+        details = "\n".join(f"  - {p}" for p in problems)
+        super().__init__(f"Pre-flight check failed for {scene_path}:\n{details}")
+
+    def __reduce__(self):
+        # Keep the fields when raised in a render worker process
+        return type(self), (self.scene_path, self.problems)
+
+
+def _base_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _resolve_scene_base(name: str, classes: dict, seen: set = None) -> str:
+    """Follow local subclassing until a Manim scene base class is reached."""
+    if name in SCENE_BASES:
+        return name
+    seen = seen or set()
+    if name in seen or name not in classes:
+        return None
+    seen.add(name)
+    for base in classes[name].bases:
+        resolved = _resolve_scene_base(_base_name(base), classes, seen)
+        if resolved:
+            return resolved
+    return None
+
+
+def _has_construct(name: str, classes: dict) -> bool:
+    """True if the class (or a locally defined parent) defines construct()."""
+    node = classes.get(name)
+    if node is None:
+        return False
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name == "construct":
+            return True
+    return any(_has_construct(_base_name(b), classes) for b in node.bases)
+
+
+def _is_self_camera_frame(node: ast.Attribute) -> bool:
+    """Matches self.camera.frame"""
+    return (
+        node.attr == "frame"
+        and isinstance(node.value, ast.Attribute)
+        and node.value.attr == "camera"
+        and isinstance(node.value.value, ast.Name)
+        and node.value.value.id == "self"
+    )
+
+
+def find_banned_calls(tree: ast.AST) -> list:
+    """Problems that are fatal regardless of the scene's base class."""
+    problems = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = _base_name(node.func)
+        if name in BANNED_CALLS:
+            problems.append(f"line {node.lineno}: {name}() {BANNED_CALLS[name]}")
+        for kw in node.keywords:
+            if (name, kw.arg) in BAD_KWARGS:
+                problems.append(f"line {node.lineno}: {BAD_KWARGS[(name, kw.arg)]}")
+    return problems
+
+
+def _check_scene_class(node: ast.ClassDef, base: str) -> list:
+    """Problems caused by using APIs the resolved base class does not provide."""
+    problems = []
+    capabilities = SCENE_BASES[base]
+    for child in ast.walk(node):
+        if (
+            "three_d" not in capabilities
+            and isinstance(child, ast.Call)
+            and isinstance(child.func, ast.Attribute)
+            and isinstance(child.func.value, ast.Name)
+            and child.func.value.id == "self"
+            and child.func.attr in THREE_D_ONLY_METHODS
+        ):
+            problems.append(
+                f"line {child.lineno}: self.{child.func.attr}() requires ThreeDScene, "
+                f"but {node.name} inherits from {base}"
+            )
+        if (
+            "camera_frame" not in capabilities
+            and isinstance(child, ast.Attribute)
+            and _is_self_camera_frame(child)
+        ):
+            problems.append(
+                f"line {child.lineno}: self.camera.frame requires MovingCameraScene, "
+                f"but {node.name} inherits from {base}"
+            )
+    return problems
+
+
+def partial_problems(tree: ast.Module) -> list:
+    """
+    Problems already visible in the first statements of a scene.
+
+    Used while a scene is still being generated, so only checks that can't
+    be invalidated by code that follows are applied.
+    """
+    problems = find_banned_calls(tree)
+    classes = {n.name: n for n in tree.body if isinstance(n, ast.ClassDef)}
+    for name, node in classes.items():
+        base = _resolve_scene_base(name, classes)
+        if base:
+            problems.extend(_check_scene_class(node, base))
+    return problems
+
+
+def preflight_check(scene_path: Path, scene_name: str = None) -> str:
+    """
+    Statically validate scene.py and return the name of the scene class to render.
+
+    Raises PreflightError listing every problem found.
+    """
+    source = Path(scene_path).read_text()
+    try:
+        tree = ast.parse(source, filename=str(scene_path))
+        compile(tree, str(scene_path), "exec")
+    except SyntaxError as e:
+        raise PreflightError(scene_path, [f"line {e.lineno}: SyntaxError: {e.msg}"])
+
+    classes = {n.name: n for n in tree.body if isinstance(n, ast.ClassDef)}
+    scenes = {}
+    for name in classes:
+        base = _resolve_scene_base(name, classes)
+        if base:
+            scenes[name] = base
+
+    if scene_name is None:
+        if "GeneratedScene" in scenes:
+            scene_name = "GeneratedScene"
+        elif scenes:
+            # The last scene defined is the most derived one
+            scene_name = list(scenes)[-1]
+        else:
+            raise PreflightError(scene_path, ["no Scene subclass found"])
+    elif scene_name not in scenes:
+        raise PreflightError(scene_path, [f"class {scene_name} is not a Scene subclass"])
+
+    problems = find_banned_calls(tree)
+    if not _has_construct(scene_name, classes):
+        problems.append(f"{scene_name} does not define construct()")
+    problems.extend(_check_scene_class(classes[scene_name], scenes[scene_name]))
+
+    if problems:
+        raise PreflightError(scene_path, problems)
+    return scene_name
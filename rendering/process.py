@@ -0,0 +1,253 @@
+"""Run render subprocesses while streaming their output and sampling memory."""
+
+import collections
+import os
+import resource
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from observability.tracing import Cancelled
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+OUTPUT_TAIL_LINES = 500  # Output lines kept for failure reports; the traceback comes last
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a monitored subprocess."""
+    returncode: int
+    wall_seconds: float
+    peak_rss_bytes: int
+    output: list = field(default_factory=list)  # The last OUTPUT_TAIL_LINES lines
+    cancelled: bool = False
+    limit_exceeded: str = None  # "timeout" or "memory" when the governor killed the process
+    limit_detail: str = None
+
+
+@dataclass
+class ResourceLimits:
+    """Per-render ceilings and scheduling; None leaves a setting alone."""
+    timeout_seconds: float = None
+    max_rss_bytes: int = None  # Whole process tree (Manim, ffmpeg, latex)
+    nice: int = None
+    cpu_affinity: set = None
+
+
+def parse_cpu_list(spec: str) -> set:
+    """CPUs named by a Linux-style list such as "0-3,8" (empty/None -> None)."""
+    if not spec:
+        return None
+    cpus = set()
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+class RenderCancelled(RuntimeError, Cancelled):
+    """The render was stopped through its cancel event, e.g. a competing candidate won."""
+
+
+class RenderResourceExceeded(RuntimeError):
+    """The render was killed for running past its timeout or memory ceiling."""
+
+    def __init__(self, scene_path: Path, limit: str, detail: str):
+        super().__init__(f"Render of {scene_path} killed: {limit} limit exceeded ({detail})")
+        self.scene_path = scene_path
+        self.limit = limit
+        self.detail = detail
+
+    def __reduce__(self):
+        # Keep the fields when raised in a render worker process
+        return type(self), (self.scene_path, self.limit, self.detail)
+
+
+def _children(pid: int) -> list:
+    """Direct children of pid, read from /proc."""
+    try:
+        children = []
+        for task in Path(f"/proc/{pid}/task").iterdir():
+            children.extend(int(c) for c in (task / "children").read_text().split())
+        return children
+    except OSError:
+        pass
+
+    # Kernels without /proc/<pid>/task/<tid>/children: scan every process
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # ppid is the 2nd field after the parenthesised command name
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return children
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """Resident memory of pid and all of its descendants (e.g. ffmpeg, latex)."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            pages = int(Path(f"/proc/{current}/statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        total += pages * PAGE_SIZE
+        pending.extend(_children(current))
+    return total
+
+
+def _running(pid: int) -> bool:
+    """True unless pid has exited (zombies waiting to be reaped count as exited)."""
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return False
+
+
+def kill_tree(pid: int, grace: float = 2.0):
+    """SIGTERM pid and its descendants, then SIGKILL whatever is left after grace seconds."""
+    pids = []
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        pending.extend(_children(current))
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for target in pids:
+            try:
+                os.kill(target, sig)
+            except OSError:
+                pass
+        deadline = time.monotonic() + grace
+        while sig == signal.SIGTERM and time.monotonic() < deadline:
+            if not any(_running(p) for p in pids):
+                return
+            time.sleep(0.05)
+
+
+def kill_group(pid: int, grace: float = 2.0):
+    """kill_tree, then SIGKILL pid's process group for anything reparented out of the tree."""
+    kill_tree(pid, grace)
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _apply_scheduling(pid: int, limits: ResourceLimits):
+    """Nice level and CPU affinity for pid; processes it starts later inherit both."""
+    try:
+        if limits.nice is not None:
+            os.setpriority(os.PRIO_PROCESS, pid, limits.nice)
+        if limits.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, limits.cpu_affinity)
+    except OSError as e:
+        print(f"Warning: could not apply render scheduling limits ({e})")
+
+
+def run_monitored(
+    cmd: list,
+    on_line=None,
+    echo=None,
+    sample_interval: float = 0.25,
+    env: dict = None,
+    cwd: Path = None,
+    cancel: threading.Event = None,
+    limits: ResourceLimits = None,
+    pass_fds: tuple = ()
+) -> ProcessResult:
+    """
+    Run cmd, feeding each output line (stdout and stderr merged) to on_line.
+
+    Lines for which echo(line) is true are also printed. Memory of the whole
+    process tree is sampled every sample_interval seconds. Setting cancel
+    kills the process tree; the result then has cancelled=True. limits adds
+    a wall-clock timeout and a tree RSS ceiling, enforced by killing the
+    process group (the result then names the limit in limit_exceeded), and
+    the child's nice level and CPU affinity. pass_fds are inherited by the
+    child (e.g. the write end of a frame pipe). Every line goes to on_line,
+    but only the last OUTPUT_TAIL_LINES are kept in the result, so a long
+    render's progress updates don't accumulate in this process.
+    """
+    limits = limits or ResourceLimits()
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,  # Universal newlines: progress bars' \r also ends a line
+        errors="replace",
+        env=env,
+        cwd=cwd,
+        start_new_session=True,  # Own process group, so ffmpeg/latex children die with it
+        pass_fds=pass_fds,
+    )
+    _apply_scheduling(proc.pid, limits)
+
+    peak = [0]
+    done = threading.Event()
+    cancelled = [False]
+    exceeded = [None, None]  # limit, detail
+
+    def sample():
+        while not done.is_set():
+            if cancel is not None and cancel.is_set():
+                cancelled[0] = True
+                kill_group(proc.pid)
+                return
+            rss = tree_rss_bytes(proc.pid)
+            peak[0] = max(peak[0], rss)
+            elapsed = time.monotonic() - start
+            if limits.timeout_seconds and elapsed > limits.timeout_seconds:
+                exceeded[:] = ["timeout", f"still running after {limits.timeout_seconds:.0f}s"]
+            elif limits.max_rss_bytes and rss > limits.max_rss_bytes:
+                exceeded[:] = ["memory", f"{rss / 1024**2:.0f} MB resident, "
+                                         f"limit {limits.max_rss_bytes / 1024**2:.0f} MB"]
+            if exceeded[0]:
+                kill_group(proc.pid)
+                return
+            done.wait(sample_interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    output = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            output.append(line)
+            if on_line:
+                on_line(line)
+            if echo and echo(line):
+                print(line)
+        returncode = proc.wait()
+    except BaseException:
+        # e.g. Ctrl-C: the child is in its own session and won't get the SIGINT
+        kill_group(proc.pid)
+        raise
+    finally:
+        done.set()
+        sampler.join()
+
+    peak_rss = peak[0]
+    if not peak_rss:
+        # No /proc (e.g. macOS): fall back to the largest child ever waited on
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+    return ProcessResult(
+        returncode=returncode,
+        wall_seconds=time.monotonic() - start,
+        peak_rss_bytes=peak_rss,
+        output=list(output),
+        cancelled=cancelled[0],
+        limit_exceeded=exceeded[0],
+        limit_detail=exceeded[1],
+    )
@@ -0,0 +1,95 @@
+"""Skip-if-unchanged render cache keyed by a fingerprint of scene and render flags."""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from config import PROJECT_ROOT, RENDER_CACHE_DIR
+
+SCENE_LIB_DIR = PROJECT_ROOT / "scene_lib"
+
+
+def _manim_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("manim")
+    except Exception:
+        return "unknown"
+
+
+def _scene_lib_sha256() -> str:
+    """Hash of the scene_lib sources, which scenes import at render time."""
+    digest = hashlib.sha256()
+    for path in sorted(SCENE_LIB_DIR.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compute_fingerprint(scene_path: Path, scene_name: str, render_flags: dict) -> dict:
+    """Everything that determines the rendered video, as a JSON-serialisable dict."""
+    source = scene_path.read_bytes()
+    fingerprint = {
+        "scene_sha256": hashlib.sha256(source).hexdigest(),
+        "scene_class": scene_name,
+        "manim_version": _manim_version(),
+    }
+    if b"scene_lib" in source:
+        fingerprint["scene_lib_sha256"] = _scene_lib_sha256()
+    fingerprint.update(render_flags)
+    fingerprint["id"] = hashlib.sha256(
+        json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return fingerprint
+
+
+def fingerprint_path(output_file: Path) -> Path:
+    """Sidecar file recording the fingerprint of output_file."""
+    return output_file.with_suffix(".fingerprint.json")
+
+
+def is_up_to_date(output_file: Path, fingerprint: dict) -> bool:
+    """True if output_file exists and was produced from the same fingerprint."""
+    if not output_file.exists():
+        return False
+    try:
+        recorded = json.loads(fingerprint_path(output_file).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return recorded.get("id") == fingerprint["id"]
+
+
+def record(output_file: Path, fingerprint: dict):
+    """Write the fingerprint sidecar for a freshly produced output_file."""
+    fingerprint_path(output_file).write_text(json.dumps(fingerprint, indent=2))
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-link src to dst when possible (same filesystem), otherwise copy."""
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def fetch_shared(fingerprint: dict, output_file: Path, store_dir: Path = RENDER_CACHE_DIR) -> bool:
+    """Materialise a previously stored encode at output_file. Returns True on a hit."""
+    cached = store_dir / f"{fingerprint['id']}.mp4"
+    if not cached.exists():
+        return False
+    _link_or_copy(cached, output_file)
+    record(output_file, fingerprint)
+    return True
+
+
+def store_shared(fingerprint: dict, output_file: Path, store_dir: Path = RENDER_CACHE_DIR):
+    """Publish output_file to the shared store so identical scenes reuse it."""
+    store_dir.mkdir(parents=True, exist_ok=True)
+    cached = store_dir / f"{fingerprint['id']}.mp4"
+    if not cached.exists():
+        _link_or_copy(output_file, cached)
@@ -1,13 +1,108 @@
 
-import subprocess
 import json
 import sys
+import threading
 from pathlib import Path
+from config import (
+    RENDER_PROFILES, DEFAULT_RENDER_PROFILE, VALIDATION_PROFILE, RENDER_SEGMENTS, RENDER_BACKEND,
+    RENDER_TIMEOUT_BASE_SECONDS, RENDER_TIMEOUT_PER_VIDEO_SECOND, RENDER_TIMEOUT_SCALE,
+    RENDER_MAX_RSS_BYTES, RENDER_NICE, RENDER_CPU_AFFINITY, TEX_PREWARM_WORKERS,
+)
+from rendering import render_cache, storage, tex_cache, worker
+from rendering.preflight import preflight_check
+from rendering.cost_estimate import enforce_render_budget
+from rendering.manim_cli import build_manim_command, locate_rendered_video, manim_env
+from rendering.failure import RenderFailure
+from rendering.frame_pipe import FrameSink, stream_render
+from rendering.process import RenderCancelled, RenderResourceExceeded, ResourceLimits, parse_cpu_list, run_monitored
+from rendering.telemetry import RenderTelemetry, is_progress_line, write_render_stats
+from rendering.segments import render_segmented, SegmentationUnavailable
+from observability import tracing
 
-def render_from_plan(visual_plan_path: Path, output_file: Path):
+# render_stats.json fields copied onto the "render" trace span
+RENDER_SPAN_STATS = ("backend", "returncode", "wall_seconds", "peak_rss_bytes", "frames_written", "tex_seconds",
+                     "limit_exceeded")
+
+def reel_output_path(output_dir: Path, profile: str = DEFAULT_RENDER_PROFILE) -> Path:
+    """Where a reel rendered with the given profile is saved."""
+    if profile == "final":
+        return output_dir / "final_reel.mp4"
+    return output_dir / f"{profile}_reel.mp4"
+
+def render_stats_path(output_dir: Path, profile: str = DEFAULT_RENDER_PROFILE) -> Path:
+    """Where telemetry for a render with the given profile is saved."""
+    if profile == "final":
+        return output_dir / "render_stats.json"
+    return output_dir / f"{profile}_render_stats.json"
+
+def render_limits(profile: str, length: float) -> ResourceLimits:
+    """Resource ceilings for rendering a reel of the requested length (seconds) with profile."""
+    timeout = None
+    if RENDER_TIMEOUT_SCALE > 0:
+        per_second = RENDER_TIMEOUT_PER_VIDEO_SECOND.get(profile, max(RENDER_TIMEOUT_PER_VIDEO_SECOND.values()))
+        timeout = (RENDER_TIMEOUT_BASE_SECONDS + per_second * length) * RENDER_TIMEOUT_SCALE
+    return ResourceLimits(
+        timeout_seconds=timeout,
+        max_rss_bytes=RENDER_MAX_RSS_BYTES or None,
+        nice=RENDER_NICE,
+        cpu_affinity=parse_cpu_list(RENDER_CPU_AFFINITY),
+    )
+
+def render_from_plan(
+    visual_plan_path: Path,
+    output_file: Path,
+    use_cache: bool = True,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    validate_first: bool = False,
+    check_budget: bool = True,
+    segments: int = RENDER_SEGMENTS,
+    cancel: threading.Event = None,
+    keep_partials: bool = False,
+    sink: FrameSink = None,
+    tex_workers: int = TEX_PREWARM_WORKERS
+):
     """
     Renders a Manim scene based on the visual plan.
+
+    The resolution, fps and quality come from the named profile in
+    config.RENDER_PROFILES. With validate_first, a cheap draft pass runs
+    first and the requested profile is only rendered if the draft succeeds.
+    Scenes predicted to blow the render budget raise RenderBudgetError
+    unless check_budget is False. With segments > 1 the scene is rendered as
+    that many parallel animation ranges when it can be split safely.
+    Setting cancel kills a running render and raises RenderCancelled.
+    A render that outlives the timeout for the requested length or exceeds
+    the memory cap (see render_limits) is killed and raises
+    RenderResourceExceeded.
+    A failed Manim run raises RenderFailure; keep_partials keeps its media
+    dir regardless of KEEP_INTERMEDIATES, so a re-render of a repaired scene
+    reuses the partial movie files of the animations that already finished.
+    With a sink (e.g. the compositor's background stack), frames are piped
+    straight into the sink's ffmpeg and output_file is its result, so the
+    reel is encoded once instead of as an mp4 first; the validate-first
+    draft is still a plain render. tex_workers bounds the LaTeX prewarm
+    pool (callers running several renders at once split TEX_PREWARM_WORKERS).
+
+    If output_file was already rendered from an identical scene with identical
+    render flags (or another reel has the same scene), the render is skipped.
     """
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{profile}'. Choose from: {', '.join(RENDER_PROFILES)}")
+    
+    if validate_first and profile != VALIDATION_PROFILE:
+        print(f"Validating with a {VALIDATION_PROFILE} render before the {profile} render...")
+        render_from_plan(
+            visual_plan_path,
+            reel_output_path(visual_plan_path.parent, VALIDATION_PROFILE),
+            use_cache=use_cache,
+            profile=VALIDATION_PROFILE,
+            check_budget=check_budget,
+            segments=segments,
+            cancel=cancel,
+            tex_workers=tex_workers
+        )
+        print(f"{VALIDATION_PROFILE.capitalize()} render succeeded, promoting to {profile}.")
+    
     plan = json.loads(visual_plan_path.read_text())
     manim_code = plan.get("manim_code", "")
     
@@ -17,52 +112,172 @@ def render_from_plan(visual_plan_path: Path, output_file: Path):
         # Wrap in minimal scene if needed, but generator usually handles this
         scene_path.write_text(manim_code)
     
-    # We assume the class name is 'GeneratedScene' based on generator.py logic
-    # But it might be different if the LLM generated a full file.
-    # We can try to grep the class name or just rely on 'GeneratedScene'
+    with tracing.span("pre_render_checks", profile=profile, scene=str(scene_path)) as checks:
+        # Resolve the real Scene subclass and reject known-fatal code in
+        # milliseconds, before paying for a Manim launch and LaTeX warmup
+        scene_name = preflight_check(scene_path)
+        checks.set(scene_class=scene_name)
     
-    # Quick regex to find class name
-    import re
-    match = re.search(r"class\s+(\w+)\s*\(", manim_code)
-    scene_name = match.group(1) if match else "GeneratedScene"
+        estimate = None
+        if check_budget:
+            estimate = enforce_render_budget(
+                scene_path,
+                length=plan.get("length"),
+                estimated_duration=plan.get("estimated_duration"),
+                profile=profile
+            )
+            print(f"Estimated: {estimate.duration:.1f}s video, {estimate.frames} frames, "
+                  f"~{estimate.render_seconds:.0f}s to render")
+            checks.set(estimated_render_seconds=round(estimate.render_seconds, 1))
     
-    cmd = [
-        "manim",
-        "--quality", "h", # High quality rendering
-        "--resolution", "1080,1920",
-        "--fps", "60",
-        "--media_dir", str(visual_plan_path.parent / "media"),
-        "-o", str(output_file.name),
-        str(scene_path),
-        scene_name
-    ]
+        settings = RENDER_PROFILES[profile]
+        render_flags = {
+            "profile": profile,
+            "quality": settings["quality"],
+            "resolution": f"{settings['width']},{settings['height']}",
+            "fps": settings["fps"],
+        }
+        fingerprint = render_cache.compute_fingerprint(
+            scene_path, scene_name, dict(render_flags, sink=sink.key()) if sink else render_flags
+        )
     
-    print(f"Executing: {' '.join(cmd)}")
+        if use_cache:
+            if render_cache.is_up_to_date(output_file, fingerprint):
+                print(f"Render up to date, skipping: {output_file}")
+                checks.set(outcome="up_to_date")
+                return
+            if render_cache.fetch_shared(fingerprint, output_file):
+                print(f"Reused identical render {fingerprint['id'][:12]}: {output_file}")
+                checks.set(outcome="shared_render")
+                return
+        checks.set(outcome="render")
     
-    # Manim writes output to specific folders (media/videos/scene/quality/name.mp4)
-    # We need to capture where it puts it and move it to output_file
+    media_dir = storage.media_workspace(visual_plan_path.parent)
+    stats_path = render_stats_path(visual_plan_path.parent, profile)
+    if sink:
+        # Keep the plain render's stats alongside
+        stats_path = stats_path.with_name(f"{output_file.stem}_{stats_path.name}")
+    stats = {"profile": profile, "scene_class": scene_name, "render_flags": render_flags}
+    limits = render_limits(profile, plan.get("length") or plan.get("estimated_duration") or 30)
     
-    result = subprocess.run(cmd, check=False)
-    if result.returncode != 0:
-        print("Manim render failed!")
-        raise RuntimeError("Manim render failed")
-    
-    # Locate the output file
-    # Default manim structure: media_dir/videos/scene_filename/quality/scene_name.mp4
-    # But since we passed -o output_file.name, it might be in media_dir/videos/scene_filename/quality/output_file.name.mp4
-    # Actually -o specifies the filename. 
-    
-    # Let's search for the file
-    possible_files = list((visual_plan_path.parent / "media").glob("**/*.mp4"))
-    if not possible_files:
-        raise FileNotFoundError("Could not find rendered video file.")
-        
-    # Get the most recently modified mp4
-    latest_video = max(possible_files, key=os.path.getmtime)
-    
-    # Move/Copy to final destination
-    import shutil
-    shutil.move(str(latest_video), str(output_file))
+    # Make room before adding another media tree, never touching live renders
+    storage.enforce_disk_quota()
+    
+    with storage.in_use(media_dir):
+        # Build this scene's new Tex/Text in parallel, then link in the SVGs of all its calls
+        with tracing.span("tex_prewarm", scene=str(scene_path)) as s:
+            stats["tex_prewarm"] = tex_cache.prewarm(scene_path, workers=tex_workers)
+            s.set(**stats["tex_prewarm"])
+        if stats["tex_prewarm"]["compiled"]:
+            print(f"Prewarmed {stats['tex_prewarm']['compiled']} Tex/Text object(s) in parallel")
+        tex_cache.seed(media_dir, scene_path)
+        try:
+            with tracing.span("render", profile=profile, scene=str(scene_path), segments=segments) as s:
+                try:
+                    rendered_video = _run_manim(
+                        scene_path, scene_name, render_flags, media_dir,
+                        output_file.name, segments, estimate, stats, cancel, limits, sink
+                    )
+                finally:
+                    s.set(**{k: stats.get(k) for k in RENDER_SPAN_STATS})
+            # Move to final destination without exposing a partial file
+            with tracing.span("output_move", output=str(output_file)) as s:
+                storage.promote(rendered_video, output_file)
+                s.set(output_bytes=output_file.stat().st_size)
+        except Exception:
+            write_render_stats(stats_path, stats)
+            if not keep_partials:
+                storage.cleanup_intermediates(media_dir, succeeded=False)
+            raise
+    storage.cleanup_intermediates(media_dir, succeeded=True)
+    
+    render_cache.record(output_file, fingerprint)
+    render_cache.store_shared(fingerprint, output_file)
+    
+    stats["output_path"] = str(output_file)
+    stats["output_bytes"] = output_file.stat().st_size
+    write_render_stats(stats_path, stats)
     print(f"Rendered video saved to: {output_file}")
 
-import os
+def _run_manim(
+    scene_path: Path,
+    scene_name: str,
+    render_flags: dict,
+    media_dir: Path,
+    output_name: str,
+    segments: int,
+    estimate,
+    stats: dict,
+    cancel: threading.Event = None,
+    limits: ResourceLimits = None,
+    sink: FrameSink = None
+) -> Path:
+    """
+    Run Manim (segmented when possible) and return the rendered video; fills stats.
+
+    Serial renders go to the warm worker daemon when RENDER_BACKEND is
+    "worker" and it is running; segmented renders always use the CLI.
+    With a sink, one frame_pipe process streams into the sink's encoder.
+    """
+    if segments > 1 and sink is None:
+        try:
+            rendered_video, segment_stats = render_segmented(
+                scene_path, scene_name, render_flags, media_dir,
+                output_name, segments, estimate, cancel, limits
+            )
+            stats["segments"] = segment_stats
+            stats["wall_seconds"] = max(s["wall_seconds"] for s in segment_stats)
+            stats["peak_rss_bytes"] = sum(s["peak_rss_bytes"] for s in segment_stats)
+            return rendered_video
+        except SegmentationUnavailable as e:
+            print(f"Section-parallel render unavailable ({e}); rendering serially.")
+    
+    # Capture Manim's output for per-animation telemetry, echoing all
+    # but the progress-bar updates
+    telemetry = RenderTelemetry()
+    echo = lambda line: not is_progress_line(line)
+    result = None
+    if sink is not None:
+        rendered_video = Path(media_dir) / output_name
+        result = stream_render(
+            scene_path, scene_name, render_flags, media_dir, rendered_video, sink,
+            on_line=telemetry.feed, echo=echo, cancel=cancel, limits=limits
+        )
+        stats.update({"backend": "stream", "sink": sink.key()})
+    elif RENDER_BACKEND == "worker":
+        try:
+            result = worker.render(
+                scene_path, scene_name, render_flags, media_dir, output_name,
+                on_line=telemetry.feed, echo=echo, cancel=cancel, limits=limits
+            )
+            stats["backend"] = "worker"
+        except worker.WorkerUnavailable as e:
+            print(f"Warning: {e}; falling back to the manim CLI.")
+    
+    if result is None:
+        cmd = build_manim_command(scene_path, scene_name, render_flags, media_dir, output_name)
+        print(f"Executing: {' '.join(cmd)}")
+        result = run_monitored(cmd, on_line=telemetry.feed, echo=echo, env=manim_env(),
+                               cancel=cancel, limits=limits)
+        stats.update({"backend": "cli", "command": cmd})
+    stats.update({
+        "returncode": result.returncode,
+        "wall_seconds": round(result.wall_seconds, 3),
+        "peak_rss_bytes": result.peak_rss_bytes,
+    })
+    stats.update(telemetry.summary())
+    
+    if result.cancelled:
+        stats["cancelled"] = True
+        raise RenderCancelled(f"Render of {scene_path} cancelled")
+    if result.limit_exceeded:
+        stats.update({"limit_exceeded": result.limit_exceeded, "limit_detail": result.limit_detail})
+        print(f"Manim render killed: {result.limit_exceeded} limit exceeded ({result.limit_detail})")
+        raise RenderResourceExceeded(scene_path, result.limit_exceeded, result.limit_detail)
+    if result.returncode != 0:
+        print("Manim render failed!")
+        raise RenderFailure(scene_path, result.output, telemetry.completed_animations())
+    
+    if sink is not None:
+        return rendered_video
+    return locate_rendered_video(media_dir, scene_path, render_flags, output_name)
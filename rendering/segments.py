@@ -0,0 +1,254 @@
+"""Section-parallel rendering: split a scene by animation index and stitch without re-encoding."""
+
+import ast
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config import MIN_ANIMATIONS_PER_SEGMENT
+from rendering import tex_cache
+from rendering.cost_estimate import RenderEstimate, estimate_render_cost
+from rendering.manim_cli import build_manim_command, locate_rendered_video, manim_env
+from rendering.failure import RenderFailure
+from rendering.process import RenderCancelled, RenderResourceExceeded, ResourceLimits, run_monitored
+from rendering.telemetry import RenderTelemetry
+
+# Time-dependent state that is not reproduced exactly when Manim skips animations
+UPDATER_CALLS = {
+    "add_updater",
+    "always_redraw",
+    "begin_ambient_camera_rotation",
+    "begin_3dillusion_camera_rotation",
+    "TracedPath",
+}
+
+
+class SegmentationUnavailable(RuntimeError):
+    """The scene can't be split safely; render it serially instead."""
+
+
+def _unsafe_reason(tree: ast.AST) -> str:
+    """Why segments of this scene might differ from a serial render, or None."""
+    uses_random = seeds_random = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            if node.attr in UPDATER_CALLS:
+                return f"uses {node.attr}"
+            chain = ast.unparse(node)
+            if chain.startswith(("random.", "np.random.", "numpy.random.")):
+                if chain.endswith(".seed"):
+                    seeds_random = True
+                else:
+                    uses_random = True
+        elif isinstance(node, ast.Name) and node.id in UPDATER_CALLS:
+            return f"uses {node.id}"
+    if uses_random and not seeds_random:
+        return "uses unseeded randomness"
+    return None
+
+
+def plan_segments(scene_path: Path, estimate: RenderEstimate, workers: int) -> list:
+    """
+    Split the scene's animations into contiguous inclusive index ranges.
+
+    Raises SegmentationUnavailable when the animation count is not known
+    exactly or the scene has state that skipping animations can't reproduce.
+    """
+    if not estimate.exact:
+        raise SegmentationUnavailable("animation count could not be determined statically")
+    reason = _unsafe_reason(ast.parse(Path(scene_path).read_text()))
+    if reason:
+        raise SegmentationUnavailable(reason)
+
+    # Every play() and wait() is one animation in Manim's numbering
+    total = estimate.play_calls + estimate.wait_calls
+    count = min(workers, total // MIN_ANIMATIONS_PER_SEGMENT)
+    if count < 2:
+        raise SegmentationUnavailable(f"only {total} animations")
+
+    ranges = []
+    for k in range(count):
+        start = k * total // count
+        end = (k + 1) * total // count - 1
+        ranges.append((start, end))
+    return ranges
+
+
+def count_frames(video_path: Path) -> int:
+    """Number of video packets (= frames) in video_path."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-count_packets",
+        "-show_entries", "stream=nb_read_packets",
+        "-of", "csv=p=0",
+        str(video_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to count frames: {result.stderr}")
+    return int(result.stdout.strip())
+
+
+def concat_videos(parts: list, output_path: Path):
+    """Stitch videos with the ffmpeg concat demuxer, stream-copying (no re-encode)."""
+    list_file = output_path.with_suffix(".txt")
+    list_file.write_text("".join(f"file '{Path(p).resolve()}'\n" for p in parts))
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "concat", "-safe", "0",
+        "-i", str(list_file),
+        "-c", "copy",
+        str(output_path)
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def partial_movie_files(media_dir: Path) -> list:
+    """
+    The partial movie files Manim combined into the video rendered in
+    media_dir, one per rendered animation in order. Each is named after
+    Manim's hash of the camera, the animation and every mobject on screen
+    when it started.
+    """
+    lists = list(Path(media_dir).glob("videos/*/*/partial_movie_files/*/partial_movie_file_list.txt"))
+    if len(lists) != 1:
+        raise SegmentationUnavailable(f"expected one partial movie file list in {media_dir}, found {len(lists)}")
+    files = []
+    for line in lists[0].read_text().splitlines():
+        line = line.strip()
+        if line.startswith("file "):
+            path = Path(line[len("file "):].strip("'").removeprefix("file:"))
+            files.append(path if path.is_absolute() else lists[0].parent / path)
+    return files
+
+
+def check_boundary(k: int, animation: int, reached: list, started: list):
+    """
+    Raise SegmentationUnavailable unless segment k+1 starts from the scene
+    state a serial render reaches.
+
+    Segment k also renders the next segment's first animation after playing
+    the one before it, so the hash of that overlap animation is the serial
+    state at the boundary (segment 0 starts from the beginning, so by
+    induction every boundary is checked against a serial run). Segment k+1
+    reached the same animation by skipping instead; any difference in the
+    mobjects on screen changes the hash.
+    """
+    if not reached or not started or reached[-1].name != started[0].name:
+        raise SegmentationUnavailable(
+            f"segment {k + 1} starts animation {animation} from a different scene state "
+            f"than a serial render reaches"
+        )
+
+
+def _check_segment(part: Path, stats: dict, start: int, end: int, estimate: RenderEstimate, fps: float):
+    """Raise SegmentationUnavailable unless the part holds animations start..end as planned."""
+    rendered = sorted(a["index"] for a in stats.get("animations", []) if a["seconds"] is not None)
+    if rendered and rendered != list(range(start, end + 1)):
+        raise SegmentationUnavailable(
+            f"segment {stats['segment']} rendered animations {rendered[0]}-{rendered[-1]}, planned {start}-{end}"
+        )
+    frames = count_frames(part)
+    planned = estimate.animation_frames(start, end, fps)
+    # Manim rounds each animation to whole frames
+    if abs(frames - planned) > end - start + 1:
+        raise SegmentationUnavailable(
+            f"segment {stats['segment']} (animations {start}-{end}) has {frames} frames, plan predicts {planned}"
+        )
+
+
+def render_segmented(
+    scene_path: Path,
+    scene_name: str,
+    render_flags: dict,
+    media_dir: Path,
+    output_name: str,
+    workers: int,
+    estimate: RenderEstimate = None,
+    cancel: threading.Event = None,
+    limits: ResourceLimits = None
+) -> tuple:
+    """
+    Render the scene as parallel `-n start,end` segments and concatenate them.
+
+    Returns (stitched video path, list of per-segment render stats).
+    Each segment runs in its own Manim process with its own media dir,
+    seeded from the shared Tex/Text cache. Every segment but the last also
+    renders the next segment's first animation, so each boundary's scene
+    state is checked against a serial render (check_boundary); the overlap
+    is left out when the partial movie files are stitched. Each segment
+    must also have rendered exactly its planned animations with their
+    predicted frames, and the stitched video the sum of them; on any
+    mismatch SegmentationUnavailable is raised so the caller can fall back
+    to a serial render. limits apply to each segment process.
+    """
+    if estimate is None:
+        estimate = estimate_render_cost(scene_path, scene_name, render_flags["profile"])
+    ranges = plan_segments(scene_path, estimate, workers)
+
+    segments_dir = Path(media_dir) / "segments"
+    shutil.rmtree(segments_dir, ignore_errors=True)
+    segments_dir.mkdir(parents=True)
+
+    def render_one(k: int) -> tuple:
+        start, end = ranges[k]
+        # Overlap the next segment's first animation, for check_boundary; the
+        # last segment is open-ended so it also captures the final frames
+        span = f"{start},{end + 1}" if k < len(ranges) - 1 else f"{start}"
+        seg_media = segments_dir / f"seg_{k:03d}"
+        seg_name = f"seg_{k:03d}.mp4"
+        # -n still runs all of construct(), so every segment needs the scene's LaTeX
+        tex_cache.seed(seg_media, scene_path)
+        cmd = build_manim_command(
+            scene_path, scene_name, render_flags, seg_media,
+            seg_name, extra_args=["-n", span]
+        )
+        telemetry = RenderTelemetry()
+        result = run_monitored(cmd, on_line=telemetry.feed, env=manim_env(), cancel=cancel, limits=limits)
+        if result.cancelled:
+            raise RenderCancelled(f"Segment {k} cancelled")
+        if result.limit_exceeded:
+            raise RenderResourceExceeded(scene_path, result.limit_exceeded,
+                                         f"segment {k}: {result.limit_detail}")
+        if result.returncode != 0:
+            tail = "\n".join(result.output[-30:])
+            raise RenderFailure(scene_path, result.output,
+                                message=f"Segment {k} (animations {span}) failed:\n{tail}")
+        stats = {
+            "segment": k,
+            "animations": span,
+            "wall_seconds": round(result.wall_seconds, 3),
+            "peak_rss_bytes": result.peak_rss_bytes,
+        }
+        stats.update(telemetry.summary())
+        return locate_rendered_video(seg_media, scene_path, render_flags, seg_name), stats
+
+    print(f"Rendering {len(ranges)} segments in parallel: {ranges}")
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        results = list(pool.map(render_one, range(len(ranges))))
+    last = len(ranges) - 1
+    partials = [partial_movie_files(segments_dir / f"seg_{k:03d}") for k in range(len(ranges))]
+    for k, ((start, end), (part, stats)) in enumerate(zip(ranges, results)):
+        _check_segment(part, stats, start, end + (k < last), estimate, render_flags["fps"])
+        if k < last:
+            check_boundary(k, end + 1, partials[k], partials[k + 1])
+
+    # Stitch the animations' own files, leaving out each overlap
+    files = [f for k, seg in enumerate(partials) for f in (seg[:-1] if k < last else seg)]
+    combined = segments_dir / output_name
+    concat_videos(files, combined)
+
+    frames = count_frames(combined)
+    expected = sum(count_frames(f) for f in files)
+    if frames != expected:
+        raise SegmentationUnavailable(f"stitched video has {frames} frames, its animations have {expected}")
+    # Manim rounds each animation to whole frames, so allow one frame per animation
+    tolerance = estimate.play_calls + estimate.wait_calls
+    if abs(frames - estimate.frames) > tolerance:
+        raise SegmentationUnavailable(
+            f"stitched video has {frames} frames, serial render predicts {estimate.frames}"
+        )
+    return combined, [stats for _, stats in results]
@@ -0,0 +1,164 @@
+"""Storage policy for render intermediates: scratch dirs, promotion, retention and quota."""
+
+import hashlib
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import (
+    OUTPUT_DIR,
+    RENDER_CACHE_DIR,
+    RENDER_SCRATCH_DIR,
+    TEX_CACHE_DIR,
+    KEEP_INTERMEDIATES,
+    INTERMEDIATE_MAX_AGE_HOURS,
+    MEDIA_DISK_QUOTA_BYTES,
+)
+
+ACTIVE_MARKER = ".render_active"
+
+
+def media_workspace(reel_dir: Path) -> Path:
+    """
+    The Manim media dir for a reel.
+
+    With RENDER_SCRATCH_DIR set (ideally a tmpfs such as /dev/shm), the
+    hundreds of partial movie files live in RAM instead of on disk.
+    """
+    if not RENDER_SCRATCH_DIR:
+        return reel_dir / "media"
+    # Hash the full path so reels with the same name in different roots don't collide
+    tag = hashlib.sha256(str(reel_dir.resolve()).encode("utf-8")).hexdigest()[:8]
+    return Path(RENDER_SCRATCH_DIR) / f"{reel_dir.name}-{tag}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_active(media_dir: Path) -> bool:
+    try:
+        pid = int((media_dir / ACTIVE_MARKER).read_text())
+    except (OSError, ValueError):
+        return False
+    return _pid_alive(pid)
+
+
+@contextmanager
+def in_use(media_dir: Path):
+    """Mark media_dir as belonging to a running render so eviction skips it."""
+    media_dir.mkdir(parents=True, exist_ok=True)
+    marker = media_dir / ACTIVE_MARKER
+    marker.write_text(str(os.getpid()))
+    try:
+        yield media_dir
+    finally:
+        marker.unlink(missing_ok=True)
+
+
+def promote(src: Path, dst: Path):
+    """
+    Atomically place a finished video at dst.
+
+    Readers never see a half-written file: the video is copied next to dst
+    (which may be on another filesystem than a tmpfs scratch dir), flushed,
+    and renamed over dst in one step.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    try:
+        os.replace(src, tmp)  # Same filesystem: a cheap rename
+    except OSError:
+        shutil.copyfile(src, tmp)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        Path(src).unlink(missing_ok=True)
+    os.replace(tmp, dst)
+
+
+def cleanup_intermediates(media_dir: Path, succeeded: bool, policy: str = KEEP_INTERMEDIATES):
+    """Apply the retention policy to a reel's media dir after a render."""
+    if policy == "always" or (policy == "on_failure" and not succeeded):
+        return
+    shutil.rmtree(media_dir, ignore_errors=True)
+
+
+def _usage(path: Path) -> tuple:
+    """
+    (bytes used, newest mtime) for a file or directory tree.
+
+    Hard-linked files (e.g. a shared encode still linked from a reel) are
+    only counted once they are the last link, since deleting them frees nothing.
+    """
+    total, newest = 0, 0.0
+    if path.is_file():
+        files = [path]
+    else:
+        files = [Path(root) / name for root, _, names in os.walk(path) for name in names]
+    for file in files:
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            continue
+        newest = max(newest, stat.st_mtime)
+        if stat.st_nlink == 1:
+            total += stat.st_size
+    return total, newest
+
+
+def _evictable() -> list:
+    """Intermediates, shared encodes and shared Tex/Text SVGs that can be regenerated, oldest first."""
+    candidates = [p for p in OUTPUT_DIR.glob("*/media") if p.is_dir()]
+    if RENDER_SCRATCH_DIR and Path(RENDER_SCRATCH_DIR).is_dir():
+        candidates.extend(p for p in Path(RENDER_SCRATCH_DIR).iterdir() if p.is_dir())
+    if RENDER_CACHE_DIR.is_dir():
+        candidates.extend(RENDER_CACHE_DIR.glob("*.mp4"))
+    # Seeding touches an SVG, so these go least recently used first; a
+    # prewarm marker whose SVGs are gone is simply a miss
+    candidates.extend(TEX_CACHE_DIR.glob("*/*.svg"))
+
+    entries = []
+    for path in candidates:
+        if path.is_dir() and _is_active(path):
+            continue
+        size, mtime = _usage(path)
+        entries.append((mtime, path, size))
+    return sorted(entries, key=lambda e: e[0])
+
+
+def enforce_disk_quota(
+    quota_bytes: int = MEDIA_DISK_QUOTA_BYTES,
+    max_age_hours: float = INTERMEDIATE_MAX_AGE_HOURS
+) -> int:
+    """
+    Evict expired intermediates, then the oldest ones until under quota.
+
+    Final reels are never touched; only media trees, scratch dirs, shared
+    encodes and shared Tex/Text SVGs are. Returns the number of bytes freed.
+    """
+    entries = _evictable()
+    total = sum(size for _, _, size in entries)
+    cutoff = time.time() - max_age_hours * 3600
+    freed = 0
+
+    for mtime, path, size in entries:
+        if mtime >= cutoff and total - freed <= quota_bytes:
+            break
+        if not size and mtime >= cutoff:
+            continue  # Still hard-linked from a reel: deleting it frees nothing
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        freed += size
+
+    if freed:
+        print(f"Freed {freed / 1024**2:.1f} MB of render intermediates")
+    return freed
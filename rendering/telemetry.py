@@ -0,0 +1,106 @@
+"""Parse Manim's log output into per-animation render statistics."""
+
+import json
+import re
+import time
+from pathlib import Path
+
+# "Animation 3: Create(Line):  42%|████      | 20/48 [00:00<00:01, 40.2it/s]"
+PROGRESS_RE = re.compile(r"^(?:Animation|Waiting) (\d+)\s*:?\s*(.*?):\s+\d+%\|.*?\|\s*(\d+)/(\d+)")
+# "Animation 3 : Partial movie file written in ..." / "Animation 3 : Using cached data ..."
+PARTIAL_RE = re.compile(r"Animation (\d+) ?: Partial movie file written")
+CACHED_RE = re.compile(r"Animation (\d+) ?: Using cached data")
+TEX_RE = re.compile(r"Writing .* to .*\.tex")
+COMBINE_RE = re.compile(r"Combining to Movie file")
+READY_RE = re.compile(r"File\s+ready\s+at")
+
+
+def is_progress_line(line: str) -> bool:
+    """True for tqdm progress updates, which are too noisy to echo."""
+    return bool(PROGRESS_RE.match(line.strip()))
+
+
+class RenderTelemetry:
+    """Collects timings from Manim output lines as they arrive."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.animations = {}  # index -> stats dict
+        self.tex_files = 0
+        self.tex_seconds = 0.0
+        self.combine_started = None
+        self.concat_seconds = None
+        self._tex_started = None
+
+    def _animation(self, index: int, now: float) -> dict:
+        if index not in self.animations:
+            self.animations[index] = {
+                "index": index,
+                "label": None,
+                "frames": 0,
+                "started": round(now - self.start, 3),
+                "seconds": None,
+                "cached": False,
+            }
+        return self.animations[index]
+
+    def feed(self, line: str):
+        now = time.monotonic()
+        text = line.strip()
+
+        # A TeX compile lasts until Manim logs anything else
+        if self._tex_started is not None:
+            self.tex_seconds += now - self._tex_started
+            self._tex_started = None
+        if TEX_RE.search(text):
+            self.tex_files += 1
+            self._tex_started = now
+            return
+
+        match = PROGRESS_RE.match(text)
+        if match:
+            anim = self._animation(int(match.group(1)), now)
+            anim["label"] = anim["label"] or match.group(2).strip()
+            anim["frames"] = max(anim["frames"], int(match.group(3)))
+            return
+
+        match = PARTIAL_RE.search(text) or CACHED_RE.search(text)
+        if match:
+            anim = self._animation(int(match.group(1)), now)
+            anim["seconds"] = round(now - self.start - anim["started"], 3)
+            anim["cached"] = bool(CACHED_RE.search(text))
+            return
+
+        if COMBINE_RE.search(text):
+            self.combine_started = now
+        elif READY_RE.search(text) and self.combine_started is not None:
+            self.concat_seconds = round(now - self.combine_started, 3)
+
+    def completed_animations(self) -> int:
+        """Animations whose partial movie file was written or reused."""
+        return sum(1 for a in self.animations.values() if a["seconds"] is not None)
+
+    def summary(self) -> dict:
+        animations = [self.animations[i] for i in sorted(self.animations)]
+        return {
+            "animation_count": len(animations),
+            "frames_written": sum(a["frames"] for a in animations if not a["cached"]),
+            "partial_movie_files": sum(
+                1 for a in animations if a["seconds"] is not None and not a["cached"]
+            ),
+            "cached_animations": sum(1 for a in animations if a["cached"]),
+            "tex_files": self.tex_files,
+            "tex_seconds": round(self.tex_seconds, 3),
+            "concat_seconds": self.concat_seconds,
+            "slowest_animations": sorted(
+                (a for a in animations if a["seconds"] is not None),
+                key=lambda a: a["seconds"],
+                reverse=True
+            )[:10],
+            "animations": animations,
+        }
+
+
+def write_render_stats(stats_path: Path, stats: dict):
+    """Write render_stats.json (next to visual_plan.json)."""
+    stats_path.write_text(json.dumps(stats, indent=2, default=str))
@@ -0,0 +1,204 @@
+"""
+Shared Tex/Text SVG cache and parallel LaTeX prewarm.
+
+Manim keeps compiled LaTeX and Pango output under <media_dir>/Tex and
+<media_dir>/texts, and every reel has its own media dir. Both caches are
+already content-addressed (files are named by a hash of the expression and
+template, or of the text and its settings), so reels can share them:
+
+  prewarm()  builds the scene's literal MathTex/Tex/Text calls that no
+             earlier reel has, in parallel, straight into the shared cache,
+             and records which SVGs each call produced
+  seed()     links the SVGs of the scene's calls into its media dir
+
+Calls built from variables or f-strings can't be predicted and are left to
+the render. Writes to the shared cache are rename-into-place, so
+concurrent renders and workers never see a half-written SVG.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+from config import PROJECT_ROOT, TEX_CACHE_DIR, TEX_PREWARM_WORKERS
+from rendering.render_cache import _manim_version
+
+TEX_CLASSES = {"MathTex", "Tex", "SingleStringMathTex"}
+# Keyword arguments that change what LaTeX compiles; everything else (font_size, color, ...) doesn't
+TEX_KWARGS = {"arg_separator", "substrings_to_isolate", "tex_environment", "tex_to_color_map"}
+# Pango output depends on nearly every keyword (font, size, color, ...), so all must be known
+TEXT_CLASSES = {"Text", "MarkupText"}
+SUBDIRS = ("Tex", "texts")  # Manim's default tex_dir and text_dir under media_dir
+
+MARKER_DIR = TEX_CACHE_DIR / "prewarmed"  # One JSON per built call: the SVGs it produced ("Tex/<name>")
+
+
+def _publish(src: Path, dst: Path) -> bool:
+    """Place a copy of src at dst in one rename; False if dst already existed."""
+    if dst.exists():
+        return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)  # Same filesystem: no copy
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return True
+
+
+def seed(media_dir: Path, scene_path: Path) -> int:
+    """Link the shared SVGs of scene_path's prewarmed calls into media_dir; returns how many were added."""
+    try:
+        calls = extract_tex_calls(Path(scene_path).read_text())
+    except (OSError, SyntaxError):
+        return 0
+    added = 0
+    for call in calls:
+        for name in _marker_names(_call_key(call)) or []:
+            svg = TEX_CACHE_DIR / name
+            try:
+                os.utime(svg)  # Last use, for the disk quota's oldest-first eviction
+            except OSError:
+                continue
+            local = Path(media_dir) / name
+            local.parent.mkdir(parents=True, exist_ok=True)
+            added += _publish(svg, local)
+    return added
+
+
+# ── Prewarm ──
+
+def _literal_kwarg(kw: ast.keyword):
+    """The value of a compile-relevant keyword, or raise ValueError."""
+    if kw.arg == "tex_to_color_map" and isinstance(kw.value, ast.Dict):
+        # Only the keys are isolated by LaTeX; the colors are applied afterwards
+        return {ast.literal_eval(k): "#FFFFFF" for k in kw.value.keys}
+    return ast.literal_eval(kw.value)
+
+
+def _text_kwarg(kw: ast.keyword):
+    """A literal, or a bare manim constant such as BLUE or BOLD as {"manim": name}; else ValueError."""
+    if isinstance(kw.value, ast.Name) and kw.value.id.isupper():
+        return {"manim": kw.value.id}
+    return ast.literal_eval(kw.value)
+
+
+def extract_tex_calls(source: str) -> list:
+    """
+    (class, args, kwargs) for every MathTex/Tex call whose LaTeX input is
+    fully literal, and every Text/MarkupText call whose arguments are all
+    literals or manim constants; calls built from variables or f-strings
+    are skipped.
+    """
+    calls = {}
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in TEX_CLASSES | TEXT_CLASSES):
+            continue
+        text = node.func.id in TEXT_CLASSES
+        try:
+            args = [ast.literal_eval(arg) for arg in node.args]
+            kwargs = {}
+            for kw in node.keywords:
+                if kw.arg is None or kw.arg == "tex_template":
+                    raise ValueError("custom template or **kwargs")
+                if text:
+                    kwargs[kw.arg] = _text_kwarg(kw)
+                elif kw.arg in TEX_KWARGS:
+                    kwargs[kw.arg] = _literal_kwarg(kw)
+        except (ValueError, TypeError, SyntaxError):
+            continue
+        if args and all(isinstance(a, str) for a in args) and (not text or len(args) == 1):
+            call = (node.func.id, args, kwargs)
+            calls[_call_key(call)] = call
+    return list(calls.values())
+
+
+def _call_key(call: tuple) -> str:
+    payload = json.dumps([_manim_version(), *call], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _marker_names(key: str) -> list:
+    """SVGs (relative to TEX_CACHE_DIR) a prewarmed call produced, or None."""
+    try:
+        return json.loads((MARKER_DIR / f"{key}.json").read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _marker_hit(key: str) -> bool:
+    names = _marker_names(key)
+    # SVGs may have been evicted by the disk quota since
+    return names is not None and all((TEX_CACHE_DIR / name).exists() for name in names)
+
+
+def _compile(call: tuple, key: str) -> tuple:
+    """Runs in a pool process: build the mobject in private tex/text dirs and publish its SVGs."""
+    os.chdir(PROJECT_ROOT)  # Same manim.cfg (and tex template) as the render
+    import manim
+    from manim import tempconfig
+
+    kind, args, kwargs = call
+    TEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=TEX_CACHE_DIR) as tmp:
+        dirs = {sub: Path(tmp) / sub for sub in SUBDIRS}
+        with tempconfig({"tex_dir": str(dirs["Tex"]), "text_dir": str(dirs["texts"])}):
+            try:
+                # A constant the scene defined itself isn't in manim: AttributeError
+                kwargs = {k: getattr(manim, v["manim"]) if isinstance(v, dict) and "manim" in v else v
+                          for k, v in kwargs.items()}
+                getattr(manim, kind)(*args, **kwargs)
+            except Exception as e:
+                return key, None, f"{type(e).__name__}: {e}"
+        names = sorted(f"{sub}/{svg.name}" for sub, d in dirs.items() for svg in d.glob("*.svg"))
+        for name in names:
+            _publish(Path(tmp) / name, TEX_CACHE_DIR / name)
+    marker = MARKER_DIR / f"{key}.json"
+    MARKER_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_marker = marker.with_name(f".{marker.name}.{os.getpid()}.tmp")
+    tmp_marker.write_text(json.dumps(names))
+    os.replace(tmp_marker, marker)
+    return key, names, None
+
+
+def prewarm(scene_path: Path, workers: int = TEX_PREWARM_WORKERS) -> dict:
+    """
+    Build the scene's uncached literal Tex/Text calls on up to workers processes.
+
+    Returns counts of calls found, already cached, compiled and failed.
+    Failures are left for the render to report with its own traceback.
+    """
+    calls = extract_tex_calls(Path(scene_path).read_text())
+    misses = []
+    for call in calls:
+        key = _call_key(call)
+        if not _marker_hit(key):
+            misses.append((call, key))
+    stats = {"tex_calls": len(calls), "cached": len(calls) - len(misses), "compiled": 0, "failed": 0}
+    if not misses or workers < 1:
+        return stats
+
+    TEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=min(workers, len(misses)),
+                             mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(_compile, call, key) for call, key in misses]
+        for future in as_completed(futures):
+            try:
+                _, _, error = future.result()
+            except Exception as e:  # A pool process died (e.g. LaTeX missing)
+                error = f"{type(e).__name__}: {e}"
+            if error:
+                stats["failed"] += 1
+                print(f"  [TEX] Prewarm failed: {error}")
+            else:
+                stats["compiled"] += 1
+    return stats
@@ -0,0 +1,407 @@
+"""
+Warm render workers: a local daemon that keeps Manim imported between renders.
+
+    python -m rendering.worker --workers 4 --max-jobs 20     # start the daemon
+    RENDER_BACKEND=worker python -m pipeline.batch_generate ...
+
+Every `manim` CLI run re-imports Manim, NumPy, Cairo and Pango and re-reads
+its config before drawing a frame. The daemon instead owns a pool of worker
+processes that import Manim once and then render job after job. Each job's
+scene is executed as a fresh module inside tempconfig(), so config changes
+and module globals don't leak between jobs.
+
+Jobs arrive over a Unix socket (multiprocessing.connection, authenticated
+with a key file only the owner can read). Manim's log lines are streamed
+back to the client as they happen, so telemetry and repair work exactly as
+with the CLI. A worker that crashes is replaced (the job reports failure),
+one whose client disconnects (e.g. a cancelled candidate) or whose job
+runs past its timeout or memory ceiling is killed with its ffmpeg/latex
+children, and every worker is recycled after --max-jobs renders to cap
+memory growth.
+"""
+
+import argparse
+import collections
+import importlib.util
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener, wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (
+    PROJECT_ROOT,
+    RENDER_CPU_AFFINITY,
+    RENDER_NICE,
+    RENDER_WORKER_SOCKET,
+    RENDER_WORKER_PROCESSES,
+    RENDER_WORKER_MAX_JOBS,
+)
+from rendering.process import (
+    OUTPUT_TAIL_LINES, ProcessResult, ResourceLimits, _apply_scheduling, kill_tree, parse_cpu_list,
+    tree_rss_bytes,
+)
+
+SAMPLE_INTERVAL = 0.25  # Seconds between memory samples / limit checks of a running job
+
+
+class WorkerUnavailable(RuntimeError):
+    """No render daemon is listening on the socket."""
+
+
+def _key_path(address: Path) -> Path:
+    return Path(address).with_suffix(".key")
+
+
+# ── Worker process ──
+
+class _LineForwarder(logging.Handler):
+    """Sends each Manim log message to the daemon as it is emitted."""
+
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+
+    def emit(self, record):
+        try:
+            self.conn.send(("line", record.getMessage()))
+        except Exception:
+            pass
+
+
+def _run_job(job: dict, number: int, conn) -> int:
+    """Render one scene in a fresh module namespace; returns a process-style exit code."""
+    from manim import tempconfig
+
+    scene_path = Path(job["scene_path"]).resolve()
+    width, height = job["render_flags"]["resolution"].split(",")
+    module_name = f"_reel_scene_{os.getpid()}_{number}"
+    with tempconfig({
+        "pixel_width": int(width),
+        "pixel_height": int(height),
+        "frame_rate": job["render_flags"]["fps"],
+        "media_dir": str(job["media_dir"]),
+        "input_file": str(scene_path),  # Gives the CLI's videos/<module>/<height>p<fps>/ layout
+        "output_file": job["output_name"],
+        "progress_bar": "none",
+    }):
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, scene_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            getattr(module, job["scene_name"])().render()
+            return 0
+        except Exception:
+            for line in traceback.format_exc().splitlines():
+                conn.send(("line", line))
+            return 1
+        finally:
+            sys.modules.pop(module_name, None)
+
+
+def _worker_main(conn):
+    """Import Manim once, then render jobs from conn until told to stop."""
+    os.chdir(PROJECT_ROOT)  # Picks up manim.cfg exactly like the CLI
+    sys.path.insert(0, str(PROJECT_ROOT))  # Scenes import scene_lib
+    import gc
+    import manim  # noqa: F401  (the whole point: pay for this once)
+
+    logging.getLogger("manim").addHandler(_LineForwarder(conn))
+    number = 0
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        number += 1
+        returncode = _run_job(job, number, conn)
+        gc.collect()
+        conn.send(("done", {"returncode": returncode}))  # The daemon adds the peak memory it sampled
+
+
+# ── Daemon ──
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        _apply_scheduling(self.process.pid, ResourceLimits(
+            nice=RENDER_NICE, cpu_affinity=parse_cpu_list(RENDER_CPU_AFFINITY)
+        ))
+        self.jobs = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            kill_tree(self.process.pid, grace=0)  # Also its ffmpeg and latex children
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class RenderDaemon:
+    """Listener plus a pool of warm workers; one handler thread per client connection."""
+
+    def __init__(self, address: Path = RENDER_WORKER_SOCKET, workers: int = RENDER_WORKER_PROCESSES,
+                 max_jobs: int = RENDER_WORKER_MAX_JOBS):
+        self.address = Path(address)
+        self.max_jobs = max_jobs
+        self.context = get_context("spawn")  # No inherited threads or sockets in workers
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.counts = {"jobs": 0, "failed": 0, "crashed": 0, "cancelled": 0, "limited": 0, "recycled": 0}
+        self.stopping = threading.Event()
+        for _ in range(max(1, workers)):
+            self.idle.put(_Worker(self.context))
+        self.size = max(1, workers)
+
+    def _count(self, key: str):
+        with self.lock:
+            self.counts[key] += 1
+
+    def _release(self, worker: _Worker, broken: bool = False):
+        if broken or worker.jobs >= self.max_jobs:
+            worker.stop(kill=broken)
+            if not broken:
+                self._count("recycled")
+            worker = _Worker(self.context)
+        self.idle.put(worker)
+
+    def _over_limit(self, job: dict, rss: int, start: float) -> tuple:
+        """(limit, detail) if the job has outrun its ceilings, else None."""
+        timeout = job.get("timeout_seconds")
+        if timeout and time.monotonic() - start > timeout:
+            return "timeout", f"still running after {timeout:.0f}s"
+        max_rss = job.get("max_rss_bytes")
+        if max_rss and rss > max_rss:
+            return "memory", f"{rss / 1024**2:.0f} MB resident, limit {max_rss / 1024**2:.0f} MB"
+        return None
+
+    def _render(self, client, job: dict):
+        worker = self.idle.get()
+        worker.jobs += 1
+        start = time.monotonic()
+        self._count("jobs")
+        try:
+            worker.conn.send(job)
+        except OSError:
+            self._count("crashed")
+            client.send(("done", {"returncode": -1, "peak_rss_bytes": 0}))
+            self._release(worker, broken=True)
+            return
+
+        # The worker and its children are sampled on a fixed cadence, however
+        # chatty the render is: the samples give the job's peak memory and
+        # enforce its limits
+        peak = 0
+        last_sample = start - SAMPLE_INTERVAL
+        while True:
+            now = time.monotonic()
+            if now - last_sample >= SAMPLE_INTERVAL:
+                last_sample = now
+                rss = tree_rss_bytes(worker.process.pid)
+                peak = max(peak, rss)
+                exceeded = self._over_limit(job, rss, start)
+                if exceeded:
+                    self._count("limited")
+                    self._release(worker, broken=True)
+                    client.send(("done", {"returncode": -1, "peak_rss_bytes": peak,
+                                          "limit_exceeded": exceeded[0], "limit_detail": exceeded[1]}))
+                    return
+            ready = wait([worker.conn, client], timeout=max(0.0, last_sample + SAMPLE_INTERVAL - now))
+            if not ready:
+                continue
+            if client in ready:
+                # The client only ever closes mid-job: the render was cancelled
+                self._count("cancelled")
+                self._release(worker, broken=True)
+                return
+            try:
+                kind, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                self._count("crashed")
+                worker.process.join(1)
+                client.send(("line", f"Render worker {worker.process.pid} died "
+                                     f"(exit code {worker.process.exitcode})"))
+                client.send(("done", {"returncode": -1, "peak_rss_bytes": peak}))
+                self._release(worker, broken=True)
+                return
+            if kind == "line":
+                client.send((kind, payload))
+                continue
+            if payload["returncode"] != 0:
+                self._count("failed")
+            payload["peak_rss_bytes"] = max(peak, tree_rss_bytes(worker.process.pid))
+            client.send((kind, payload))
+            self._release(worker)
+            return
+
+    def _handle(self, client):
+        try:
+            request = client.recv()
+            if request["op"] == "render":
+                self._render(client, request["job"])
+            elif request["op"] == "ping":
+                with self.lock:
+                    client.send(dict(self.counts, workers=self.size))
+            elif request["op"] == "shutdown":
+                client.send("ok")
+                self.stopping.set()
+        except (EOFError, OSError):
+            pass
+        finally:
+            client.close()
+
+    def serve_forever(self):
+        self.address.parent.mkdir(parents=True, exist_ok=True)
+        key_path = _key_path(self.address)
+        authkey = secrets.token_bytes(32)
+        key_path.unlink(missing_ok=True)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(authkey)
+        self.address.unlink(missing_ok=True)
+
+        listener = Listener(str(self.address), family="AF_UNIX", authkey=authkey)
+        threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+        print(f"Render daemon on {self.address}: {self.size} warm worker(s), "
+              f"recycled every {self.max_jobs} job(s)")
+        try:
+            self.stopping.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            self.address.unlink(missing_ok=True)
+            key_path.unlink(missing_ok=True)
+            while not self.idle.empty():
+                self.idle.get().stop()
+
+    def _accept(self, listener):
+        while not self.stopping.is_set():
+            try:
+                client = listener.accept()
+            except OSError:
+                if self.stopping.is_set():
+                    return
+                continue  # Failed authentication or a client that hung up
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+
+# ── Client ──
+
+def _connect(address: Path = RENDER_WORKER_SOCKET):
+    try:
+        return Client(str(address), family="AF_UNIX", authkey=_key_path(address).read_bytes())
+    except (OSError, EOFError) as e:
+        raise WorkerUnavailable(f"no render daemon at {address} ({e})") from e
+
+
+def ping(address: Path = RENDER_WORKER_SOCKET) -> dict:
+    """Worker count and job counters of the running daemon."""
+    with _connect(address) as conn:
+        conn.send({"op": "ping"})
+        return conn.recv()
+
+
+def shutdown(address: Path = RENDER_WORKER_SOCKET):
+    with _connect(address) as conn:
+        conn.send({"op": "shutdown"})
+        conn.recv()
+
+
+def render(
+    scene_path: Path,
+    scene_name: str,
+    render_flags: dict,
+    media_dir: Path,
+    output_name: str,
+    on_line=None,
+    echo=None,
+    cancel: threading.Event = None,
+    limits: ResourceLimits = None,
+    address: Path = RENDER_WORKER_SOCKET
+) -> ProcessResult:
+    """
+    Render on a warm worker; the counterpart of run_monitored() on a manim command.
+
+    The daemon enforces the timeout and memory ceiling of limits; its
+    workers get RENDER_NICE and RENDER_CPU_AFFINITY when spawned. Raises WorkerUnavailable if the
+    daemon isn't running.
+    """
+    limits = limits or ResourceLimits()
+    start = time.monotonic()
+    conn = _connect(address)
+    output = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    with conn:
+        conn.send({"op": "render", "job": {
+            "scene_path": str(Path(scene_path).resolve()),
+            "scene_name": scene_name,
+            "render_flags": render_flags,
+            "media_dir": str(Path(media_dir).resolve()),
+            "output_name": output_name,
+            "timeout_seconds": limits.timeout_seconds,
+            "max_rss_bytes": limits.max_rss_bytes,
+        }})
+        while True:
+            if cancel is not None and cancel.is_set():
+                # Hanging up makes the daemon kill the worker mid-render
+                return ProcessResult(-1, time.monotonic() - start, 0, list(output), cancelled=True)
+            if not conn.poll(0.25):
+                continue
+            try:
+                kind, payload = conn.recv()
+            except EOFError:
+                output.append("Render daemon closed the connection")
+                return ProcessResult(-1, time.monotonic() - start, 0, list(output))
+            if kind == "line":
+                output.append(payload)
+                if on_line:
+                    on_line(payload)
+                if echo and echo(payload):
+                    print(payload)
+                continue
+            return ProcessResult(
+                returncode=payload["returncode"],
+                wall_seconds=time.monotonic() - start,
+                peak_rss_bytes=payload["peak_rss_bytes"],
+                output=list(output),
+                limit_exceeded=payload.get("limit_exceeded"),
+                limit_detail=payload.get("limit_detail"),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm Manim render worker daemon.")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKER_PROCESSES)
+    parser.add_argument("--max-jobs", type=int, default=RENDER_WORKER_MAX_JOBS,
+                        help="Replace a worker after this many renders")
+    parser.add_argument("--socket", type=Path, default=RENDER_WORKER_SOCKET)
+    parser.add_argument("--status", action="store_true", help="Print the running daemon's counters")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    args = parser.parse_args()
+
+    if args.status:
+        print(ping(args.socket))
+    elif args.stop:
+        shutdown(args.socket)
+    else:
+        RenderDaemon(args.socket, args.workers, args.max_jobs).serve_forever()
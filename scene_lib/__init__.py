@@ -0,0 +1,28 @@
+"""Reusable, render-efficient building blocks for reel scenes."""
+
+from scene_lib.fractals import FRACTALS, FractalCurve, fractal_points
+from scene_lib.point_cloud import (
+    PlayFrames,
+    PointCloudImage,
+    PointRaster,
+    RevealPoints,
+    chaos_game,
+    reveal_frames,
+    ulam_spiral,
+)
+from scene_lib.surfaces import FastSurface, axes_transform
+
+__all__ = [
+    "FRACTALS",
+    "FractalCurve",
+    "fractal_points",
+    "PlayFrames",
+    "PointCloudImage",
+    "PointRaster",
+    "RevealPoints",
+    "chaos_game",
+    "reveal_frames",
+    "ulam_spiral",
+    "FastSurface",
+    "axes_transform",
+]
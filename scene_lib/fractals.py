@@ -0,0 +1,168 @@
+"""Fractal curves generated as NumPy vertex arrays and drawn as a single VMobject."""
+
+from functools import lru_cache
+
+import numpy as np
+from manim import ORIGIN, Transform, VMobject
+
+_TURN_60 = np.exp(1j * np.pi / 3)
+
+
+def levy_c(iteration: int) -> np.ndarray:
+    """Levy C curve from (0, 0) to (1, 0): 2**iteration segments."""
+    z = np.array([0, 1], dtype=complex)
+    for _ in range(iteration):
+        d = np.diff(z)
+        z = _interleave(z, [z[:-1] + d * (1 + 1j) / 2])
+    return z
+
+
+def dragon(iteration: int) -> np.ndarray:
+    """Heighway dragon from (0, 0) to (1, 0): 2**iteration segments."""
+    z = np.array([0, 1], dtype=complex)
+    for _ in range(iteration):
+        d = np.diff(z)
+        side = np.where(np.arange(len(d)) % 2 == 0, 1j, -1j)
+        z = _interleave(z, [z[:-1] + d * (1 + side) / 2])
+    return z
+
+
+def koch_snowflake(iteration: int) -> np.ndarray:
+    """Closed Koch snowflake on a unit triangle: 3 * 4**iteration segments."""
+    z = np.array([0, _TURN_60, 1, 0], dtype=complex)  # Clockwise, so left turns point outward
+    for _ in range(iteration):
+        d = np.diff(z) / 3
+        a = z[:-1] + d
+        z = _interleave(z, [a, a + d * _TURN_60, a + d])
+    return z
+
+
+def sierpinski_arrowhead(iteration: int) -> np.ndarray:
+    """Sierpinski arrowhead curve from (0, 0) to (1, 0): 3**iteration segments."""
+    z = np.array([0, 1], dtype=complex)
+    turn = np.array([1])
+    for _ in range(iteration):
+        half = np.diff(z) / 2
+        a = z[:-1] + half * _TURN_60 ** turn
+        z = _interleave(z, [a, a + half])
+        turn = np.stack([-turn, turn, -turn], axis=1).ravel()
+    return z
+
+
+def hilbert(iteration: int) -> np.ndarray:
+    """Hilbert curve filling the unit square: 4**iteration - 1 segments."""
+    side = 2 ** iteration
+    t = np.arange(side * side)
+    x = np.zeros_like(t)
+    y = np.zeros_like(t)
+    s = 1
+    while s < side:
+        rx = 1 & (t // 2)
+        ry = 1 & (t ^ rx)
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, s - 1 - x, x)
+        y = np.where(flip, s - 1 - y, y)
+        x, y = np.where(ry == 0, y, x), np.where(ry == 0, x, y)
+        x = x + s * rx
+        y = y + s * ry
+        t = t // 4
+        s *= 2
+    return (x + 0.5) / side + 1j * (y + 0.5) / side
+
+
+def _interleave(z: np.ndarray, inserted: list) -> np.ndarray:
+    """Vertices of z with the points of each inserted array placed after z[i], in order."""
+    out = np.empty(len(z) + len(inserted) * (len(z) - 1), dtype=complex)
+    step = len(inserted) + 1
+    out[::step] = z
+    for k, points in enumerate(inserted, start=1):
+        out[k::step] = points
+    return out
+
+
+FRACTALS = {
+    "levy": levy_c,
+    "dragon": dragon,
+    "koch": koch_snowflake,
+    "sierpinski": sierpinski_arrowhead,
+    "hilbert": hilbert,
+}
+
+# Iteration whose bounding box stands in for the limit curve's
+_REFERENCE_ITERATIONS = {"levy": 12, "dragon": 12, "koch": 6, "sierpinski": 8}
+
+
+def fractal_points(kind: str, iteration: int) -> np.ndarray:
+    """(n, 3) vertices of a fractal iteration in its natural coordinates."""
+    if kind not in FRACTALS:
+        raise ValueError(f"Unknown fractal {kind!r}; expected one of {sorted(FRACTALS)}")
+    z = FRACTALS[kind](iteration)
+    return np.column_stack([z.real, z.imag, np.zeros(len(z))])
+
+
+@lru_cache(maxsize=None)
+def _limit_bounds(kind: str) -> tuple:
+    if kind == "hilbert":
+        return np.zeros(3), np.array([1.0, 1.0, 0.0])
+    points = fractal_points(kind, _REFERENCE_ITERATIONS[kind])
+    return points.min(axis=0), points.max(axis=0)
+
+
+def resample_polyline(points: np.ndarray, count: int) -> np.ndarray:
+    """count points spaced evenly by arc length along the polyline points."""
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    distance = np.concatenate([[0.0], np.cumsum(lengths)])
+    targets = np.linspace(0, distance[-1], count)
+    return np.column_stack([np.interp(targets, distance, points[:, k]) for k in range(3)])
+
+
+class FractalCurve(VMobject):
+    """
+    One iteration of a fractal as a single VMobject.
+
+    Every iteration of a kind is placed with the same transform (fitted to
+    the limit curve), so iterations line up and morph in place:
+
+        curve = FractalCurve("levy", 0, width=7, color=GOLD)
+        for n in range(1, 17):
+            self.play(curve.morph_to(n), run_time=0.8, rate_func=smooth)
+
+    16 iterations of a Levy curve is 65,536 segments in one path, which
+    Cairo strokes far faster than the same number of Line mobjects.
+    """
+
+    def __init__(self, kind: str, iteration: int = 0, width: float = 7.0, height: float = None,
+                 center=ORIGIN, **kwargs):
+        super().__init__(**kwargs)
+        self.kind = kind
+        low, high = _limit_bounds(kind)
+        size = np.maximum(high - low, 1e-9)
+        self.scale_factor = width / size[0]
+        if height is not None:
+            self.scale_factor = min(self.scale_factor, height / size[1])
+        self.offset = np.array(center, dtype=float) - (low + high) / 2 * self.scale_factor
+        self.set_iteration(iteration)
+
+    def set_iteration(self, iteration: int):
+        """Replace the points with those of another iteration (no animation)."""
+        self.iteration = iteration
+        self.set_points_as_corners(fractal_points(self.kind, iteration) * self.scale_factor + self.offset)
+        return self
+
+    def get_vertices(self) -> np.ndarray:
+        """The polyline's corners (anchors of the straight cubic segments)."""
+        return np.vstack([self.points[::4], self.points[-1:]])
+
+    def morph_to(self, iteration: int, **kwargs) -> Transform:
+        """
+        Transform into another iteration.
+
+        The current curve is first resampled (invisibly) to the target's
+        vertex count, so Manim's point alignment is skipped and every frame
+        of the morph is one vectorized interpolation.
+        """
+        target = self.copy().set_iteration(iteration)
+        count = len(target.points) // 4 + 1
+        self.set_points_as_corners(resample_polyline(self.get_vertices(), count))
+        self.iteration = iteration
+        return Transform(self, target, **kwargs)
@@ -0,0 +1,212 @@
+"""Dense point sets rasterized into one image instead of thousands of Dot mobjects."""
+
+import numpy as np
+from manim import WHITE, Animation, ImageMobject, config
+from manim.utils.color import ManimColor
+
+
+def _disk_offsets(radius: int) -> np.ndarray:
+    """(k, 2) pixel offsets covering a disk of the given radius."""
+    span = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(span, span, indexing="ij")
+    inside = dy ** 2 + dx ** 2 <= radius ** 2 + radius
+    return np.column_stack([dy[inside], dx[inside]])
+
+
+class PointRaster:
+    """
+    Accumulates point hits per pixel and writes them into an RGBA array.
+
+    Only the pixels a batch of points lands on are touched, so adding
+    points never re-rasterizes what is already drawn.
+    """
+
+    def __init__(self, pixel_size: tuple, data_range: tuple, point_opacity: float = 0.6,
+                 dot_radius: int = 1):
+        self.pixel_size = tuple(pixel_size)  # (rows, cols)
+        self.data_range = data_range  # (xmin, xmax, ymin, ymax) mapped onto the pixels
+        self.point_opacity = point_opacity
+        self.offsets = _disk_offsets(dot_radius)
+        self.counts = np.zeros(self.pixel_size, dtype=np.uint32)
+
+    def to_pixels(self, points: np.ndarray) -> tuple:
+        """(rows, cols) of the pixels covered by points, clipped to the raster."""
+        points = np.asarray(points, dtype=float)
+        xmin, xmax, ymin, ymax = self.data_range
+        rows_total, cols_total = self.pixel_size
+        cols = np.floor((points[:, 0] - xmin) / (xmax - xmin) * cols_total).astype(np.int64)
+        rows = np.floor((ymax - points[:, 1]) / (ymax - ymin) * rows_total).astype(np.int64)
+        rows = (rows[:, None] + self.offsets[None, :, 0]).ravel()
+        cols = (cols[:, None] + self.offsets[None, :, 1]).ravel()
+        inside = (rows >= 0) & (rows < rows_total) & (cols >= 0) & (cols < cols_total)
+        return rows[inside], cols[inside]
+
+    def splat(self, pixels: np.ndarray, points: np.ndarray, color):
+        """Add points to the hit counts and update their pixels in the RGBA array pixels."""
+        if len(points) == 0:
+            return
+        rows, cols = self.to_pixels(points)
+        np.add.at(self.counts, (rows, cols), 1)
+        pixels[rows, cols, :3] = np.array(ManimColor(color).to_int_rgb(), dtype=np.uint8)
+        # Each point composites over the pixel with point_opacity
+        coverage = 1 - (1 - self.point_opacity) ** self.counts[rows, cols]
+        pixels[rows, cols, 3] = np.round(255 * coverage).astype(np.uint8)
+
+
+class PointCloudImage(ImageMobject):
+    """
+    An image that points are splatted into.
+
+    The image has one pixel per screen pixel at the current render
+    resolution, so points look like crisp dots, and drawing a frame costs
+    one image however many points have been added.
+
+        cloud = PointCloudImage(width=8, height=8, data_range=(-1, 1, -1, 1), color=GOLD)
+        self.add(cloud)
+        self.play(RevealPoints(cloud, points), run_time=6, rate_func=linear)
+    """
+
+    def __init__(self, width: float = 8.0, height: float = 8.0, data_range: tuple = None,
+                 color=WHITE, point_opacity: float = 0.6, dot_radius: int = 1, **kwargs):
+        pixels_per_unit = config.pixel_width / config.frame_width
+        pixel_size = (max(1, round(height * pixels_per_unit)), max(1, round(width * pixels_per_unit)))
+        super().__init__(np.zeros((*pixel_size, 4), dtype=np.uint8), **kwargs)
+        self.stretch_to_fit_width(width)
+        self.stretch_to_fit_height(height)
+
+        self.color = ManimColor(color)
+        self.raster = PointRaster(
+            pixel_size,
+            data_range or (-width / 2, width / 2, -height / 2, height / 2),
+            point_opacity,
+            dot_radius,
+        )
+
+    def add_points(self, points: np.ndarray, color=None):
+        """Splat points (data coordinates) into the image."""
+        self.raster.splat(self.pixel_array, points, color or self.color)
+        return self
+
+    def clear_points(self):
+        self.raster.counts[:] = 0
+        self.pixel_array[:] = 0
+        return self
+
+
+class RevealPoints(Animation):
+    """
+    Add points to a PointCloudImage progressively over the animation.
+
+    Each frame splats only the points that became visible since the last
+    frame; skipped or fast-forwarded animations still end with every point
+    drawn.
+    """
+
+    def __init__(self, cloud: PointCloudImage, points: np.ndarray, color=None, **kwargs):
+        self.points = np.asarray(points, dtype=float)
+        self.color = color
+        self.shown = 0
+        super().__init__(cloud, **kwargs)
+
+    def begin(self):
+        # The cloud's arrays are updated in place; no starting copy is needed
+        self.starting_mobject = self.mobject
+        self.interpolate(0)
+
+    def interpolate_mobject(self, alpha: float):
+        target = int(round(self.rate_func(alpha) * len(self.points)))
+        if target > self.shown:
+            self.mobject.add_points(self.points[self.shown:target], self.color)
+            self.shown = target
+
+
+def reveal_frames(points: np.ndarray, frame_count: int, pixel_size: tuple, data_range: tuple,
+                  color=WHITE, point_opacity: float = 0.6, dot_radius: int = 1) -> np.ndarray:
+    """
+    Precompute a reveal as RGBA frames, (frame_count, rows, cols, 4) uint8.
+
+    The alternative to RevealPoints when the frames should be produced once
+    (e.g. saved with np.save and reused across renders) and only displayed
+    at render time with PlayFrames. Frame k shows the first
+    (k + 1) / frame_count of the points.
+    """
+    raster = PointRaster(pixel_size, data_range, point_opacity, dot_radius)
+    pixels = np.zeros((*raster.pixel_size, 4), dtype=np.uint8)
+    frames = np.empty((frame_count, *raster.pixel_size, 4), dtype=np.uint8)
+    bounds = np.linspace(0, len(points), frame_count + 1).round().astype(int)
+    for k in range(frame_count):
+        raster.splat(pixels, points[bounds[k]:bounds[k + 1]], color)
+        frames[k] = pixels
+    return frames
+
+
+class PlayFrames(Animation):
+    """Show a precomputed frame sequence (see reveal_frames) on an ImageMobject."""
+
+    def __init__(self, image: ImageMobject, frames: np.ndarray, **kwargs):
+        self.frames = frames
+        super().__init__(image, **kwargs)
+
+    def begin(self):
+        self.starting_mobject = self.mobject
+        self.interpolate(0)
+
+    def interpolate_mobject(self, alpha: float):
+        index = min(int(self.rate_func(alpha) * len(self.frames)), len(self.frames) - 1)
+        self.mobject.pixel_array = self.frames[index]
+
+
+def chaos_game(count: int, vertices: np.ndarray = None, ratio: float = 0.5, seed: int = 0,
+               chains: int = 4096, burn_in: int = 20) -> np.ndarray:
+    """
+    count points of the chaos game on vertices (default: Sierpinski triangle), (count, 2).
+
+    Runs many independent chains in lockstep so every step is one vectorized
+    update; the first burn_in steps of each chain are dropped.
+    """
+    if vertices is None:
+        vertices = np.array([[0.0, 1.0], [-np.sqrt(3) / 2, -0.5], [np.sqrt(3) / 2, -0.5]])
+    vertices = np.asarray(vertices, dtype=float)
+    rng = np.random.default_rng(seed)
+    chains = max(1, min(chains, count))
+    steps = -(-count // chains)
+
+    position = rng.uniform(vertices.min(axis=0), vertices.max(axis=0), size=(chains, 2))
+    out = np.empty((steps, chains, 2))
+    for step in range(burn_in + steps):
+        target = vertices[rng.integers(len(vertices), size=chains)]
+        position += ratio * (target - position)
+        if step >= burn_in:
+            out[step - burn_in] = position
+    return out.reshape(-1, 2)[:count]
+
+
+def ulam_spiral(count: int) -> tuple:
+    """
+    Positions of 1..count on the Ulam square spiral and a primality mask.
+
+    Returns (points, is_prime): points is (count, 2) integer grid
+    coordinates with 1 at the origin.
+    """
+    n = np.arange(1, count + 1)
+    k = np.ceil((np.sqrt(n) - 1) / 2).astype(np.int64)
+    side = 2 * k
+    corner = (2 * k + 1) ** 2  # Largest number on ring k, at (k, -k)
+    back = corner - n  # Steps back along the ring from that corner
+    x = np.select(
+        [back <= side, back <= 2 * side, back <= 3 * side],
+        [k - back, -k, -k + (back - 2 * side)],
+        k,
+    )
+    y = np.select(
+        [back <= side, back <= 2 * side, back <= 3 * side],
+        [-k, -k + (back - side), k],
+        k - (back - 3 * side),
+    )
+
+    sieve = np.ones(count + 1, dtype=bool)
+    sieve[:2] = False
+    for p in range(2, int(count ** 0.5) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = False
+    return np.column_stack([x, y]).astype(float), sieve[1:]
@@ -0,0 +1,155 @@
+"""Parametric surfaces evaluated in one NumPy call over the whole (u, v) grid."""
+
+import numpy as np
+from manim import BLUE_D, LIGHT_GREY, VGroup, config
+from manim.mobject.three_d.three_dimensions import ThreeDVMobject
+from manim.utils.color import ManimColor
+
+# Target on-screen edge length of one face for resolution="auto"
+FACE_SIZE_PIXELS = 14
+MIN_AUTO_RESOLUTION = 8
+MAX_AUTO_RESOLUTION = 64  # Faces per axis; Cairo draws each face as its own path every frame
+_PROBE_RESOLUTION = 16
+
+# Bezier points of a straight edge: a cubic with handles at 1/3 and 2/3
+_EDGE_STEPS = np.array([0.0, 1 / 3, 2 / 3, 1.0])
+
+
+def axes_transform(axes) -> tuple:
+    """
+    (origin, basis) such that origin + coords @ basis == axes.c2p(*coords).
+
+    Exact for linear axes, which is every ThreeDAxes used in reels.
+    """
+    origin = np.array(axes.c2p(0, 0, 0), dtype=float)
+    basis = np.array([
+        np.array(axes.c2p(1, 0, 0), dtype=float) - origin,
+        np.array(axes.c2p(0, 1, 0), dtype=float) - origin,
+        np.array(axes.c2p(0, 0, 1), dtype=float) - origin,
+    ])
+    return origin, basis
+
+
+def _edge_pixels(grid: np.ndarray) -> tuple:
+    """Longest on-screen length (pixels) of a u line and of a v line of the grid."""
+    pixels_per_unit = config.pixel_width / config.frame_width
+    u_lengths = np.linalg.norm(np.diff(grid, axis=0), axis=-1).sum(axis=0)
+    v_lengths = np.linalg.norm(np.diff(grid, axis=1), axis=-1).sum(axis=1)
+    return u_lengths.max() * pixels_per_unit, v_lengths.max() * pixels_per_unit
+
+
+class FastSurface(VGroup):
+    """
+    Drop-in replacement for Surface with a vectorized parametric function.
+
+    func(u, v) receives 2D arrays of parameters and returns (x, y, z)
+    (a tuple of arrays or an array with a trailing axis of 3). With axes,
+    the result is in axes coordinates and mapped with one affine transform
+    instead of an axes.c2p call per point.
+
+    All face points live in one (faces, 16, 3) array and each face's points
+    are a view into it; resolution="auto" picks the grid size so one face is
+    about FACE_SIZE_PIXELS wide at the current render resolution, so draft
+    renders draw a fraction of the faces of a final render. max_resolution
+    caps the auto grid (e.g. at the grid the scene used before).
+
+    Faces stay separate mobjects: ThreeDCamera depth-sorts them every frame
+    and the checkerboard colors them individually, which one batched path
+    can't do. Only construction is vectorized, so a final render at the
+    capped grid costs the same per frame as Surface did; the per-frame
+    saving comes from the smaller grids of draft and preview renders.
+    """
+
+    def __init__(
+        self,
+        func,
+        u_range=(0, 1),
+        v_range=(0, 1),
+        resolution="auto",
+        axes=None,
+        fill_color=BLUE_D,
+        fill_opacity=1.0,
+        checkerboard_colors=None,
+        stroke_color=LIGHT_GREY,
+        stroke_width=0.5,
+        stroke_opacity=1.0,
+        face_size_pixels: float = FACE_SIZE_PIXELS,
+        max_resolution=MAX_AUTO_RESOLUTION,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.func = func
+        self.u_range = tuple(u_range)
+        self.v_range = tuple(v_range)
+        self._transform = axes_transform(axes) if axes is not None else None
+
+        if resolution == "auto":
+            resolution = self._auto_resolution(face_size_pixels, max_resolution)
+        elif isinstance(resolution, int):
+            resolution = (resolution, resolution)
+        self.resolution = tuple(resolution)
+
+        self.grid = self._evaluate(*self.resolution)  # (nu + 1, nv + 1, 3) vertices
+        self._build_faces()
+
+        self.set_fill(color=fill_color, opacity=fill_opacity)
+        self.set_stroke(color=stroke_color, width=stroke_width, opacity=stroke_opacity)
+        if checkerboard_colors:
+            self.set_fill_by_checkerboard(*checkerboard_colors, opacity=fill_opacity)
+
+    def _evaluate(self, nu: int, nv: int) -> np.ndarray:
+        """Scene-space vertices of an nu x nv grid of faces."""
+        u = np.linspace(*self.u_range, nu + 1)
+        v = np.linspace(*self.v_range, nv + 1)
+        uu, vv = np.meshgrid(u, v, indexing="ij")
+        values = self.func(uu, vv)
+        if isinstance(values, (tuple, list)):
+            values = np.stack(np.broadcast_arrays(*values), axis=-1)
+        points = np.asarray(values, dtype=float).reshape(nu + 1, nv + 1, 3)
+        if self._transform is not None:
+            origin, basis = self._transform
+            points = origin + points @ basis
+        return points
+
+    def _auto_resolution(self, face_size_pixels: float, max_resolution) -> tuple:
+        if isinstance(max_resolution, int):
+            max_resolution = (max_resolution, max_resolution)
+        probe = self._evaluate(_PROBE_RESOLUTION, _PROBE_RESOLUTION)
+        u_pixels, v_pixels = _edge_pixels(probe)
+        return tuple(
+            int(np.clip(np.ceil(pixels / face_size_pixels), min(MIN_AUTO_RESOLUTION, cap), cap))
+            for pixels, cap in zip((u_pixels, v_pixels), max_resolution)
+        )
+
+    def _build_faces(self):
+        grid = self.grid
+        # Corners of every face in Surface's order, closed: (faces, 5, 3)
+        corners = np.stack([
+            grid[:-1, :-1],
+            grid[1:, :-1],
+            grid[1:, 1:],
+            grid[:-1, 1:],
+            grid[:-1, :-1],
+        ], axis=2).reshape(-1, 5, 3)
+        starts, ends = corners[:, :-1], corners[:, 1:]
+        # (faces, 4 edges, 4 bezier points, 3) -> (faces, 16, 3)
+        self.face_points = (
+            starts[:, :, None, :]
+            + (ends - starts)[:, :, None, :] * _EDGE_STEPS[None, None, :, None]
+        ).reshape(len(corners), 16, 3)
+
+        nv = self.resolution[1]
+        faces = []
+        for k, points in enumerate(self.face_points):
+            face = ThreeDVMobject()
+            face.points = points
+            face.u_index, face.v_index = divmod(k, nv)
+            faces.append(face)
+        self.add(*faces)
+
+    def set_fill_by_checkerboard(self, *colors, opacity=None):
+        """Alternate fill colors across faces like Surface.set_fill_by_checkerboard."""
+        colors = [ManimColor(c) for c in colors]
+        for face in self.submobjects:
+            face.set_fill(colors[(face.u_index + face.v_index) % len(colors)], opacity=opacity)
+        return self
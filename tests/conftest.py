@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep the metrics and trace logs of test runs out of .cache/ (config reads these on import)
+_logs = tempfile.mkdtemp(prefix="reels-tests-")
+os.environ.setdefault("LLM_METRICS_LOG", os.path.join(_logs, "llm_metrics.jsonl"))
+os.environ.setdefault("TRACE_LOG", os.path.join(_logs, "traces.jsonl"))
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,111 @@
+"""Static render-cost estimates: constant folding, trip counts, branches and helpers."""
+
+import textwrap
+
+from rendering.cost_estimate import (
+    DEFAULT_RUN_TIME,
+    UNKNOWN_LOOP_ITERATIONS,
+    check_render_budget,
+    estimate_render_cost,
+)
+
+
+def estimate(tmp_path, construct: str, prelude: str = "", helpers: str = ""):
+    path = tmp_path / "scene.py"
+    path.write_text(
+        textwrap.dedent(prelude)
+        + "class GeneratedScene(Scene):\n"
+        + "    def construct(self):\n"
+        + textwrap.indent(textwrap.dedent(construct), " " * 8)
+        + textwrap.indent(textwrap.dedent(helpers), " " * 4)
+    )
+    return estimate_render_cost(path, profile="draft")
+
+
+def test_constant_folding_of_run_times(tmp_path):
+    e = estimate(tmp_path, """
+        step = 0.5
+        self.play(Create(a), run_time=step * 2 + 1)
+        self.play(FadeIn(b, run_time=3), Write(c, run_time=max(1, step)))
+        self.wait(int(7 / 2))
+        self.wait()
+    """)
+    assert e.animations == [2.0, 3, 3, DEFAULT_RUN_TIME]
+    assert (e.play_calls, e.wait_calls, e.duration) == (2, 2, 9.0)
+    assert e.exact
+
+
+def test_module_constants_and_literal_lengths_give_trip_counts(tmp_path):
+    e = estimate(tmp_path, """
+        colors = [RED, GREEN, BLUE]
+        for i in range(1, STEPS, 2):
+            self.play(Create(Dot()), run_time=0.5)
+        for color in enumerate(colors):
+            self.wait(0.25)
+    """, prelude="STEPS = 9\n")
+    assert e.animations == [0.5] * 4 + [0.25] * 3
+    assert e.exact
+
+
+def test_unknown_trip_count_is_assumed_and_inexact(tmp_path):
+    e = estimate(tmp_path, """
+        for dot in self.dots:
+            self.play(FadeIn(dot), run_time=1)
+    """)
+    assert e.play_calls == UNKNOWN_LOOP_ITERATIONS
+    assert not e.exact
+
+
+def test_constant_branch_is_exact_and_differing_branches_take_the_longer(tmp_path):
+    e = estimate(tmp_path, """
+        if SHOW_INTRO:
+            self.play(Write(title), run_time=2)
+        else:
+            self.wait(5)
+    """, prelude="SHOW_INTRO = 1\n")
+    assert e.animations == [2] and e.exact
+
+    e = estimate(tmp_path, """
+        if self.flag:
+            self.play(Write(title), run_time=2)
+        else:
+            self.wait(5)
+    """)
+    assert e.animations == [5] and not e.exact
+
+    e = estimate(tmp_path, """
+        if self.flag:
+            self.wait(1)
+        else:
+            self.wait(1)
+    """)
+    assert e.animations == [1] and e.exact  # Same animations either way
+
+
+def test_animating_helpers_are_expanded_but_inexact(tmp_path):
+    e = estimate(tmp_path, """
+        self.intro()
+        self.intro()
+    """, helpers="""
+    def intro(self):
+        self.play(Write(Text("hi")), run_time=1.5)
+    """)
+    assert e.animations == [1.5, 1.5]
+    assert e.text_objects == 2
+    assert not e.exact
+
+
+def test_multiplicative_growth_is_flagged_over_budget(tmp_path):
+    e = estimate(tmp_path, """
+        segments = [Line()]
+        for _ in range(20):
+            new = []
+            for seg in segments:
+                new.append(seg.copy())
+                new.append(seg.copy())
+            segments = new
+        self.wait(1)
+    """)
+    assert e.peak_elements == 2 ** 20
+    assert any("grows x2" in w for w in e.warnings)
+    assert any("elements exceeds" in p for p in check_render_budget(e))
@@ -0,0 +1,52 @@
+"""The on-disk LLM response cache under concurrent use and its size bound."""
+
+import os
+import threading
+import time
+
+from pipeline import llm_cache
+
+
+def test_concurrent_puts_and_gets_of_one_key(tmp_path):
+    key = llm_cache.cache_key("m", "system", "user")
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(50):
+                llm_cache.put(key, f"response {n}-{i}", "m", cache_dir=tmp_path)
+                assert llm_cache.get(key, cache_dir=tmp_path).startswith("response")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+
+def test_get_survives_eviction_between_read_and_touch(tmp_path, monkeypatch):
+    key = llm_cache.cache_key("m", "system", "user")
+    llm_cache.put(key, "response", "m", cache_dir=tmp_path)
+
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(llm_cache.os, "utime", evicted)
+    assert llm_cache.get(key, cache_dir=tmp_path) == "response"
+
+
+def test_put_evicts_least_recently_used_once_over_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MAX_BYTES", 1000)
+    keys = [llm_cache.cache_key("m", "system", str(i)) for i in range(8)]
+    now = time.time()
+    for i, key in enumerate(keys):
+        llm_cache.put(key, "x" * 200, "m", cache_dir=tmp_path)
+        os.utime(llm_cache._entry_path(key, tmp_path), (now - 60 + i,) * 2)  # Oldest first, without sleeping
+    sizes = sum(p.stat().st_size for p in tmp_path.glob("*/*.json"))
+    assert sizes <= 1000
+    assert llm_cache.get(keys[-1], cache_dir=tmp_path) == "x" * 200
+    assert llm_cache.get(keys[0], cache_dir=tmp_path) is None
@@ -0,0 +1,93 @@
+"""AST pre-flight checks on generated scenes."""
+
+import pickle
+import textwrap
+
+import pytest
+
+from rendering.preflight import PreflightError, preflight_check
+
+
+def write_scene(tmp_path, source: str):
+    path = tmp_path / "scene.py"
+    path.write_text(textwrap.dedent(source))
+    return path
+
+
+def problems(tmp_path, source: str, scene_name: str = None) -> list:
+    with pytest.raises(PreflightError) as excinfo:
+        preflight_check(write_scene(tmp_path, source), scene_name)
+    return excinfo.value.problems
+
+
+def test_picks_generated_scene_then_the_last_scene(tmp_path):
+    path = write_scene(tmp_path, """
+        class Helper: pass
+        class GeneratedScene(Scene):
+            def construct(self): pass
+        class Other(Scene):
+            def construct(self): pass
+    """)
+    assert preflight_check(path) == "GeneratedScene"
+    path = write_scene(tmp_path, """
+        class Base(MovingCameraScene):
+            def construct(self): pass
+        class Derived(Base): pass
+    """)
+    assert preflight_check(path) == "Derived"  # construct() inherited from a local parent
+
+
+def test_syntax_error_reports_its_line(tmp_path):
+    [problem] = problems(tmp_path, "class GeneratedScene(Scene):\n    def construct(self)\n")
+    assert problem.startswith("line 2: SyntaxError: ")
+
+
+def test_no_scene_or_wrong_name(tmp_path):
+    assert problems(tmp_path, "x = 1\n") == ["no Scene subclass found"]
+    source = "class A(Scene):\n    def construct(self): pass\n"
+    assert problems(tmp_path, source, "B") == ["class B is not a Scene subclass"]
+
+
+def test_missing_construct(tmp_path):
+    assert problems(tmp_path, "class GeneratedScene(Scene):\n    pass\n") == [
+        "GeneratedScene does not define construct()"
+    ]
+
+
+def test_three_d_and_camera_frame_need_the_right_base(tmp_path):
+    found = problems(tmp_path, """
+        class GeneratedScene(Scene):
+            def construct(self):
+                self.set_camera_orientation(phi=1)
+                self.play(self.camera.frame.animate.scale(2))
+    """)
+    assert found == [
+        "line 4: self.set_camera_orientation() requires ThreeDScene, but GeneratedScene inherits from Scene",
+        "line 5: self.camera.frame requires MovingCameraScene, but GeneratedScene inherits from Scene",
+    ]
+    path = write_scene(tmp_path, """
+        class GeneratedScene(ThreeDScene):
+            def construct(self):
+                self.set_camera_orientation(phi=1)
+    """)
+    assert preflight_check(path) == "GeneratedScene"
+
+
+def test_banned_calls_and_bad_kwargs(tmp_path):
+    found = problems(tmp_path, """
+        class GeneratedScene(Scene):
+            def construct(self):
+                label = Text("x")
+                label.fix_in_frame()
+                self.add(Square(side=2))
+    """)
+    assert found == [
+        "line 5: fix_in_frame() not supported in 2D scenes; use self.add() instead",
+        "line 6: Square uses side_length=, not side=",
+    ]
+
+
+def test_error_pickles_with_its_fields(tmp_path):
+    error = pickle.loads(pickle.dumps(PreflightError(tmp_path / "scene.py", ["a", "b"])))
+    assert error.problems == ["a", "b"]
+    assert str(error).endswith("  - a\n  - b")
@@ -0,0 +1,16 @@
+"""Tests for the monitored render subprocess runner."""
+
+import sys
+
+from rendering import process
+
+
+def test_run_monitored_keeps_only_output_tail(monkeypatch):
+    monkeypatch.setattr(process, "OUTPUT_TAIL_LINES", 10)
+    seen = []
+    result = process.run_monitored(
+        [sys.executable, "-c", "for i in range(100): print(i)"], on_line=seen.append,
+    )
+    assert result.returncode == 0
+    assert len(seen) == 100
+    assert result.output == [str(i) for i in range(90, 100)]
@@ -0,0 +1,64 @@
+"""Failing-region widening and the repair loop's error reporting."""
+
+import json
+import textwrap
+
+import pytest
+
+from pipeline import repair
+from rendering.failure import FailureSite, RenderFailure
+from rendering.preflight import PreflightError
+
+SCENE = textwrap.dedent("""\
+    class GeneratedScene(Scene):
+        def construct(self):
+            a = 1
+            b = f(
+                a,
+                2,
+            )
+            for i in range(3):
+                self.play(Create(Dot()), run_time=i)
+                self.wait(1)
+            c = 3
+
+        def helper(self):
+            return 4
+""")
+
+
+@pytest.mark.parametrize("lineno, context, region", [
+    (3, 0, (3, 3)),
+    (5, 0, (4, 7)),  # A line inside a call widens to the whole statement
+    (3, 1, (3, 7)),  # Context reaching into the call takes all of it
+    (9, 0, (9, 9)),  # Innermost statement, not the whole loop
+    (9, 1, (8, 10)),
+    (8, 0, (8, 10)),  # The loop itself
+    (11, 9, (3, 11)),  # Kept inside construct()'s body
+    (14, 3, (14, 14)),
+])
+def test_failing_region(lineno, context, region):
+    assert repair.failing_region(SCENE, lineno, context) == region
+
+
+def test_last_render_failure_is_reraised_when_the_last_fix_is_rejected(tmp_path, monkeypatch):
+    (tmp_path / "visual_plan.json").write_text(json.dumps({"concept": "c"}))
+    (tmp_path / "scene.py").write_text(SCENE)
+    output = ["Traceback (most recent call last):",
+              f'  File "{tmp_path / "scene.py"}", line 9, in construct',
+              "ValueError: bad run_time"]
+    failure = RenderFailure(tmp_path / "scene.py", output)
+    assert failure.site is not None
+
+    def render_from_plan(*args, **kwargs):
+        raise failure
+
+    def repair_scene(scene_path, site, use_cache=True):
+        raise PreflightError(scene_path, ["line 9: SyntaxError: invalid syntax"])
+
+    monkeypatch.setattr(repair, "render_from_plan", render_from_plan)
+    monkeypatch.setattr(repair, "repair_scene", repair_scene)
+    with pytest.raises(RenderFailure) as excinfo:
+        repair.render_with_repair(tmp_path / "visual_plan.json", tmp_path / "out.mp4", max_attempts=2)
+    assert excinfo.value is failure
+    assert isinstance(excinfo.value.__cause__, PreflightError)
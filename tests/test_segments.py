@@ -0,0 +1,35 @@
+"""Section-parallel rendering: the partial movie file list and boundary state checks."""
+
+import pytest
+
+from rendering.segments import SegmentationUnavailable, check_boundary, partial_movie_files
+
+
+def write_list(media_dir, names):
+    partial_dir = media_dir / "videos" / "scene" / "480p15" / "partial_movie_files" / "GeneratedScene"
+    partial_dir.mkdir(parents=True)
+    lines = ["# This file is used internally by FFMPEG."]
+    lines += [f"file 'file:{partial_dir / name}'" for name in names]
+    (partial_dir / "partial_movie_file_list.txt").write_text("\n".join(lines) + "\n")
+    return partial_dir
+
+
+def test_partial_movie_files_in_animation_order(tmp_path):
+    partial_dir = write_list(tmp_path, ["b.mp4", "a.mp4", "b.mp4"])
+    assert partial_movie_files(tmp_path) == [partial_dir / "b.mp4", partial_dir / "a.mp4", partial_dir / "b.mp4"]
+
+
+def test_missing_list_is_unavailable(tmp_path):
+    with pytest.raises(SegmentationUnavailable):
+        partial_movie_files(tmp_path)
+
+
+def test_boundary_compares_the_overlap_with_the_next_segment_start(tmp_path):
+    def segment(name, files):
+        write_list(tmp_path / name, files)
+        return partial_movie_files(tmp_path / name)
+
+    reached = segment("seg_000", ["1_a_x.mp4", "1_b_y.mp4"])  # Played animation 1, then overlapped 2
+    check_boundary(0, 2, reached, segment("seg_001", ["1_b_y.mp4", "1_c_z.mp4"]))
+    with pytest.raises(SegmentationUnavailable, match="segment 1 starts animation 2"):
+        check_boundary(0, 2, reached, segment("seg_002", ["1_b_w.mp4", "1_c_z.mp4"]))
@@ -0,0 +1,96 @@
+"""Incremental decoding of a streamed manim_code field and early pre-flight checks."""
+
+import json
+
+import pytest
+
+from pipeline.stream_parse import JsonStringField, StreamingScene, _at_statement_boundary
+from rendering.preflight import PreflightError
+
+CODE = 'title = Text("caf\\u00e9 \\"π\\" 😀")\nx = 1\t# tab\\n\n'
+
+
+def feed_in_pieces(field: JsonStringField, text: str, size: int) -> str:
+    return "".join(field.feed(text[i:i + size]) for i in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_decodes_escapes_split_across_chunks(size):
+    payload = json.dumps({"estimated_duration": 12, "manim_code": CODE})  # ensure_ascii: \\u escapes, surrogates
+    field = JsonStringField()
+    assert feed_in_pieces(field, payload, size) == CODE
+    assert field.complete
+    assert field.feed("more") == ""
+
+
+def test_waits_for_the_key():
+    field = JsonStringField()
+    assert field.feed('{"estimated_duration": 12, "manim') == ""
+    assert field.feed('_code": "ab') == "ab"
+    assert not field.complete
+
+
+@pytest.mark.parametrize("source, boundary", [
+    ("x = 1\n", True),
+    ("x = f(1,\n", False),  # Inside brackets
+    ("for i in range(3):\n", False),  # Block header without its body
+    ("for i in range(3):\n    y = i\n", True),
+    ("@decorator\n", False),
+    ('s = """open\n', False),  # Inside a string
+    ("# only a comment\n", False),
+])
+def test_statement_boundaries(source, boundary):
+    assert _at_statement_boundary(source) is boundary
+
+
+def stream(tmp_path, code: str, size: int = 4) -> StreamingScene:
+    scene = StreamingScene(tmp_path / "scene.partial.py")
+    payload = json.dumps({"manim_code": code})
+    try:
+        for i in range(0, len(payload), size):
+            scene.feed(payload[i:i + size])
+    finally:
+        scene.close()
+    return scene
+
+
+def test_partial_file_and_code_follow_the_stream(tmp_path):
+    code = "class GeneratedScene(Scene):\n    def construct(self):\n        self.wait(1)\n"
+    scene = stream(tmp_path, code)
+    assert scene.code == code
+    assert (tmp_path / "scene.partial.py").read_text() == code
+    assert scene.ttft_seconds is not None
+
+
+def test_rejects_a_scene_as_soon_as_a_problem_is_complete(tmp_path):
+    code = (
+        "class GeneratedScene(Scene):\n"
+        "    def construct(self):\n"
+        "        self.set_camera_orientation(phi=1)\n"
+        "        self.wait(1)\n"
+        "        self.wait(2)\n"
+    )
+    with pytest.raises(PreflightError) as excinfo:
+        stream(tmp_path, code)
+    assert excinfo.value.problems == [
+        "line 3: self.set_camera_orientation() requires ThreeDScene, but GeneratedScene inherits from Scene"
+    ]
+    # Raised before the rest of the response arrived
+    assert "wait(2)" not in (tmp_path / "scene.partial.py").read_text()
+
+
+def test_unfinished_try_is_not_a_syntax_error(tmp_path):
+    code = (
+        "class GeneratedScene(Scene):\n"
+        "    def construct(self):\n"
+        "        try:\n"
+        "            self.wait(1)\n"
+        "        except Exception:\n"
+        "            pass\n"
+    )
+    assert stream(tmp_path, code, size=1).code == code
+
+
+def test_indented_bodies_are_not_checked_standalone(tmp_path):
+    code = "        self.set_camera_orientation(phi=1)\n        self.wait(1)\n"
+    assert stream(tmp_path, code).code == code
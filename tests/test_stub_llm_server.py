@@ -0,0 +1,108 @@
+"""The OpenAI provider path against the local stub server, including connection reuse."""
+
+import asyncio
+import json
+import threading
+import urllib.request
+
+import pytest
+
+pytest.importorskip("openai")
+
+from pipeline import llm_metrics, providers
+from pipeline.stub_llm_server import serve
+
+SYSTEM_PROMPT = "You write Manim scenes."
+USER_PROMPT = "Concept: Pythagoras\nTarget length: 12"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = serve(port=0, chunk_chars=16)
+    host, port = server.server_address
+    monkeypatch.setattr(providers, "OPENAI_API_KEY", "stub")
+    monkeypatch.setattr(providers, "OPENAI_BASE_URL", f"http://{host}:{port}/v1")
+    # Clients are pooled per process; each test gets one bound to its own server
+    providers._openai_client.cache_clear()
+    providers._async_clients.clear()
+    yield server
+    providers._openai_client.cache_clear()
+    server.shutdown()
+    server.server_close()
+
+
+def stub_stats(server) -> dict:
+    """GET /stats, not counting the connection made for it."""
+    host, port = server.server_address
+    with urllib.request.urlopen(f"http://{host}:{port}/v1/stats") as response:
+        stats = json.load(response)
+    stats["connections"] -= 1
+    return stats
+
+
+def assert_scene(text: str):
+    payload = json.loads(text)
+    assert "class GeneratedScene" in payload["manim_code"]
+    assert payload["estimated_duration"] == 12
+
+
+def last_metrics() -> dict:
+    return list(llm_metrics.iter_records())[-1]
+
+
+def test_complete_reuses_one_connection(stub):
+    for _ in range(3):
+        assert_scene(providers.complete(USER_PROMPT, SYSTEM_PROMPT, model="stub"))
+    assert stub_stats(stub) == {"connections": 1, "requests": 3}
+
+    record = last_metrics()
+    assert record["kind"] == "complete" and record["completed"]
+    # The system prompt was sent with the same prompt_cache_key before
+    assert record["cached_tokens"] > 0
+
+
+def test_stream_yields_chunks(stub):
+    chunks = list(providers.stream(USER_PROMPT, SYSTEM_PROMPT, model="stub"))
+    assert len(chunks) > 1
+    assert_scene("".join(chunks))
+    # A second stream goes over the same keep-alive connection
+    assert_scene("".join(providers.stream(USER_PROMPT, SYSTEM_PROMPT, model="stub")))
+    assert stub_stats(stub) == {"connections": 1, "requests": 2}
+
+    record = last_metrics()
+    assert record["kind"] == "stream" and record["completed"]
+    assert record["output_tokens"] > 0
+
+
+def test_cancel_aborts_a_stream(stub):
+    cancel = threading.Event()
+    chunks = []
+    with pytest.raises(providers.GenerationCancelled):
+        for chunk in providers.stream(USER_PROMPT, SYSTEM_PROMPT, model="stub", cancel=cancel):
+            chunks.append(chunk)
+            cancel.set()
+    assert len(chunks) == 1
+    assert not last_metrics()["completed"]
+    with pytest.raises(providers.GenerationCancelled):
+        providers.complete(USER_PROMPT, SYSTEM_PROMPT, model="stub", cancel=cancel)
+    assert stub_stats(stub)["requests"] == 1
+
+
+def test_async_shares_a_pool_per_event_loop(stub):
+    async def run():
+        texts = await asyncio.gather(*(
+            providers.acomplete(USER_PROMPT, SYSTEM_PROMPT, model="stub") for _ in range(4)
+        ))
+        chunks = [c async for c in providers.astream(USER_PROMPT, SYSTEM_PROMPT, model="stub")]
+        client = providers._async_openai_client()
+        await providers.aclose()
+        assert client.is_closed() and not providers._async_clients
+        return texts, chunks
+
+    texts, chunks = asyncio.run(run())
+    for text in texts + ["".join(chunks)]:
+        assert_scene(text)
+    stats = stub_stats(stub)
+    assert stats["requests"] == 5
+    # Concurrent requests may open up to one connection each; the stream reuses one of them
+    assert 1 <= stats["connections"] <= 4
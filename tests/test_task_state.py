@@ -0,0 +1,74 @@
+"""Streaming batch input and the resumable task state log."""
+
+import json
+
+import pytest
+
+from pipeline.task_state import TaskStateStore, iter_tasks, task_id
+
+
+def test_iter_tasks_reads_jsonl_and_json_lists(tmp_path):
+    jsonl = tmp_path / "batch.jsonl"
+    jsonl.write_text('{"concept": "a"}\n\n{"concept": "b"}\n')
+    assert list(iter_tasks(jsonl)) == [(0, {"concept": "a"}), (2, {"concept": "b"})]
+    listed = tmp_path / "batch.json"
+    listed.write_text('  [{"concept": "a"}, {"concept": "b"}]')
+    assert list(iter_tasks(listed)) == [(0, {"concept": "a"}), (1, {"concept": "b"})]
+
+
+def test_iter_tasks_reports_the_bad_line_after_earlier_tasks(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text('{"concept": "a"}\n{"concept": \n')
+    tasks = iter_tasks(path)
+    assert next(tasks) == (0, {"concept": "a"})
+    with pytest.raises(ValueError, match="batch.jsonl:2"):
+        next(tasks)
+
+
+def test_task_id_prefers_id_and_is_stable():
+    assert task_id({"id": 7, "concept": "a"}) == "7"
+    task = {"concept": "a", "description": "d", "length": 15}
+    assert task_id(task) == task_id(dict(task)) != task_id({**task, "length": 20})
+
+
+def test_resume_keeps_the_latest_state_per_task(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = TaskStateStore(path, resume=False)
+    store.update("a", "generating")
+    store.update("a", "done", output_path=tmp_path / "missing.mp4")
+    store.update("b", "failed", error="boom")
+    store.close()
+
+    resumed = TaskStateStore(path)
+    assert resumed.get("b")["error"] == "boom"
+    assert resumed.counts() == {"done": 1, "failed": 1}
+    assert not resumed.is_done("a")  # Its output is gone, so it runs again
+    (tmp_path / "missing.mp4").write_bytes(b"")
+    assert resumed.is_done("a")
+    resumed.close()
+
+    fresh = TaskStateStore(path, resume=False)
+    assert fresh.counts() == {} and path.read_text() == ""
+    fresh.close()
+
+
+def test_torn_last_line_is_skipped_and_terminated(tmp_path):
+    path = tmp_path / "state.jsonl"
+    path.write_text(json.dumps({"task_id": "a", "status": "done"}) + '\n{"task_id": "b", "sta')
+    store = TaskStateStore(path)
+    assert store.counts() == {"done": 1}
+    store.update("b", "pending")
+    store.close()
+
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[-1])["task_id"] == "b"
+    resumed = TaskStateStore(path)
+    assert resumed.counts() == {"done": 1, "pending": 1}
+    resumed.close()
+
+
+def test_unknown_status_is_rejected(tmp_path):
+    store = TaskStateStore(tmp_path / "state.jsonl", resume=False)
+    with pytest.raises(ValueError):
+        store.update("a", "finished")
+    store.close()